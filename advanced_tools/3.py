@@ -1,31 +1,21 @@
-import os
-from dotenv import load_dotenv
 import asyncio
 
-from openai import AsyncOpenAI
 from agents import (
     Agent,
     Runner,
     function_tool,
-    OpenAIChatCompletionsModel,
     MaxTurnsExceeded,
     set_tracing_disabled,
     StopAtTools,
     RunContextWrapper,
     AgentBase,
 )
+from hello_agent import lazy_model
 from dataclasses import dataclass
 
-load_dotenv("../.env")
 # set_tracing_disabled(True)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+model = lazy_model()
 
 
 @dataclass
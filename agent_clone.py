@@ -1,39 +1,33 @@
 # 🧬 Agent Cloning: Create Agent Variants
 # Simple examples to learn agent cloning
 
-import os
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
 from agents import (
     Agent,
     Runner,
-    OpenAIChatCompletionsModel,
     set_tracing_disabled,
     ModelSettings,
     function_tool,
 )
+from hello_agent import FOREVER, ToolCache, ToolLimiter, lazy_model, loop_safe_tool, run_batch_sync
 
-# 🌿 Load environment variables
-load_dotenv()
 set_tracing_disabled(disabled=True)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # 🔑 Get your API key from environment
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
+model = lazy_model()
 
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+
+# Results are reused: areas forever, weather for ten minutes
+tool_cache = ToolCache(max_entries=1024, ttl=600)
 
 
 # 🛠️ Simple tools for learning
-@function_tool
+@loop_safe_tool(blocking=False, cache=tool_cache, cache_ttl=FOREVER)
 def calculate_area(length: float, width: float) -> str:
     """Calculate the area of a rectangle."""
     area = length * width
     return f"Area = {length} × {width} = {area} square units"
 
 
-@function_tool
+@loop_safe_tool(cache=tool_cache)
 def get_weather(city: str) -> str:
     """Get weather information for a city."""
     return f"The weather in {city} is sunny and 72°F"
@@ -130,11 +124,15 @@ def main():
     # Test tool usage
     query = "What's the area of a 5x3 rectangle and the weather in Tokyo?"
 
-    result_weather = Runner.run_sync(weather_agent, query)
+    # Both tools are asked for in one turn; run them side by side and time them
+    limiter = ToolLimiter(max_concurrent=4)
+    result_weather = Runner.run_sync(limiter.apply(weather_agent), query)
     result_math = Runner.run_sync(math_agent, query)
 
     print("Weather Agent:")
     print(result_weather.final_output)
+    for timing in limiter.timings(result_weather):
+        print(f"  {timing.tool}: {timing.run_seconds * 1000:.1f} ms")
     print("\nMath Agent:")
     print(result_math.final_output)
 
@@ -167,10 +165,11 @@ def main():
     # Test all variants
     query = "Tell me about artificial intelligence."
 
-    for name, agent in agents.items():
-        result = Runner.run_sync(agent, query)
+    # All variants run at once, so this takes about one model round-trip
+    results = run_batch_sync([(agent, query) for agent in agents.values()])
+    for name, result in zip(agents, results):
         print(f"\n{name} Agent:")
-        print(result.final_output[:150] + "...")
+        print(result.final_output[:150] + "..." if result.ok else f"failed: {result.error!r}")
 
     # 🎯 Example 5: Understanding Shared References
     print("\n🎯 Example 5: Understanding Shared References")
@@ -245,10 +244,10 @@ def main():
     # Test all writing styles
     query = "What is love?"
 
-    for name, agent in writing_agents.items():
-        result = Runner.run_sync(agent, query)
+    results = run_batch_sync([(agent, query) for agent in writing_agents.values()])
+    for name, result in zip(writing_agents, results):
         print(f"\n{name}:")
-        print(result.final_output[:100] + "...")
+        print(result.final_output[:100] + "..." if result.ok else f"failed: {result.error!r}")
 
     print("\n🎉 You've learned Agent Cloning!")
     print("💡 Try creating your own agent families!")
@@ -1,27 +1,16 @@
-import os
-from openai import AsyncOpenAI
 from agents import (
     Agent,
     Runner,
     set_tracing_disabled,
-    OpenAIChatCompletionsModel,
     function_tool,
     AgentHooks,
 )
+from hello_agent import lazy_model
 from pydantic import BaseModel
 
-from dotenv import load_dotenv
-
-load_dotenv("../.env")
 set_tracing_disabled(True)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+model = lazy_model()
 
 
 class HelloAgentHooks(AgentHooks):
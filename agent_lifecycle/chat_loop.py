@@ -1,26 +1,15 @@
-import os
-from openai import AsyncOpenAI
 from agents import (
     Agent,
-    Runner,
     set_tracing_disabled,
-    OpenAIChatCompletionsModel,
     function_tool,
+    RunConfig,
     RunResult,
 )
+from hello_agent import Compactor, ConversationHistory, get_sync_runner, lazy_model
 
-from dotenv import load_dotenv
-
-load_dotenv("../.env")
 set_tracing_disabled(True)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+model = lazy_model()
 
 
 @function_tool
@@ -43,21 +32,40 @@ base_agent: Agent = Agent(
     handoffs=[news_agent],
 )
 
-user_chat: list[dict] = []
-while True:
-    user_input = input("Enter your input (or 'exit' to quit): ")
-    if user_input.lower() == "exit":
-        break
-
-    if user_input.lower() == "view":
-        print("\nCurrent Chat History:", user_chat)
-        continue
-
-    user_message = {"role": "user", "content": user_input}
-    user_chat.append(user_message)
-
-    res: RunResult = Runner.run_sync(starting_agent=base_agent, input=user_chat)
-
-    user_chat = res.to_input_list()
-
-    print("\nAGENT RESPONSE:", res.final_output)
+# The agents above are also served to many users at once by
+# ``python -m hello_agent.chat_server``; this loop is the single-user version.
+def main() -> None:
+    # Every turn runs on one long-lived background loop, so the connection to
+    # the model stays warm between inputs instead of a new loop per run_sync.
+    runner = get_sync_runner()
+
+    # Only the new messages are added each turn. Once the prompt passes ~4000
+    # tokens, older exchanges are folded into a cached summary and only the
+    # recent tail is sent verbatim.
+    history = ConversationHistory()
+    compactor = Compactor(budget_tokens=4000)
+    config = RunConfig(call_model_input_filter=compactor.call_model_input_filter)
+    while True:
+        user_input = input("Enter your input (or 'exit' to quit): ")
+        if user_input.lower() == "exit":
+            break
+
+        if user_input.lower() == "view":
+            print("\nCurrent Chat History:", history.items)
+            continue
+
+        res: RunResult = runner.run(
+            starting_agent=base_agent, run_config=config, **history.next_turn(user_input)
+        )
+        stats = history.record(res)
+
+        print("\nAGENT RESPONSE:", res.final_output)
+        print(
+            f"(turn {stats.turn}: sent {stats.items_sent} items, "
+            f"~{stats.estimated_tokens_sent} tokens [{stats.mode}], "
+            f"{stats.input_tokens} input tokens billed)"
+        )
+
+
+if __name__ == "__main__":
+    main()
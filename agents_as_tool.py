@@ -1,27 +1,16 @@
-import os
 import asyncio
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
 from agents import (
     Agent,
     Runner,
-    OpenAIChatCompletionsModel,
     set_tracing_disabled,
     ModelSettings,
     function_tool,
 )
+from hello_agent import lazy_model
 
-# 🌿 Load environment variables
-load_dotenv()
 # set_tracing_disabled(disabled=True)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+model = lazy_model()
 
 # 1) Two tiny specialists
 spanish = Agent(
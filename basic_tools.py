@@ -1,40 +1,19 @@
 # 📦 Import Required Libraries
-import os
-from dotenv import load_dotenv
-
 from agents import (
     Agent,  # 🤖 Core agent class
     Runner,  # 🏃 Runs the agent
-    AsyncOpenAI,  # 🌐 OpenAI-compatible async client
-    OpenAIChatCompletionsModel,  # 🧠 Chat model interface
+    Model,  # 🧠 Chat model interface
     function_tool,  # 🛠️ Decorator to turn Python functions into tools
     set_default_openai_client,  # ⚙️ (Optional) Set default OpenAI client
     set_tracing_disabled,  # 🚫 Disable internal tracing/logging
 )
-
-# 🌿 Load environment variables from .env file
-load_dotenv()
+from hello_agent import lazy_model
 
 # 🚫 Disable tracing for clean output (optional for beginners)
 set_tracing_disabled(disabled=True)
 
-# 🔐 1) Environment & Client Setup
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # 🔑 Get your API key from environment
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = (
-    os.getenv("GEMINI_BASE_URL") or ""
-)  # 🌐 Gemini-compatible base URL (set this in .env file)
-
-# 🌐 Initialize the AsyncOpenAI-compatible client with Gemini details
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=GEMINI_API_KEY,
-    base_url=GEMINI_BASE_URL,
-)
-
-# 🧠 2) Model Initialization
-model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model=GEMINI_MODEL, openai_client=external_client  # ⚡ Fast Gemini model
-)
+# 🧠 1-2) Client & Model Initialization (shared, pooled client)
+model: Model = lazy_model()
 
 
 # 🛠️ 3) Define tools (functions wrapped for tool calling)
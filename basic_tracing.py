@@ -1,23 +1,8 @@
-import os
-from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool
+from agents import Agent, Runner, Model, function_tool
+from hello_agent import lazy_model
 
-load_dotenv()
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # 🔑 Get your API key from environment
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=GEMINI_API_KEY,
-    base_url=GEMINI_BASE_URL,
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model=GEMINI_MODEL, openai_client=external_client
-)
+# 1-2. Which LLM Service and Model? (shared, pooled client)
+llm_model: Model = lazy_model()
 
 
 @function_tool
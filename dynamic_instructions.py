@@ -1,28 +1,18 @@
 # 🎭 Dynamic Instructions: Make Your Agent Adapt
 # Simple examples to learn dynamic instructions
 
-import os
-from dotenv import load_dotenv
 from agents import (
     Agent,
     Runner,
-    OpenAIChatCompletionsModel,
-    AsyncOpenAI,
     set_tracing_disabled,
     RunContextWrapper,
 )
+from hello_agent import lazy_model, run_batch_sync
 
-# 🌿 Load environment variables
-load_dotenv()
 set_tracing_disabled(disabled=True)
 
-# 🔐 Setup Gemini client
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # 🔑 Get your API key from environment
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+# 🔐 Setup Gemini client (shared, pooled)
+model = lazy_model()
 
 
 def main():
@@ -63,12 +53,13 @@ def main():
         name="Context Aware Agent", instructions=context_aware, model=model
     )
 
-    # Test with multiple messages
-    result1 = Runner.run_sync(agent_context, "Hello!")
+    # Test with multiple messages (independent runs, sent concurrently)
+    result1, result2 = run_batch_sync(
+        [(agent_context, "Hello!"), (agent_context, "Tell me about Python")]
+    )
     print("First message:")
     print(result1.final_output)
 
-    result2 = Runner.run_sync(agent_context, "Tell me about Python")
     print("\nSecond message:")
     print(result2.final_output)
 
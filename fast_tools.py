@@ -0,0 +1,76 @@
+# ⚡ Faster tool-using agents
+# basic_tools.py shows how function tools work; this lesson runs the same
+# math agent with helpers that make tool-heavy runs cheaper.
+from agents import (
+    Agent,  # 🤖 Core agent class
+    Runner,  # 🏃 Runs the agent
+    set_tracing_disabled,  # 🚫 Disable internal tracing/logging
+)
+from hello_agent import (
+    FOREVER,
+    ArithmeticFastPath,
+    ToolCache,
+    ToolLimiter,
+    lazy_model,
+    loop_safe_tool,
+)
+
+set_tracing_disabled(disabled=True)
+
+# ⚡ 1) Pure arithmetic ("what is 19 + 23 * 2?") is answered locally, without
+# a model round trip; everything else goes to the model as usual
+model = ArithmeticFastPath(lazy_model())
+
+# 🗃️ 2) Math never changes: remember tool results instead of recomputing them
+math_cache = ToolCache(max_entries=1024, ttl=FOREVER)
+
+
+@loop_safe_tool(blocking=False, cache=math_cache)
+def multiply(a: int, b: int) -> int:
+    """🧮 Exact multiplication (use this instead of guessing math)."""
+    return a * b
+
+
+@loop_safe_tool(blocking=False, cache=math_cache)
+def sum(a: int, b: int) -> int:
+    """➕ Exact addition (use this instead of guessing math)."""
+    return a + b
+
+
+agent: Agent = Agent(
+    name="Assistant",
+    instructions=(
+        "You are a helpful assistant. "
+        "Always use tools for math questions. Always follow DMAS rule (division, multiplication, addition, subtraction). "
+        "Explain answers clearly and briefly for beginners."
+    ),
+    model=model,
+    tools=[multiply, sum],
+)
+
+# 🚦 3) Tool calls from one model response run concurrently; the limiter
+# caps how many run at once (per tool and overall) and times every call
+limiter = ToolLimiter(max_concurrent=4)
+fast_agent = limiter.apply(agent)
+
+# 🧪 A word problem: the model has to call several tools to answer it.
+# Asked twice, the second run's tool calls come from the cache.
+prompt = "A crate holds 12 rows of 7 apples and another holds 9 rows of 8. How many apples are there?"
+for attempt in (1, 2):
+    result = Runner.run_sync(fast_agent, prompt)
+
+    print(f"\n🤖 WORD PROBLEM (run {attempt})\n")
+    print(result.final_output)
+
+    # ⏱️ How long each tool call waited for a slot and ran
+    for timing in limiter.timings(result):
+        print(f"🛠️ {timing.tool}: waited {timing.wait_seconds * 1000:.1f} ms, ran {timing.run_seconds * 1000:.1f} ms")
+
+print(f"\n🗃️ Cache: {math_cache.stats.hits} hits, {math_cache.stats.misses} misses")
+
+# 🧮 Plain arithmetic never reaches the model (or the tools)
+result = Runner.run_sync(fast_agent, "what is 19 + 23 * 2?")
+
+print("\n🤖 PLAIN ARITHMETIC\n")
+print(result.final_output)
+print(f"⚡ Answered locally: {model.stats.served_locally} of {model.stats.calls} model calls")
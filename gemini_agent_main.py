@@ -1,20 +1,11 @@
-from openai import AsyncOpenAI
-from agents import Agent, Runner, OpenAIChatCompletionsModel
+from agents import Agent, Runner, Model
+from hello_agent import lazy_model
 
-import os
-
-from dotenv import load_dotenv, find_dotenv
-
-load_dotenv(find_dotenv())
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),
+llm_model: Model = lazy_model(
+    "gemini-2.5-flash",
     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
 )
 
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash", openai_client=external_client
-)
-
 agent: Agent = Agent(name="Assistant", model=llm_model)
 
 result = Runner.run_sync(
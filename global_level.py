@@ -1,34 +1,34 @@
-import os
-
 from agents import (
     Agent,
     Runner,
-    AsyncOpenAI,
     set_default_openai_client,
     set_tracing_disabled,
     set_default_openai_api,
 )
-from dotenv import load_dotenv, find_dotenv
-
-load_dotenv(find_dotenv())
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
+from hello_agent import get_client
 
 set_tracing_disabled(True)
 set_default_openai_api("chat_completions")
 
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-set_default_openai_client(external_client)
-
 agent: Agent = Agent(
     name="Assistant",
     instructions="You are a helpful assistant",
     model="gemini-2.0-flash",
 )
 
-result = Runner.run_sync(agent, "Hello")
 
-print(result.final_output)
+def main() -> None:
+    # The global client needs the API key, so build it when the lesson runs
+    # rather than when it is imported
+    external_client = get_client(
+        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+    )
+    set_default_openai_client(external_client)
+
+    result = Runner.run_sync(agent, "Hello")
+
+    print(result.final_output)
+
+
+if __name__ == "__main__":
+    main()
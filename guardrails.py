@@ -1,11 +1,7 @@
-import os
 import asyncio
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
 from agents import (
     Agent,
     Runner,
-    OpenAIChatCompletionsModel,
     set_tracing_disabled,
     handoff,
     RunConfig,
@@ -16,20 +12,13 @@ from agents import (
     output_guardrail,
     OutputGuardrailTripwireTriggered,
 )
+from hello_agent import lazy_model
 
 from pydantic import BaseModel
 
-# 🌿 Load environment variables
-load_dotenv()
 set_tracing_disabled(disabled=True)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+model = lazy_model()
 
 run_config = RunConfig(model=model, tracing_disabled=True)
 
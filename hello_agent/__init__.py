@@ -0,0 +1,192 @@
+"""Shared building blocks for the agent lessons in this repository.
+
+Attributes are imported on first access so ``import hello_agent`` stays
+cheap: tools such as the stub server never pay for importing the agents SDK.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+_EXPORTS: dict[str, str] = {
+    # batch
+    "BatchJob": "batch",
+    "BatchResult": "batch",
+    "run_batch": "batch",
+    "run_batch_sync": "batch",
+    # chat_server
+    "ChatServer": "chat_server",
+    "ServerConfig": "chat_server",
+    # compaction
+    "CompactionStats": "compaction",
+    "Compactor": "compaction",
+    # config
+    "PoolConfig": "config",
+    "Settings": "config",
+    "get_settings": "config",
+    "reload_settings": "config",
+    # clients
+    "LazyModel": "clients",
+    "PoolStats": "clients",
+    "PooledTransport": "clients",
+    "aclose_clients": "clients",
+    "aclose_loop_connections": "clients",
+    "get_client": "clients",
+    "get_model": "clients",
+    "lazy_model": "clients",
+    "pool_stats": "clients",
+    # fastpath
+    "ArithmeticFastPath": "fastpath",
+    "ArithmeticStats": "fastpath",
+    # facts
+    "FactMemory": "facts",
+    "FactStats": "facts",
+    "FactStore": "facts",
+    # history
+    "ConversationHistory": "history",
+    "TurnStats": "history",
+    # retrieval
+    "InvertedIndex": "retrieval",
+    "RetrievalMemory": "retrieval",
+    "RetrievalStats": "retrieval",
+    # sessions
+    "CacheStats": "sessions",
+    "CachedSession": "sessions",
+    "CompactCodec": "sessions",
+    "ItemCodec": "sessions",
+    "ItemPage": "sessions",
+    "Janitor": "sessions",
+    "JanitorStats": "sessions",
+    "LogStats": "sessions",
+    "LogStore": "sessions",
+    "RetentionPolicy": "sessions",
+    "SessionCache": "sessions",
+    "SessionStore": "sessions",
+    "ShardedSessionStore": "sessions",
+    "StoreSession": "sessions",
+    "StoreStats": "sessions",
+    "ZlibCodec": "sessions",
+    "ZstdCodec": "sessions",
+    "export_sessions": "sessions",
+    "import_sessions": "sessions",
+    "train_dictionary": "sessions",
+    # stub_server
+    "Latency": "stub_server",
+    "ScriptedReply": "stub_server",
+    "StubConfig": "stub_server",
+    "StubServer": "stub_server",
+    "StubServerThread": "stub_server",
+    # tokens
+    "RequestEstimate": "tokens",
+    "TokenBudget": "tokens",
+    "TokenBudgetExceeded": "tokens",
+    "count_items": "tokens",
+    "count_text": "tokens",
+    "count_tools": "tokens",
+    "estimate_request": "tokens",
+    # tools
+    "FOREVER": "tools",
+    "ToolCache": "tools",
+    "ToolCacheStats": "tools",
+    "ToolCallTiming": "tools",
+    "ToolExecutor": "tools",
+    "ToolLimiter": "tools",
+    "ToolPoolStats": "tools",
+    "get_tool_executor": "tools",
+    "loop_safe_tool": "tools",
+    # sync_runner
+    "BackgroundLoop": "sync_runner",
+    "SyncRunner": "sync_runner",
+    "get_sync_runner": "sync_runner",
+    "run_sync": "sync_runner",
+    # watchdog
+    "LagHistogram": "watchdog",
+    "LoopWatchdog": "watchdog",
+    "StallReport": "watchdog",
+}
+
+__all__ = sorted(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .batch import BatchJob, BatchResult, run_batch, run_batch_sync
+    from .clients import (
+        LazyModel,
+        PoolStats,
+        PooledTransport,
+        aclose_clients,
+        aclose_loop_connections,
+        get_client,
+        get_model,
+        lazy_model,
+        pool_stats,
+    )
+    from .chat_server import ChatServer, ServerConfig
+    from .compaction import CompactionStats, Compactor
+    from .config import PoolConfig, Settings, get_settings, reload_settings
+    from .fastpath import ArithmeticFastPath, ArithmeticStats
+    from .facts import FactMemory, FactStats, FactStore
+    from .history import ConversationHistory, TurnStats
+    from .retrieval import InvertedIndex, RetrievalMemory, RetrievalStats
+    from .sessions import (
+        CachedSession,
+        CacheStats,
+        CompactCodec,
+        ItemCodec,
+        ItemPage,
+        Janitor,
+        JanitorStats,
+        LogStats,
+        LogStore,
+        RetentionPolicy,
+        SessionCache,
+        SessionStore,
+        ShardedSessionStore,
+        StoreSession,
+        StoreStats,
+        ZlibCodec,
+        ZstdCodec,
+        export_sessions,
+        import_sessions,
+        train_dictionary,
+    )
+    from .stub_server import (
+        Latency,
+        ScriptedReply,
+        StubConfig,
+        StubServer,
+        StubServerThread,
+    )
+    from .sync_runner import BackgroundLoop, SyncRunner, get_sync_runner, run_sync
+    from .tokens import (
+        RequestEstimate,
+        TokenBudget,
+        TokenBudgetExceeded,
+        count_items,
+        count_text,
+        count_tools,
+        estimate_request,
+    )
+    from .tools import (
+        FOREVER,
+        ToolCache,
+        ToolCacheStats,
+        ToolCallTiming,
+        ToolExecutor,
+        ToolLimiter,
+        ToolPoolStats,
+        get_tool_executor,
+        loop_safe_tool,
+    )
+    from .watchdog import LagHistogram, LoopWatchdog, StallReport
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,202 @@
+"""Minimal asyncio HTTP/1.1 plumbing shared by the local servers.
+
+Only what the stand-in model server and chat server need: keep-alive request
+parsing, fixed-length JSON responses and chunked streaming responses.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class HTTPError(Exception):
+    """Raised for malformed requests; carries the status to answer with."""
+
+    def __init__(self, status: int, message: str = "") -> None:
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    body: bytes = b""
+    version: str = "HTTP/1.1"
+    _json: Any = field(default=None, repr=False)
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Any:
+        if self._json is None:
+            try:
+                self._json = json.loads(self.body or b"null")
+            except json.JSONDecodeError as exc:
+                raise HTTPError(400, f"invalid JSON body: {exc}") from exc
+        return self._json
+
+
+def _parse_length(value: str | bytes, base: int, what: str) -> int:
+    try:
+        length = int(value.strip(), base)
+    except ValueError as exc:
+        raise HTTPError(400, f"bad {what}") from exc
+    if length < 0:
+        raise HTTPError(400, f"bad {what}")
+    return length
+
+
+async def read_request(reader: asyncio.StreamReader) -> Request | None:
+    """Read one request from a keep-alive connection; ``None`` on clean EOF."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial:
+            return None
+        raise HTTPError(400, "truncated request head") from exc
+    except asyncio.LimitOverrunError as exc:
+        raise HTTPError(431) from exc
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError as exc:
+        raise HTTPError(400, "bad request line") from exc
+
+    headers: dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = b""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        received = 0
+        while True:
+            size = _parse_length((await reader.readline()).split(b";")[0], 16, "chunk size")
+            if size == 0:
+                await reader.readline()
+                break
+            received += size
+            if received > MAX_BODY_BYTES:
+                raise HTTPError(413)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        length = _parse_length(headers["content-length"], 10, "Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413)
+        body = await reader.readexactly(length)
+
+    url = urlsplit(target)
+    return Request(
+        method=method.upper(),
+        path=url.path,
+        query=dict(parse_qsl(url.query)),
+        headers=headers,
+        body=body,
+        version=version,
+    )
+
+
+def _head(status: int, headers: dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: bytes | str = b"",
+    *,
+    content_type: str = "text/plain; charset=utf-8",
+    headers: dict[str, str] | None = None,
+    keep_alive: bool = True,
+) -> None:
+    if isinstance(body, str):
+        body = body.encode()
+    all_headers = {
+        "Content-Type": content_type,
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+        **(headers or {}),
+    }
+    writer.write(_head(status, all_headers) + body)
+    await writer.drain()
+
+
+async def send_json(
+    writer: asyncio.StreamWriter,
+    status: int,
+    payload: Any,
+    *,
+    headers: dict[str, str] | None = None,
+    keep_alive: bool = True,
+) -> None:
+    await send_response(
+        writer,
+        status,
+        json.dumps(payload, separators=(",", ":")),
+        content_type="application/json",
+        headers=headers,
+        keep_alive=keep_alive,
+    )
+
+
+class ChunkedResponse:
+    """A ``Transfer-Encoding: chunked`` response written piece by piece."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+
+    async def start(
+        self,
+        status: int = 200,
+        *,
+        content_type: str = "text/event-stream",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        all_headers = {
+            "Content-Type": content_type,
+            "Transfer-Encoding": "chunked",
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            **(headers or {}),
+        }
+        self._writer.write(_head(status, all_headers))
+        await self._writer.drain()
+
+    async def write(self, data: bytes | str) -> None:
+        if isinstance(data, str):
+            data = data.encode()
+        if data:
+            self._writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await self._writer.drain()
+
+    async def end(self) -> None:
+        self._writer.write(b"0\r\n\r\n")
+        await self._writer.drain()
+
+
+def sse_event(payload: Any) -> bytes:
+    """Encode one server-sent event carrying ``payload`` as JSON."""
+    if isinstance(payload, str):
+        return f"data: {payload}\n\n".encode()
+    return b"data: " + json.dumps(payload, separators=(",", ":")).encode() + b"\n\n"
@@ -0,0 +1,153 @@
+"""Minimal server-side WebSocket (RFC 6455) on top of :mod:`._http`.
+
+Enough for the chat server: the upgrade handshake, text/binary messages
+(including fragmented ones), ping/pong and the close handshake. No
+extensions or subprotocols.
+"""
+
+import asyncio
+import base64
+import hashlib
+import struct
+
+from ._http import HTTPError, Request, _head
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+
+class WebSocketClosed(Exception):
+    def __init__(self, code: int = 1000, reason: str = "") -> None:
+        super().__init__(f"websocket closed ({code}) {reason}".strip())
+        self.code = code
+        self.reason = reason
+
+
+def is_upgrade(request: Request) -> bool:
+    return (
+        request.headers.get("upgrade", "").lower() == "websocket"
+        and "upgrade" in request.headers.get("connection", "").lower()
+    )
+
+
+class WebSocket:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._send_lock = asyncio.Lock()
+        self.closed = False
+
+    @classmethod
+    async def accept(
+        cls, request: Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> "WebSocket":
+        key = request.headers.get("sec-websocket-key")
+        if not key or request.headers.get("sec-websocket-version") != "13":
+            raise HTTPError(400, "bad websocket handshake")
+        accept = base64.b64encode(hashlib.sha1((key + _GUID).encode()).digest()).decode()
+        writer.write(
+            _head(
+                101,
+                {
+                    "Upgrade": "websocket",
+                    "Connection": "Upgrade",
+                    "Sec-WebSocket-Accept": accept,
+                },
+            )
+        )
+        await writer.drain()
+        return cls(reader, writer)
+
+    async def _send_frame(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        async with self._send_lock:
+            self._writer.write(header + payload)
+            # Waits while the client isn't reading: per-connection backpressure.
+            await self._writer.drain()
+
+    async def send(self, message: str | bytes) -> None:
+        if self.closed:
+            raise WebSocketClosed()
+        if isinstance(message, str):
+            await self._send_frame(OP_TEXT, message.encode())
+        else:
+            await self._send_frame(OP_BINARY, message)
+
+    async def _read_frame(self) -> tuple[bool, int, bytes]:
+        first, second = await self._reader.readexactly(2)
+        fin, opcode = bool(first & 0x80), first & 0x0F
+        masked, length = bool(second & 0x80), second & 0x7F
+        if length == 126:
+            (length,) = struct.unpack("!H", await self._reader.readexactly(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", await self._reader.readexactly(8))
+        if length > MAX_MESSAGE_BYTES:
+            raise WebSocketClosed(1009, "message too big")
+        if not masked:
+            raise WebSocketClosed(1002, "client frames must be masked")
+        mask = await self._reader.readexactly(4)
+        data = bytearray(await self._reader.readexactly(length))
+        for i in range(length):
+            data[i] ^= mask[i % 4]
+        return fin, opcode, bytes(data)
+
+    async def recv(self) -> str | bytes:
+        """Next complete message; raises :class:`WebSocketClosed` at the end."""
+        parts: list[bytes] = []
+        message_opcode = None
+        while True:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError) as exc:
+                self.closed = True
+                raise WebSocketClosed(1006, "connection lost") from exc
+            except WebSocketClosed as exc:
+                await self.close(exc.code, exc.reason)
+                raise
+            if opcode == OP_PING:
+                await self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else 1005
+                await self.close(1000 if code == 1005 else code)
+                raise WebSocketClosed(code, payload[2:].decode(errors="replace"))
+            if opcode != OP_CONTINUATION:
+                message_opcode = opcode
+            parts.append(payload)
+            if sum(len(p) for p in parts) > MAX_MESSAGE_BYTES:
+                await self.close(1009, "message too big")
+                raise WebSocketClosed(1009, "message too big")
+            if fin:
+                data = b"".join(parts)
+                if message_opcode != OP_TEXT:
+                    return data
+                try:
+                    return data.decode()
+                except UnicodeDecodeError as exc:
+                    await self.close(1007, "invalid utf-8")
+                    raise WebSocketClosed(1007, "invalid utf-8") from exc
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self._send_frame(OP_CLOSE, struct.pack("!H", code) + reason.encode()[:120])
+        except ConnectionError:
+            pass
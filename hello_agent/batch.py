@@ -0,0 +1,138 @@
+"""Run many independent agent jobs concurrently on one event loop.
+
+Lessons that compare agent variants used to call ``Runner.run_sync`` once per
+variant, so the total latency was the sum of every model round-trip. These
+helpers run the jobs together with bounded concurrency instead, sharing the
+pooled client of :mod:`.clients`, so N variants cost roughly one round-trip::
+
+    results = run_batch_sync([(poet, "What is love?"), (chef, "What is love?")])
+    for r in results:
+        print(r.job.agent.name, r.final_output if r.ok else r.error)
+
+Results come back in job order. A job that fails or times out does not cancel
+the others: its :class:`BatchResult` carries the exception instead.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Sequence
+
+from agents import Agent, RunConfig, Runner, RunResult, TResponseInputItem
+from agents.run import DEFAULT_MAX_TURNS
+
+
+@dataclass
+class BatchJob:
+    """One ``Runner.run`` call: an agent, its input and optional context."""
+
+    agent: Agent[Any]
+    input: str | list[TResponseInputItem]
+    context: Any = None
+    timeout: float | None = None
+    """Per-job timeout in seconds; overrides the batch-wide ``timeout``."""
+
+
+@dataclass
+class BatchResult:
+    job: BatchJob
+    result: RunResult | None = None
+    error: BaseException | None = None
+    elapsed: float = 0.0
+    """Seconds from the job starting (after any concurrency wait) to finishing."""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def final_output(self) -> Any:
+        """The run's final output, or ``None`` if the job failed."""
+        return self.result.final_output if self.result is not None else None
+
+
+JobSpec = BatchJob | tuple[Agent[Any], Any] | tuple[Agent[Any], Any, Any]
+
+
+def _as_job(spec: JobSpec) -> BatchJob:
+    if isinstance(spec, BatchJob):
+        return spec
+    return BatchJob(*spec)
+
+
+async def run_batch(
+    jobs: Iterable[JobSpec],
+    *,
+    concurrency: int = 8,
+    timeout: float | None = None,
+    run_config: RunConfig | None = None,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    fail_fast: bool = False,
+) -> list[BatchResult]:
+    """Run ``jobs`` with at most ``concurrency`` in flight; results keep job order.
+
+    ``jobs`` are :class:`BatchJob` instances or ``(agent, input)`` /
+    ``(agent, input, context)`` tuples. With ``fail_fast`` the first failure
+    cancels the jobs still running; they are reported with a
+    ``CancelledError``, and finished jobs keep their results.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    specs: Sequence[BatchJob] = [_as_job(spec) for spec in jobs]
+    results = [BatchResult(job) for job in specs]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(slot: BatchResult) -> None:
+        job = slot.job
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                slot.result = await asyncio.wait_for(
+                    Runner.run(
+                        job.agent,
+                        job.input,
+                        context=job.context,
+                        max_turns=max_turns,
+                        run_config=run_config,
+                    ),
+                    job.timeout if job.timeout is not None else timeout,
+                )
+            except asyncio.CancelledError as exc:
+                slot.error = exc
+                raise
+            except Exception as exc:
+                slot.error = exc
+                if fail_fast:
+                    raise
+            finally:
+                slot.elapsed = time.perf_counter() - start
+
+    async def cancel_pending() -> None:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for slot in results:
+            if slot.result is None and slot.error is None:
+                # Still waiting on the semaphore when the batch stopped.
+                slot.error = asyncio.CancelledError()
+
+    tasks = [asyncio.ensure_future(one(slot)) for slot in results]
+    try:
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        await cancel_pending()
+        raise
+    except Exception:
+        # Only reachable with fail_fast; the failure is already in its slot.
+        await cancel_pending()
+    return results
+
+
+def run_batch_sync(jobs: Iterable[JobSpec], **kwargs: Any) -> list[BatchResult]:
+    """Synchronous :func:`run_batch`, for scripts that used ``Runner.run_sync``.
+
+    Like ``Runner.run_sync`` it reuses the thread's event loop, so pooled
+    connections stay warm across calls. It cannot be called from inside a
+    running event loop; ``await run_batch(...)`` there instead.
+    """
+    return asyncio.get_event_loop().run_until_complete(run_batch(jobs, **kwargs))
@@ -0,0 +1,9 @@
+"""End-to-end benchmarks for every agent pattern, run against the stand-in model.
+
+See ``python -m hello_agent.bench --help``.
+"""
+
+from .report import Regression, compare, percentile, summarize
+from .workloads import WORKLOADS, Workload
+
+__all__ = ["Regression", "WORKLOADS", "Workload", "compare", "percentile", "summarize"]
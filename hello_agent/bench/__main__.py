@@ -0,0 +1,115 @@
+"""Run the benchmark suite against the local stand-in model.
+
+    python -m hello_agent.bench --out bench.json
+    python -m hello_agent.bench --baseline main.json --threshold 0.15
+
+Every pattern runs in a fresh subprocess against a stub server hosted by
+this process. Results are written as JSON; with ``--baseline`` the exit
+status is 1 when any pattern regressed beyond ``--threshold``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib.metadata import version
+
+from ..stub_server import StubServerThread, add_arguments, config_from_args
+from . import report
+from .workloads import STUB_REPLIES, WORKLOADS
+
+
+def _worker(args: argparse.Namespace) -> None:
+    from .runner import run_workload
+
+    result = asyncio.run(
+        run_workload(
+            args.worker,
+            iterations=args.iterations,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+        )
+    )
+    print(json.dumps(result))
+
+
+def _run_pattern(name: str, args: argparse.Namespace, base_url: str) -> dict:
+    env = {
+        **os.environ,
+        "GEMINI_BASE_URL": base_url,
+        "GEMINI_API_KEY": "stub",
+        "GEMINI_MODEL": "stub",
+    }
+    command = [
+        sys.executable, "-m", "hello_agent.bench",
+        "--worker", name,
+        "--iterations", str(args.iterations),
+        "--concurrency", str(args.concurrency),
+        "--warmup", str(args.warmup),
+    ]  # fmt: skip
+    proc = subprocess.run(command, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} benchmark failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every agent pattern offline.")
+    parser.add_argument("patterns", nargs="*", choices=[[], *WORKLOADS], default=[])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--out", default="bench.json", help="where to write the JSON report")
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    add_arguments(parser)
+    parser.set_defaults(latency="0.01")
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args)
+        return
+
+    stub_config = config_from_args(args)
+    stub_config.replies = [*STUB_REPLIES, *stub_config.replies]
+    patterns = args.patterns or list(WORKLOADS)
+
+    results = {}
+    with StubServerThread(stub_config) as stub:
+        for name in patterns:
+            print(f"running {name} ...", file=sys.stderr)
+            results[name] = _run_pattern(name, args, stub.base_url)
+
+    current = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "openai_agents": version("openai-agents"),
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "stub": {"latency": args.latency, "ttft": args.ttft, "tps": args.tps},
+        },
+        "results": results,
+    }
+    report.dump(current, args.out)
+    print(report.format_table(current))
+    print(f"\nwrote {args.out}")
+
+    if args.baseline:
+        regressions = report.compare(
+            current, report.load(args.baseline), threshold=args.threshold
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
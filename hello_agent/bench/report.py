@@ -0,0 +1,137 @@
+"""Summaries, JSON reports and regression checks for benchmark runs."""
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Any
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (``pct`` in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "mean": round(sum(values) / len(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+DEFAULT_GATES: tuple[str, ...] = (
+    "latency_ms.p50",
+    "latency_ms.p95",
+    "latency_ms.p99",
+    "overhead_ms_per_turn.p50",
+    "overhead_ms_per_turn.p95",
+    "peak_rss_mb",
+)
+"""Metrics where "higher is worse" and a regression fails the run."""
+
+
+@dataclass
+class Regression:
+    pattern: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else math.inf
+
+    def __str__(self) -> str:
+        change = f" ({self.change:+.1%})" if self.baseline else ""
+        return f"{self.pattern}: {self.metric} {self.baseline:g} -> {self.current:g}{change}"
+
+
+def _lookup(result: dict[str, Any], metric: str) -> float | None:
+    value: Any = result
+    for part in metric.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return float(value)
+
+
+def error_rate(result: dict[str, Any]) -> float:
+    """Share of attempted runs that failed."""
+    errors = result.get("errors", 0)
+    attempted = result.get("runs", 0) + errors
+    return errors / attempted if attempted else 0.0
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    *,
+    threshold: float = 0.10,
+    gates: tuple[str, ...] = DEFAULT_GATES,
+    min_absolute: float = 0.5,
+) -> list[Regression]:
+    """List metrics that got worse than ``baseline`` by more than ``threshold``.
+
+    ``min_absolute`` ignores changes smaller than that many units (ms / MB),
+    so sub-millisecond jitter on fast patterns does not fail a run.
+
+    Errors always fail: failed runs are left out of the latency figures, so
+    a pattern that fails fast would otherwise look like a speed-up. A
+    pattern with no successful runs fails too, baseline or not.
+    """
+    regressions = []
+    for pattern, result in current.get("results", {}).items():
+        base = baseline.get("results", {}).get(pattern)
+        if not result.get("runs"):
+            regressions.append(
+                Regression(pattern, "runs", float(base.get("runs", 0)) if base else 0.0, 0.0)
+            )
+            continue
+        if result.get("errors", 0) > 0:
+            before = error_rate(base) if base is not None else 0.0
+            regressions.append(Regression(pattern, "error_rate", before, error_rate(result)))
+        if base is None:
+            continue
+        for metric in gates:
+            now, before = _lookup(result, metric), _lookup(base, metric)
+            if now is None or before is None:
+                continue
+            if now - before > max(before * threshold, min_absolute):
+                regressions.append(Regression(pattern, metric, before, now))
+    return regressions
+
+
+def format_table(report: dict[str, Any]) -> str:
+    header = (
+        f"{'pattern':<16}{'runs':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'rps':>9}{'turns':>7}{'ovh/turn':>10}{'rss MB':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, r in report["results"].items():
+        lines.append(
+            f"{name:<16}{r['runs']:>6}{r['errors']:>5}"
+            f"{r['latency_ms']['p50']:>10.1f}{r['latency_ms']['p95']:>10.1f}"
+            f"{r['latency_ms']['p99']:>10.1f}{r['throughput_rps']:>9.1f}"
+            f"{r['model_calls_per_run']:>7.1f}{r['overhead_ms_per_turn']['p50']:>10.2f}"
+            f"{r['peak_rss_mb']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def dump(report: dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+        fh.write("\n")
@@ -0,0 +1,88 @@
+"""Drives one workload and measures it.
+
+Each workload runs in its own process (see ``__main__``) so peak RSS and
+import side effects of one pattern don't leak into the next.
+"""
+
+import asyncio
+import sys
+import time
+from typing import Any
+
+from agents import set_tracing_disabled
+
+from ..clients import get_model
+from .report import summarize
+from .timing import RunTimer, TimedModel, current_timer
+from .workloads import WORKLOADS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, or 0 where unsupported."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def run_workload(
+    name: str,
+    *,
+    iterations: int = 200,
+    concurrency: int = 10,
+    warmup: int = 5,
+) -> dict[str, Any]:
+    set_tracing_disabled(True)
+    model = TimedModel(get_model())
+    run_once = WORKLOADS[name].build(model)
+
+    for i in range(warmup):
+        await run_once(i)
+
+    latencies: list[float] = []
+    overheads: list[float] = []
+    model_calls = 0
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal model_calls, errors
+        async with semaphore:
+            timer = RunTimer()
+            token = current_timer.set(timer)
+            start = time.perf_counter()
+            try:
+                await run_once(i)
+            except Exception:
+                errors += 1
+                return
+            finally:
+                current_timer.reset(token)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed * 1000)
+            model_calls += timer.model_calls
+            if timer.model_calls:
+                overhead = (elapsed - timer.model_seconds) / timer.model_calls
+                overheads.append(overhead * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    wall = time.perf_counter() - started
+
+    completed = len(latencies)
+    return {
+        "lesson": WORKLOADS[name].lesson,
+        "runs": completed,
+        "errors": errors,
+        "latency_ms": summarize(latencies),
+        "overhead_ms_per_turn": summarize(overheads),
+        "model_calls_per_run": round(model_calls / completed, 2) if completed else 0.0,
+        "throughput_rps": round(completed / wall, 2) if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
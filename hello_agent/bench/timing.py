@@ -0,0 +1,69 @@
+"""Per-run model timing, used to separate framework overhead from model time."""
+
+import contextvars
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from agents.models.interface import Model
+
+
+@dataclass
+class RunTimer:
+    """Accumulates how long a run spent waiting on the model.
+
+    Model calls can overlap (guardrail agents run alongside the main agent,
+    agents-as-tools run nested), so only the *union* of busy intervals is
+    counted: the clock runs while at least one call is in flight.
+    """
+
+    model_calls: int = 0
+    model_seconds: float = 0.0
+    _active: int = 0
+    _busy_since: float = 0.0
+
+    def enter(self) -> None:
+        self.model_calls += 1
+        if self._active == 0:
+            self._busy_since = time.perf_counter()
+        self._active += 1
+
+    def exit(self) -> None:
+        self._active -= 1
+        if self._active == 0:
+            self.model_seconds += time.perf_counter() - self._busy_since
+
+
+current_timer: contextvars.ContextVar[RunTimer | None] = contextvars.ContextVar(
+    "hello_agent_bench_timer", default=None
+)
+
+
+class TimedModel(Model):
+    """Wraps a model and reports its calls to the run's :class:`RunTimer`."""
+
+    def __init__(self, model: Model) -> None:
+        self.model = model
+
+    async def get_response(self, *args, **kwargs):
+        timer = current_timer.get()
+        if timer is None:
+            return await self.model.get_response(*args, **kwargs)
+        timer.enter()
+        try:
+            return await self.model.get_response(*args, **kwargs)
+        finally:
+            timer.exit()
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        timer = current_timer.get()
+        if timer is None:
+            async for event in self.model.stream_response(*args, **kwargs):
+                yield event
+            return
+        timer.enter()
+        try:
+            async for event in self.model.stream_response(*args, **kwargs):
+                yield event
+        finally:
+            timer.exit()
@@ -0,0 +1,268 @@
+"""Representative workloads, one per agent pattern the lessons demonstrate.
+
+Each workload mirrors a lesson script (same agents, tools and prompts) but
+builds its agents on demand so the module can be imported without running
+anything. ``run_once`` performs one complete user interaction and returns
+when its final output is available.
+"""
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    RunConfig,
+    RunContextWrapper,
+    Runner,
+    SQLiteSession,
+    function_tool,
+    handoff,
+    input_guardrail,
+    output_guardrail,
+)
+from agents.models.interface import Model
+from pydantic import BaseModel
+
+from ..stub_server import ScriptedReply
+
+
+@dataclass
+class Workload:
+    name: str
+    lesson: str
+    build: Callable[[Model], Callable[[int], Awaitable[Any]]]
+    """Given the model to use, return ``run_once(iteration)``."""
+
+
+def _plain(model: Model):
+    # main.py
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=model)
+
+    async def run_once(i: int):
+        return await Runner.run(agent, "Write a haiku about recursion in programming.")
+
+    return run_once
+
+
+def _tools(model: Model):
+    # basic_tools.py
+    @function_tool
+    def multiply(a: int, b: int) -> int:
+        """Exact multiplication (use this instead of guessing math)."""
+        return a * b
+
+    @function_tool
+    def sum(a: int, b: int) -> int:
+        """Exact addition (use this instead of guessing math)."""
+        return a + b
+
+    agent = Agent(
+        name="Assistant",
+        instructions=(
+            "You are a helpful assistant. Always use tools for math questions. "
+            "Always follow DMAS rule (division, multiplication, addition, subtraction)."
+        ),
+        model=model,
+        tools=[multiply, sum],
+    )
+
+    async def run_once(i: int):
+        return await Runner.run(agent, "what is 19 + 23 * 2?")
+
+    return run_once
+
+
+def _handoffs(model: Model):
+    # basic_handsoff/2.py
+    billing_agent = Agent(
+        name="Billing Agent",
+        instructions="Resolve billing problems end-to-end. Ask for any details you need.",
+    )
+    refunds_agent = Agent(
+        name="Refunds Agent",
+        instructions="Handle refunds end-to-end. Ask for order ID and explain next steps.",
+    )
+    triage = Agent(
+        name="Triage Agent",
+        instructions=(
+            "Greet the user and decide where to send them:\n"
+            "- If the user asks about a double charge, invoice, payment, etc., hand off to Billing Agent.\n"
+            "- If the user asks about refund status or returning an item, hand off to Refunds Agent.\n"
+        ),
+        handoffs=[billing_agent, handoff(refunds_agent)],
+    )
+    run_config = RunConfig(model=model)
+    prompts = [
+        "Hi, I returned my headset last week. What's my refund status?",
+        "My card was charged twice for the same order, it is a billing problem.",
+    ]
+
+    async def run_once(i: int):
+        return await Runner.run(triage, prompts[i % len(prompts)], run_config=run_config)
+
+    return run_once
+
+
+def _agents_as_tool(model: Model):
+    # agents_as_tool.py
+    spanish = Agent(
+        name="Spanish Translator",
+        instructions="Translate what the user says into Spanish. Only output Spanish.",
+        model=model,
+    )
+    summarizer = Agent(
+        name="Summarizer",
+        instructions="Summarize the given text in 2 short bullet points.",
+        model=model,
+    )
+
+    @function_tool
+    async def translate_to_spanish(query: str) -> str:
+        result = await Runner.run(spanish, query, max_turns=3)
+        return result.final_output
+
+    @function_tool
+    async def summarize_text(query: str) -> str:
+        result = await Runner.run(summarizer, query, max_turns=2)
+        return result.final_output
+
+    coach = Agent(
+        name="Writing Coach",
+        instructions=(
+            "You help users improve messages.\n"
+            "- If they say 'translate to Spanish', call translate_to_spanish.\n"
+            "- If they say 'summarize', call summarize_text.\n"
+            "- Otherwise, give a short tip."
+        ),
+        tools=[translate_to_spanish, summarize_text],
+        model=model,
+    )
+    prompts = [
+        "Please translate to Spanish: I love learning with hands-on examples.",
+        "Summarize text: Large language models help with drafting, coding, and research.",
+        "How can I make my email more polite?",
+    ]
+
+    async def run_once(i: int):
+        return await Runner.run(coach, prompts[i % len(prompts)])
+
+    return run_once
+
+
+class WeatherSanitizer(BaseModel):
+    weather_related: bool
+    reason: str | None = None
+
+
+def _guardrails(model: Model):
+    # guardrails.py
+    run_config = RunConfig(model=model, tracing_disabled=True)
+    weather_sanitizer = Agent(
+        name="Weather Sanitizer",
+        instructions="Check if this is a weather related query",
+        output_type=WeatherSanitizer,
+    )
+    weather_output_sanitizer = Agent(
+        name="Weather Output Sanitizer",
+        instructions="Check if the output has only weather related answer with no sensitive or irrelevant data",
+        output_type=WeatherSanitizer,
+    )
+
+    @input_guardrail
+    async def weather_input_checker(ctx: RunContextWrapper, agent: Agent, input_data):
+        result = await Runner.run(weather_sanitizer, input_data, run_config=run_config)
+        return GuardrailFunctionOutput(
+            output_info="passed",
+            tripwire_triggered=result.final_output.weather_related is False,
+        )
+
+    @output_guardrail
+    async def weather_response_checker(ctx: RunContextWrapper, agent: Agent, output):
+        result = await Runner.run(weather_output_sanitizer, output, run_config=run_config)
+        return GuardrailFunctionOutput(
+            output_info="passed",
+            tripwire_triggered=result.final_output.weather_related is False,
+        )
+
+    base_agent = Agent(
+        name="Weather Agent",
+        instructions="You are a helpful assistant.",
+        input_guardrails=[weather_input_checker],
+        output_guardrails=[weather_response_checker],
+    )
+
+    async def run_once(i: int):
+        return await Runner.run(
+            base_agent,
+            [{"role": "user", "content": "What's the weather like in SF?"}],
+            run_config=run_config,
+        )
+
+    return run_once
+
+
+def _streaming(model: Model):
+    # streaming.py, without the blocking search tool
+    agent = Agent(
+        name="Genius",
+        instructions="You are a math expert. Please assist with math-related queries.",
+        model=model,
+    )
+
+    async def run_once(i: int):
+        result = Runner.run_streamed(agent, "Explain the Pythagorean theorem briefly.")
+        async for _ in result.stream_events():
+            pass
+        return result
+
+    return run_once
+
+
+def _sessions(model: Model):
+    # session_memory/1.py
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant. Be friendly and remember our conversation.",
+        model=model,
+    )
+
+    async def run_once(i: int):
+        session = SQLiteSession(f"bench_{i}")
+        try:
+            await Runner.run(agent, "Hi! My name is Talha and I love pizza.", session=session)
+            await Runner.run(agent, "What's my name?", session=session)
+            return await Runner.run(agent, "What food do I like?", session=session)
+        finally:
+            session.close()
+
+    return run_once
+
+
+WORKLOADS: dict[str, Workload] = {
+    w.name: w
+    for w in (
+        Workload("plain", "main.py", _plain),
+        Workload("tools", "basic_tools.py", _tools),
+        Workload("handoffs", "basic_handsoff/2.py", _handoffs),
+        Workload("agents_as_tool", "agents_as_tool.py", _agents_as_tool),
+        Workload("guardrails", "guardrails.py", _guardrails),
+        Workload("streaming", "streaming.py", _streaming),
+        Workload("sessions", "session_memory/1.py", _sessions),
+    )
+}
+
+STUB_REPLIES: list[ScriptedReply] = [
+    # basic_tools.py: both tool calls in one turn, then the final answer.
+    ScriptedReply(
+        pattern=r"19 \+ 23 \* 2",
+        after_tool=False,
+        tool_calls=[
+            {"name": "multiply", "arguments": {"a": 23, "b": 2}},
+            {"name": "sum", "arguments": {"a": 19, "b": 46}},
+        ],
+    ),
+    ScriptedReply(pattern=r"19 \+ 23 \* 2", after_tool=True, content="19 + 23 * 2 = 65"),
+]
+"""Scripted stand-in replies the workloads rely on."""
@@ -0,0 +1,482 @@
+"""Multi-tenant asyncio chat server for the lesson agents (HTTP + WebSocket).
+
+``agent_lifecycle/chat_loop.py`` serves one user from a terminal. This hosts
+the same WeatherAgent/NewsAgent pair (or any agent given as
+``module:attribute``) for many concurrent conversations in one process::
+
+    python -m hello_agent.chat_server --port 8000 --max-runs 64 --max-queue 256
+
+Routes:
+
+* ``POST /sessions`` – create a conversation, returns ``{"session_id"}``
+* ``POST /sessions/{id}/messages`` – ``{"message": "...", "stream": bool}``;
+  answers JSON, or server-sent events (``delta`` / ``done`` / ``error``)
+  when streaming. Unknown ids start a new conversation.
+* ``GET /sessions/{id}`` / ``DELETE /sessions/{id}`` – history / forget
+* ``GET /ws?session={id}`` – WebSocket; send ``{"message": "..."}``, receive
+  the same ``delta`` / ``done`` / ``error`` events as JSON messages
+* ``GET /healthz``, ``GET /stats`` (with ``--watchdog``, also event-loop
+  lag and stalls; see :mod:`hello_agent.watchdog`)
+
+Each conversation keeps its own :class:`~hello_agent.history.ConversationHistory`
+and runs one turn at a time; the shared :class:`~hello_agent.compaction.Compactor`
+keeps long conversations within the prompt budget. At most ``max_runs`` turns
+run at once and at most ``max_queue`` more wait; beyond that requests are
+refused straight away (HTTP 503 with ``Retry-After``, or an ``error`` event)
+instead of piling up latency. Idle conversations are evicted after
+``session_ttl`` seconds or when ``max_sessions`` is reached.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import re
+import secrets
+import signal
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent, RunConfig, Runner, set_tracing_disabled
+from openai.types.responses import ResponseTextDeltaEvent
+
+from ._http import ChunkedResponse, HTTPError, Request, read_request, send_json, sse_event
+from ._websocket import WebSocket, WebSocketClosed, is_upgrade
+from .clients import aclose_loop_connections, pool_stats
+from .compaction import Compactor
+from .history import ConversationHistory
+from .watchdog import LoopWatchdog
+
+DEFAULT_AGENT = "agent_lifecycle.chat_loop:base_agent"
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_SESSION_PATH = re.compile(r"^/sessions/([^/]+)(/messages)?$")
+
+
+class Overloaded(Exception):
+    """The run queue is full; the client should retry later."""
+
+
+@dataclass
+class ServerConfig:
+    max_runs: int = 64
+    """Turns executing at once (model calls in flight)."""
+    max_queue: int = 256
+    """Turns allowed to wait for a run slot before new ones are refused."""
+    max_sessions: int = 10_000
+    session_ttl: float = 1800.0
+    turn_timeout: float = 120.0
+    budget_tokens: int = 6000
+    """Prompt budget per turn; older history is summarized beyond it."""
+    watchdog_threshold: float | None = None
+    """Report event-loop stalls longer than this many seconds; ``None`` is off."""
+
+
+@dataclass
+class ServerStats:
+    turns_started: int = 0
+    turns_completed: int = 0
+    turns_failed: int = 0
+    turns_rejected: int = 0
+    running: int = 0
+    queued: int = 0
+    sessions_evicted: int = 0
+
+
+@dataclass
+class ChatSession:
+    id: str
+    history: ConversationHistory = field(default_factory=ConversationHistory)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+def load_agent(spec: str) -> Agent[Any]:
+    """Import ``module:attribute`` and return the agent it names."""
+    module_name, _, attribute = spec.partition(":")
+    agent = getattr(importlib.import_module(module_name), attribute or "agent")
+    if not isinstance(agent, Agent):
+        raise TypeError(f"{spec} is not an Agent")
+    return agent
+
+
+class ChatServer:
+    def __init__(self, agent: Agent[Any], config: ServerConfig | None = None) -> None:
+        self.agent = agent
+        self.config = config or ServerConfig()
+        self.stats = ServerStats()
+        self.compactor = Compactor(budget_tokens=self.config.budget_tokens)
+        self.run_config = RunConfig(
+            call_model_input_filter=self.compactor.call_model_input_filter
+        )
+        self._sessions: OrderedDict[str, ChatSession] = OrderedDict()
+        self._slots = asyncio.Semaphore(self.config.max_runs)
+        self._server: asyncio.Server | None = None
+        self._connections: set[asyncio.Task[None]] = set()
+        self._draining = False
+        self.watchdog = (
+            LoopWatchdog(threshold=self.config.watchdog_threshold)
+            if self.config.watchdog_threshold is not None
+            else None
+        )
+
+    # -- sessions ---------------------------------------------------------
+
+    def _evict(self, room: int = 0) -> None:
+        """Drop expired, then least recently used, conversations until ``room`` more fit.
+
+        Conversations in the middle of a turn are skipped, never dropped.
+        """
+        deadline = time.monotonic() - self.config.session_ttl
+        excess = len(self._sessions) + room - self.config.max_sessions
+        for chat in list(self._sessions.values()):
+            if chat.last_used > deadline and excess <= 0:
+                break
+            if chat.lock.locked():
+                continue
+            del self._sessions[chat.id]
+            excess -= 1
+            self.stats.sessions_evicted += 1
+
+    @staticmethod
+    def _check_id(session_id: str) -> None:
+        if not _SESSION_ID.match(session_id):
+            raise HTTPError(400, "invalid session id")
+
+    def session(self, session_id: str | None = None) -> ChatSession:
+        """Return (creating if needed) the conversation ``session_id``."""
+        if session_id is None:
+            session_id = secrets.token_urlsafe(12)
+        else:
+            self._check_id(session_id)
+        chat = self._sessions.get(session_id)
+        if chat is None:
+            self._evict(room=1)
+            chat = self._sessions[session_id] = ChatSession(session_id)
+        chat.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return chat
+
+    def _admit(self) -> None:
+        """Raise :class:`Overloaded` if a new turn would be refused."""
+        if self._draining:
+            raise Overloaded("server is shutting down")
+        if self._slots.locked() and self.stats.queued >= self.config.max_queue:
+            self.stats.turns_rejected += 1
+            raise Overloaded("too many requests in flight")
+
+    # -- turns ------------------------------------------------------------
+
+    async def turn(self, chat: ChatSession, message: str) -> AsyncIterator[dict[str, Any]]:
+        """Run one user turn, yielding ``delta`` events then ``done``.
+
+        Raises :class:`Overloaded` before doing anything if the queue is
+        full. Closing the generator early cancels the run.
+        """
+        self._admit()
+        self.stats.queued += 1
+        try:
+            # One turn at a time per conversation, then a global run slot.
+            await chat.lock.acquire()
+            try:
+                await self._slots.acquire()
+            except BaseException:
+                chat.lock.release()
+                raise
+        finally:
+            self.stats.queued -= 1
+
+        self.stats.running += 1
+        self.stats.turns_started += 1
+        result = None
+        completed = False
+        try:
+            result = Runner.run_streamed(
+                self.agent,
+                run_config=self.run_config,
+                **chat.history.next_turn(message),
+            )
+            async with asyncio.timeout(self.config.turn_timeout):
+                async for event in result.stream_events():
+                    if (
+                        event.type == "raw_response_event"
+                        and isinstance(event.data, ResponseTextDeltaEvent)
+                        and event.data.delta
+                    ):
+                        yield {"type": "delta", "text": event.data.delta}
+            stats = chat.history.record(result)
+            self.stats.turns_completed += 1
+            completed = True
+            yield {
+                "type": "done",
+                "session_id": chat.id,
+                "reply": str(result.final_output),
+                "agent": result.last_agent.name,
+                "turn": stats.turn,
+                "input_tokens": stats.input_tokens,
+                "output_tokens": stats.output_tokens,
+            }
+        except BaseException:
+            if not completed:
+                self.stats.turns_failed += 1
+                if result is not None and not result.is_complete:
+                    result.cancel()
+            raise
+        finally:
+            chat.last_used = time.monotonic()
+            self.stats.running -= 1
+            self._slots.release()
+            chat.lock.release()
+
+    # -- HTTP -------------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        if self.watchdog is not None:
+            self.watchdog.start()
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, backlog=4096
+        )
+        return self._server
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None, "server not started"
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        server = await self.start(host, port)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):  # Windows
+                pass
+        await stop.wait()
+        await self.shutdown()
+        await server.wait_closed()
+
+    async def shutdown(self, grace: float = 30.0) -> None:
+        """Stop accepting work and let running turns finish for ``grace`` seconds."""
+        self._draining = True
+        if self._server is not None:
+            self._server.close()
+        deadline = time.monotonic() + grace
+        while self.stats.running and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self.watchdog is not None:
+            await self.watchdog.stop()
+        await aclose_loop_connections()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as exc:
+                    await send_json(writer, exc.status, {"error": str(exc)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                upgrade = is_upgrade(request)
+                try:
+                    if upgrade:
+                        await self._websocket(request, reader, writer)
+                    else:
+                        await self._dispatch(request, writer)
+                except HTTPError as exc:
+                    # Only raised before a response has started (for an
+                    # upgrade: before the handshake), so a JSON error fits.
+                    await send_json(
+                        writer, exc.status, {"error": str(exc)}, keep_alive=not upgrade
+                    )
+                if upgrade or not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        method, path = request.method, request.path
+        if method == "GET" and path == "/healthz":
+            status = 503 if self._draining else 200
+            await send_json(writer, status, {"ok": not self._draining})
+        elif method == "GET" and path == "/stats":
+            await send_json(
+                writer,
+                200,
+                {
+                    **self.stats.__dict__,
+                    "sessions": len(self._sessions),
+                    "compaction": self.compactor.stats.__dict__,
+                    "pool": {
+                        k: v for k, v in pool_stats().__dict__.items() if k != "per_client"
+                    },
+                    **({"loop": self.watchdog.snapshot()} if self.watchdog is not None else {}),
+                },
+            )
+        elif method == "POST" and path == "/sessions":
+            await send_json(writer, 201, {"session_id": self.session().id})
+        elif match := _SESSION_PATH.match(path):
+            session_id, messages = match.groups()
+            if messages and method == "POST":
+                await self._post_message(session_id, request, writer)
+            elif not messages and method == "GET":
+                chat = self._sessions.get(session_id)
+                if chat is None:
+                    raise HTTPError(404, "no such session")
+                await send_json(writer, 200, {"session_id": chat.id, "items": chat.history.items})
+            elif not messages and method == "DELETE":
+                self._sessions.pop(session_id, None)
+                await send_json(writer, 200, {"deleted": session_id})
+            else:
+                raise HTTPError(405)
+        else:
+            raise HTTPError(404, f"no route {method} {path}")
+
+    @staticmethod
+    def _message_of(payload: Any) -> str:
+        message = payload.get("message") if isinstance(payload, dict) else None
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, '"message" must be a non-empty string')
+        return message
+
+    async def _post_message(
+        self, session_id: str, request: Request, writer: asyncio.StreamWriter
+    ) -> None:
+        self._check_id(session_id)
+        payload = request.json()
+        message = self._message_of(payload)
+        try:
+            # Refuse before creating the conversation: rejected requests
+            # must not fill the session table and evict real ones.
+            self._admit()
+        except Overloaded as exc:
+            await send_json(writer, 503, {"error": str(exc)}, headers={"Retry-After": "1"})
+            return
+        chat = self.session(session_id)
+        turn = self.turn(chat, message)
+        if not payload.get("stream"):
+            try:
+                done = [event async for event in turn if event["type"] == "done"][-1]
+            except Overloaded as exc:
+                await send_json(writer, 503, {"error": str(exc)}, headers={"Retry-After": "1"})
+            except Exception as exc:
+                await send_json(writer, 500, {"error": f"{type(exc).__name__}: {exc}"})
+            else:
+                await send_json(writer, 200, done)
+            return
+
+        try:
+            first = await anext(turn)
+        except Overloaded as exc:
+            await send_json(writer, 503, {"error": str(exc)}, headers={"Retry-After": "1"})
+            return
+        except Exception as exc:
+            await send_json(writer, 500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        response = ChunkedResponse(writer)
+        await response.start(headers={"X-Session-Id": chat.id})
+        try:
+            await response.write(sse_event(first))
+            async for event in turn:
+                await response.write(sse_event(event))
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away: closing the generator cancels the run.
+            await turn.aclose()
+            raise
+        except Exception as exc:
+            error = {"type": "error", "error": f"{type(exc).__name__}: {exc}"}
+            await response.write(sse_event(error))
+        await response.end()
+
+    # -- WebSocket --------------------------------------------------------
+
+    async def _websocket(
+        self, request: Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        if request.path != "/ws":
+            raise HTTPError(404, f"no route {request.method} {request.path}")
+        chat = self.session(request.query.get("session"))
+        ws = await WebSocket.accept(request, reader, writer)
+        await ws.send(json.dumps({"type": "session", "session_id": chat.id}))
+        try:
+            while True:
+                raw = await ws.recv()
+                try:
+                    message = self._message_of(json.loads(raw))
+                except (HTTPError, ValueError) as exc:
+                    await ws.send(json.dumps({"type": "error", "error": str(exc)}))
+                    continue
+                turn = self.turn(chat, message)
+                try:
+                    async for event in turn:
+                        await ws.send(json.dumps(event))
+                except Overloaded as exc:
+                    await ws.send(json.dumps({"type": "error", "error": str(exc), "retry": True}))
+                except WebSocketClosed:
+                    raise
+                except (ConnectionError, asyncio.CancelledError):
+                    await turn.aclose()
+                    raise
+                except Exception as exc:
+                    await ws.send(
+                        json.dumps({"type": "error", "error": f"{type(exc).__name__}: {exc}"})
+                    )
+        except WebSocketClosed:
+            pass
+        finally:
+            await ws.close(1001 if self._draining else 1000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--agent", default=DEFAULT_AGENT, help="module:attribute of the agent")
+    parser.add_argument("--max-runs", type=int, default=ServerConfig.max_runs)
+    parser.add_argument("--max-queue", type=int, default=ServerConfig.max_queue)
+    parser.add_argument("--max-sessions", type=int, default=ServerConfig.max_sessions)
+    parser.add_argument("--session-ttl", type=float, default=ServerConfig.session_ttl)
+    parser.add_argument("--turn-timeout", type=float, default=ServerConfig.turn_timeout)
+    parser.add_argument("--budget-tokens", type=int, default=ServerConfig.budget_tokens)
+    parser.add_argument(
+        "--watchdog",
+        type=float,
+        metavar="SECONDS",
+        help="report event-loop stalls longer than this (shown under /stats)",
+    )
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    server = ChatServer(
+        load_agent(args.agent),
+        ServerConfig(
+            max_runs=args.max_runs,
+            max_queue=args.max_queue,
+            max_sessions=args.max_sessions,
+            session_ttl=args.session_ttl,
+            turn_timeout=args.turn_timeout,
+            budget_tokens=args.budget_tokens,
+            watchdog_threshold=args.watchdog,
+        ),
+    )
+    print(f"Chat server for {args.agent} on http://{args.host}:{args.port}")
+    asyncio.run(server.serve_forever(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Shared, pooled OpenAI-compatible clients and chat-completions models.
+
+Every lesson used to build its own ``AsyncOpenAI`` + ``OpenAIChatCompletionsModel``
+at import time. This module hands out cached clients instead, all sharing one
+tunable HTTP connection pool, so repeated ``Runner.run`` calls reuse warm
+keep-alive connections instead of paying a TCP/TLS handshake per burst.
+
+Defaults (key, base URL, model, pool tuning) come from :mod:`.config`, which
+resolves ``.env`` and the ``GEMINI_*`` variables once per process.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from dataclasses import dataclass, field
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from agents import Model, OpenAIChatCompletionsModel
+
+from .config import PoolConfig, get_settings
+
+
+@dataclass
+class PoolStats:
+    """Point-in-time view of the shared connection pools."""
+
+    event_loops: int = 0
+    open_connections: int = 0
+    idle_connections: int = 0
+    active_connections: int = 0
+    in_flight_requests: int = 0
+    total_requests: int = 0
+    connections_opened: int = 0
+    tls_handshakes: int = 0
+    per_client: dict[str, "PoolStats"] = field(default_factory=dict)
+
+    def __add__(self, other: "PoolStats") -> "PoolStats":
+        return PoolStats(
+            event_loops=self.event_loops + other.event_loops,
+            open_connections=self.open_connections + other.open_connections,
+            idle_connections=self.idle_connections + other.idle_connections,
+            active_connections=self.active_connections + other.active_connections,
+            in_flight_requests=self.in_flight_requests + other.in_flight_requests,
+            total_requests=self.total_requests + other.total_requests,
+            connections_opened=self.connections_opened + other.connections_opened,
+            tls_handshakes=self.tls_handshakes + other.tls_handshakes,
+        )
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body wrapper that marks the request finished once closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close) -> None:
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """An ``httpx`` transport with one connection pool per running event loop.
+
+    ``httpx`` connections are bound to the loop that opened them, while the
+    lessons mix ``Runner.run_sync`` and ``asyncio.run``. Keeping a pool per
+    loop lets a single client be shared safely by all of them, while every
+    loop still reuses its own keep-alive connections across runs.
+    """
+
+    def __init__(self, config: PoolConfig) -> None:
+        self.config = config
+        self._pools: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._total_requests = 0
+        self._connections_opened = 0
+        self._tls_handshakes = 0
+
+    def _new_pool(self) -> httpx.AsyncHTTPTransport:
+        http2 = self.config.http2 and importlib.util.find_spec("h2") is not None
+        return httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            ),
+            http2=http2,
+        )
+
+    def _prune_closed_loops(self) -> None:
+        # Connections of a finished ``asyncio.run`` can never be reused.
+        for loop in [loop for loop in self._pools if loop.is_closed()]:
+            del self._pools[loop]
+
+    def _pool_for_running_loop(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.get(loop)
+            if pool is None:
+                self._prune_closed_loops()
+                pool = self._pools[loop] = self._new_pool()
+            return pool
+
+    async def _trace(self, event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            with self._lock:
+                self._connections_opened += 1
+        elif event == "connection.start_tls.complete":
+            with self._lock:
+                self._tls_handshakes += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        pool = self._pool_for_running_loop()
+        request.extensions.setdefault("trace", self._trace)
+        with self._lock:
+            self._in_flight += 1
+            self._total_requests += 1
+        try:
+            response = await pool.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, self._release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        """Close the pools of the running loop and of every other running loop.
+
+        Connections are bound to their loop, so other loops' pools are
+        closed on those loops, without waiting for them. A pool whose loop
+        is stopped but not closed can't be closed from here; it is kept so
+        that loop can still call :meth:`aclose_loop` once it runs again.
+        """
+        current = asyncio.get_running_loop()
+        with self._lock:
+            self._prune_closed_loops()
+            pools = {
+                loop: pool
+                for loop, pool in self._pools.items()
+                if loop is current or loop.is_running()
+            }
+            for loop in pools:
+                del self._pools[loop]
+        for loop, pool in pools.items():
+            if loop is current:
+                continue
+            try:
+                asyncio.run_coroutine_threadsafe(pool.aclose(), loop)
+            except RuntimeError:
+                pass  # the loop closed meanwhile
+        if current in pools:
+            await pools[current].aclose()
+
+    async def aclose_loop(self) -> None:
+        """Close only the running loop's pool, e.g. before that loop shuts down."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.pop(loop, None)
+        if pool is not None:
+            await pool.aclose()
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            self._prune_closed_loops()
+            pools = list(self._pools.values())
+            stats = PoolStats(
+                event_loops=len(pools),
+                in_flight_requests=self._in_flight,
+                total_requests=self._total_requests,
+                connections_opened=self._connections_opened,
+                tls_handshakes=self._tls_handshakes,
+            )
+        for pool in pools:
+            connections = list(getattr(pool._pool, "connections", []))
+            idle = sum(1 for conn in connections if conn.is_idle())
+            stats.open_connections += len(connections)
+            stats.idle_connections += idle
+            stats.active_connections += len(connections) - idle
+        return stats
+
+
+_clients: dict[tuple, AsyncOpenAI] = {}
+_transports: dict[tuple, PooledTransport] = {}
+_models: dict[tuple, OpenAIChatCompletionsModel] = {}
+_registry_lock = threading.Lock()
+
+
+def get_client(
+    *,
+    api_key: str | None = None,
+    base_url: str | None = None,
+    pool: PoolConfig | None = None,
+) -> AsyncOpenAI:
+    """Return the shared ``AsyncOpenAI`` client for this endpoint.
+
+    ``api_key``, ``base_url`` and ``pool`` default to the resolved
+    :func:`~hello_agent.config.get_settings`. Calls with the same endpoint and
+    pool settings get the same client back, so every agent in the process
+    shares its pool.
+    """
+    settings = get_settings()
+    if api_key is None:
+        api_key = settings.api_key
+    if base_url is None:
+        base_url = settings.base_url
+    if pool is None:
+        pool = settings.pool
+
+    key = (api_key, base_url, pool)
+    with _registry_lock:
+        client = _clients.get(key)
+        if client is None:
+            transport = _transports[key] = PooledTransport(pool)
+            client = _clients[key] = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=DefaultAsyncHttpxClient(
+                    transport=transport,
+                    timeout=httpx.Timeout(pool.timeout, connect=pool.connect_timeout),
+                ),
+            )
+        return client
+
+
+def get_model(
+    model: str | None = None,
+    *,
+    client: AsyncOpenAI | None = None,
+    **client_kwargs,
+) -> OpenAIChatCompletionsModel:
+    """Return a cached chat-completions model bound to a shared client.
+
+    ``model`` defaults to the configured ``GEMINI_MODEL``. Extra keyword
+    arguments are forwarded to :func:`get_client` when no ``client`` is given.
+    """
+    if model is None:
+        model = get_settings().model
+    if client is None:
+        client = get_client(**client_kwargs)
+
+    key = (model, id(client))
+    with _registry_lock:
+        llm_model = _models.get(key)
+        if llm_model is None:
+            llm_model = _models[key] = OpenAIChatCompletionsModel(
+                model=model, openai_client=client
+            )
+        return llm_model
+
+
+class LazyModel(Model):
+    """A model that is only built when an agent first calls it.
+
+    Lets entry points declare ``model = lazy_model()`` at import time without
+    resolving settings or constructing a client, which keeps imports cheap and
+    lets serverless runtimes inject configuration after import. The wrapped
+    model is rebuilt if :func:`~hello_agent.config.reload_settings` runs.
+    """
+
+    def __init__(self, model: str | None = None, **client_kwargs) -> None:
+        self._model_name = model
+        self._client_kwargs = client_kwargs
+        self._resolved: Model | None = None
+        self._generation = -1
+
+    def resolve(self) -> Model:
+        generation = get_settings().generation
+        if self._resolved is None or self._generation != generation:
+            self._resolved = get_model(self._model_name, **self._client_kwargs)
+            self._generation = generation
+        return self._resolved
+
+    async def get_response(self, *args, **kwargs):
+        return await self.resolve().get_response(*args, **kwargs)
+
+    def stream_response(self, *args, **kwargs):
+        return self.resolve().stream_response(*args, **kwargs)
+
+
+def lazy_model(model: str | None = None, **client_kwargs) -> LazyModel:
+    """Return a :class:`LazyModel`; arguments are those of :func:`get_model`."""
+    return LazyModel(model, **client_kwargs)
+
+
+def pool_stats() -> PoolStats:
+    """Aggregate pool statistics across every shared client."""
+    with _registry_lock:
+        items = [(key[1], transport) for key, transport in _transports.items()]
+    total = PoolStats()
+    per_client: dict[str, PoolStats] = {}
+    for base_url, transport in items:
+        stats = transport.stats()
+        per_client[base_url] = per_client.get(base_url, PoolStats()) + stats
+        total = total + stats
+    total.per_client = per_client
+    return total
+
+
+async def aclose_clients() -> None:
+    """Close every shared client and reset the cache.
+
+    Pools of other running loops are closed on those loops; see
+    :meth:`PooledTransport.aclose`.
+    """
+    with _registry_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _transports.clear()
+        _models.clear()
+    for client in clients:
+        await client.close()
+
+
+async def aclose_loop_connections() -> None:
+    """Close the running loop's connections in every shared client.
+
+    Unlike :func:`aclose_clients` the clients stay usable from other loops;
+    call this from a long-lived loop that is about to stop.
+    """
+    with _registry_lock:
+        transports = list(_transports.values())
+    for transport in transports:
+        await transport.aclose_loop()
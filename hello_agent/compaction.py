@@ -0,0 +1,257 @@
+"""Fold old conversation history into a cached rolling summary.
+
+Sessions and the chat loop hand the model every item of a conversation, so
+prompt size (and p99 latency) keeps growing over hundreds of turns. A
+:class:`Compactor` sits in front of each model call via
+``RunConfig.call_model_input_filter``. Once the estimated prompt crosses
+``budget_tokens`` it replaces the oldest items with one summary item, written
+by a cheap summarizer agent, and keeps the recent tail verbatim::
+
+    compactor = Compactor(budget_tokens=6000, keep_recent_tokens=2000)
+    config = RunConfig(call_model_input_filter=compactor.call_model_input_filter)
+    await Runner.run(agent, "next question", session=session, run_config=config)
+
+Summaries are cached as *checkpoints* keyed by a chained hash of the items
+they cover. Each turn reuses the newest checkpoint that is still a prefix of
+the conversation, and a new summary is written (incrementally, from the
+previous one) only when the uncovered tail outgrows the budget again, i.e.
+once every ``budget - keep_recent`` tokens rather than on every turn.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from agents import Agent, ModelSettings, Runner, TResponseInputItem
+from agents.run import CallModelData, ModelInputData
+
+from .clients import lazy_model
+from .tokens import count_item, estimate_model_input
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+SUMMARIZER_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Merge the existing summary (if any) with the new transcript "
+    "into one concise summary. Keep names, preferences, decisions, open "
+    "questions, tool results and any facts the assistant may need later. "
+    "Write plain prose or short bullet points, no preamble."
+)
+
+
+def default_summarizer() -> Agent[Any]:
+    return Agent(
+        name="Summarizer",
+        instructions=SUMMARIZER_INSTRUCTIONS,
+        model=lazy_model(),
+        model_settings=ModelSettings(temperature=0.0),
+    )
+
+
+def render_transcript(items: list[TResponseInputItem]) -> str:
+    """Plain-text transcript of input items, for the summarizer prompt."""
+    lines = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        kind = item.get("type")
+        if kind == "function_call":
+            lines.append(f"[tool call] {item.get('name')}({item.get('arguments')})")
+        elif kind == "function_call_output":
+            lines.append(f"[tool result] {item.get('output')}")
+        elif "role" in item:
+            content = item.get("content")
+            if isinstance(content, list):
+                content = "".join(
+                    part.get("text", "") for part in content if isinstance(part, dict)
+                )
+            lines.append(f"{item['role']}: {content}")
+    return "\n".join(lines)
+
+
+def _is_turn_start(item: TResponseInputItem) -> bool:
+    return (
+        isinstance(item, dict)
+        and item.get("role") == "user"
+        and item.get("type", "message") == "message"
+    )
+
+
+@dataclass
+class CompactionStats:
+    calls: int = 0
+    compacted_calls: int = 0
+    summaries_written: int = 0
+    summary_failures: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+
+class Compactor:
+    """Token-budget-aware history compaction with cached summary checkpoints.
+
+    ``budget_tokens`` is the estimated prompt size (input items,
+    instructions and tool schemas) above which compaction kicks in; ``keep_recent_tokens`` is
+    how much of the most recent history is kept verbatim when it does, and
+    ``max_summary_tokens`` caps the summary that replaces the rest. Cuts
+    only happen at user messages, so tool calls stay next to their outputs.
+    If the summarizer fails, the input is passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        *,
+        budget_tokens: int = 6000,
+        keep_recent_tokens: int | None = None,
+        max_summary_tokens: int | None = None,
+        summarizer: Agent[Any] | None = None,
+        max_checkpoints: int = 256,
+    ) -> None:
+        if keep_recent_tokens is None:
+            keep_recent_tokens = budget_tokens // 3
+        if max_summary_tokens is None:
+            max_summary_tokens = budget_tokens // 6
+        if keep_recent_tokens >= budget_tokens:
+            raise ValueError("keep_recent_tokens must be smaller than budget_tokens")
+        self.budget_tokens = budget_tokens
+        self.keep_recent_tokens = keep_recent_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self._summarizer = summarizer
+        self.max_checkpoints = max_checkpoints
+        self._checkpoints: OrderedDict[str, str] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future[str]] = {}
+        self.stats = CompactionStats()
+
+    @property
+    def summarizer(self) -> Agent[Any]:
+        if self._summarizer is None:
+            self._summarizer = default_summarizer()
+        return self._summarizer
+
+    @staticmethod
+    def _chain(items: list[TResponseInputItem]) -> list[str]:
+        """``hashes[i]`` identifies ``items[:i]``."""
+        hashes = [""]
+        digest = hashlib.blake2b(digest_size=16)
+        for item in items:
+            digest.update(json.dumps(item, sort_keys=True, default=str).encode())
+            hashes.append(digest.copy().hexdigest())
+        return hashes
+
+    def _remember(self, key: str, summary: str) -> None:
+        self._checkpoints[key] = summary
+        self._checkpoints.move_to_end(key)
+        while len(self._checkpoints) > self.max_checkpoints:
+            self._checkpoints.popitem(last=False)
+
+    async def _summarize(
+        self, key: str, previous: str | None, items: list[TResponseInputItem]
+    ) -> str:
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            # Another run of the same conversation is already writing it.
+            return await asyncio.shield(pending)
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            limit = self.max_summary_tokens * 3 // 4  # roughly, in words
+            prompt = (
+                f"Existing summary:\n{previous or '(none)'}\n\n"
+                f"New transcript:\n{render_transcript(items)}\n\n"
+                f"Reply with the updated summary in at most {limit} words."
+            )
+            result = await Runner.run(self.summarizer, prompt)
+            # A summary that ignores the limit would defeat the budget.
+            summary = str(result.final_output).strip()[: self.max_summary_tokens * 4]
+            self._remember(key, summary)
+            self.stats.summaries_written += 1
+            future.set_result(summary)
+            return summary
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved; only waiters care
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def compact(
+        self, items: list[TResponseInputItem], *, extra_tokens: int = 0
+    ) -> list[TResponseInputItem]:
+        """Return ``items`` or a compacted equivalent within the budget.
+
+        ``extra_tokens`` accounts for prompt parts outside ``items``
+        (instructions, tool schemas).
+        """
+        tokens = [count_item(item) for item in items]
+        total = sum(tokens) + extra_tokens
+        self.stats.calls += 1
+        self.stats.tokens_before += total
+        if total <= self.budget_tokens:
+            self.stats.tokens_after += total
+            return items
+
+        hashes = self._chain(items)
+        # Newest checkpoint that is still a prefix of this conversation.
+        start, summary = 0, None
+        for i in range(len(items), 0, -1):
+            cached = self._checkpoints.get(hashes[i])
+            if cached is not None:
+                start, summary = i, cached
+                self._checkpoints.move_to_end(hashes[i])
+                break
+
+        def size_from(cut: int, text: str | None) -> int:
+            head = count_item(self._summary_item(text)) if text else 0
+            return head + sum(tokens[cut:]) + extra_tokens
+
+        if size_from(start, summary) > self.budget_tokens:
+            cut = self._choose_cut(items, tokens, start)
+            if cut > start:
+                try:
+                    summary = await self._summarize(hashes[cut], summary, items[start:cut])
+                    start = cut
+                except Exception:
+                    self.stats.summary_failures += 1
+                    logger.warning("history summarization failed", exc_info=True)
+
+        compacted = ([self._summary_item(summary)] if summary else []) + items[start:]
+        after = size_from(start, summary)
+        if start:
+            self.stats.compacted_calls += 1
+        self.stats.tokens_after += after
+        return compacted
+
+    def _choose_cut(self, items: list[TResponseInputItem], tokens: list[int], start: int) -> int:
+        """Earliest user-message index after ``start`` leaving a tail within
+        ``keep_recent_tokens``; failing that, the last user message."""
+        tail = 0
+        best = start
+        for i in range(len(items) - 1, start, -1):
+            tail += tokens[i]
+            if _is_turn_start(items[i]):
+                if best == start or tail <= self.keep_recent_tokens:
+                    best = i
+                if tail > self.keep_recent_tokens:
+                    break
+        return best
+
+    @staticmethod
+    def _summary_item(summary: str | None) -> TResponseInputItem:
+        return {"role": "system", "content": SUMMARY_PREFIX + (summary or "")}
+
+    async def call_model_input_filter(self, data: CallModelData[Any]) -> ModelInputData:
+        """``RunConfig.call_model_input_filter`` hook compacting every model call."""
+        estimate = estimate_model_input(data)
+        compacted = await self.compact(
+            data.model_data.input, extra_tokens=estimate.total - estimate.history
+        )
+        return ModelInputData(input=compacted, instructions=data.model_data.instructions)
@@ -0,0 +1,113 @@
+"""Settings resolved once per process, with an explicit reload.
+
+The lessons used to call ``load_dotenv``/``find_dotenv`` and read the
+``GEMINI_*`` variables at import time, each on its own. :func:`get_settings`
+does that work the first time anything needs it and caches the result;
+:func:`reload_settings` re-reads ``.env`` and the environment (for tests and
+long-lived workers whose configuration changes).
+
+Only the standard library and ``dotenv`` are imported here so reading
+settings never pulls in the agents SDK.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+
+from dotenv import find_dotenv, load_dotenv
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection pool tuning for the shared HTTP transport."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    timeout: float = 600.0
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """Build a config from ``GEMINI_POOL_*`` / ``GEMINI_HTTP2`` variables."""
+        return cls(
+            max_connections=_env_int("GEMINI_POOL_MAX_CONNECTIONS", cls.max_connections),
+            max_keepalive_connections=_env_int(
+                "GEMINI_POOL_MAX_KEEPALIVE", cls.max_keepalive_connections
+            ),
+            keepalive_expiry=_env_float(
+                "GEMINI_POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry
+            ),
+            http2=os.getenv("GEMINI_HTTP2", "").lower() in ("1", "true", "yes"),
+            connect_timeout=_env_float("GEMINI_CONNECT_TIMEOUT", cls.connect_timeout),
+            timeout=_env_float("GEMINI_TIMEOUT", cls.timeout),
+        )
+
+
+@dataclass(frozen=True)
+class Settings:
+    api_key: str | None
+    base_url: str
+    model: str
+    pool: PoolConfig = field(default_factory=PoolConfig)
+    env_file: str | None = None
+    generation: int = 0
+    """Bumped by every reload so cached consumers can tell they are stale."""
+
+
+_settings: Settings | None = None
+_generation = 0
+_lock = threading.Lock()
+
+
+def _resolve(generation: int) -> Settings:
+    # Search upwards from the working directory, which finds the repo-level
+    # .env both from the root and from lesson subdirectories.
+    env_file = find_dotenv(usecwd=True) or None
+    if env_file:
+        load_dotenv(env_file, override=generation > 0)
+    return Settings(
+        api_key=os.getenv("GEMINI_API_KEY"),
+        base_url=os.getenv("GEMINI_BASE_URL") or "",
+        model=os.getenv("GEMINI_MODEL") or "",
+        pool=PoolConfig.from_env(),
+        env_file=env_file,
+        generation=generation,
+    )
+
+
+def get_settings() -> Settings:
+    """Return the process-wide settings, resolving them on first use."""
+    global _settings
+    settings = _settings
+    if settings is None:
+        with _lock:
+            if _settings is None:
+                _settings = _resolve(_generation)
+            settings = _settings
+    return settings
+
+
+def reload_settings() -> Settings:
+    """Re-read ``.env`` and the environment, replacing the cached settings.
+
+    Values in ``.env`` override the environment on reload, so edits to the
+    file take effect. Clients and lazy models built afterwards use the new
+    values.
+    """
+    global _settings, _generation
+    with _lock:
+        _generation += 1
+        _settings = _resolve(_generation)
+        return _settings
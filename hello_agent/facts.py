@@ -0,0 +1,318 @@
+"""Long-term facts about each user, kept apart from the transcript.
+
+A session remembers that the user is called Talha only because the message
+saying so is replayed on every turn, and once a :class:`Compactor` or
+:class:`RetrievalMemory` trims the history it may not be. A
+:class:`FactMemory` keeps such facts as a small key-value map per user: after
+each run a cheap extractor agent reads the new turn and updates the map in
+the background, and before each model call the map is added to the
+instructions as a short block::
+
+    memory = FactMemory(FactStore(SessionStore("facts.db")))
+    config = RunConfig(call_model_input_filter=memory.input_filter("user-42"))
+    result = await Runner.run(agent, "I'm vegetarian, by the way.", run_config=config)
+    memory.observe("user-42", result)   # extraction runs in the background
+    ...
+    await memory.drain()                # before shutting down
+
+Facts are stored in their own table, keyed by ``(user_id, key)``, and cached
+per user in memory, so injecting them costs the size of the map, not of
+the history.
+"""
+
+import asyncio
+import logging
+import re
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from agents import Agent, ModelSettings, RunResult, Runner, TResponseInputItem
+from agents.run import CallModelData, ModelInputData
+
+from .clients import lazy_model
+from .compaction import render_transcript
+from .sessions import SessionStore
+
+logger = logging.getLogger(__name__)
+
+FACTS_HEADER = "Known facts about the user (from earlier conversations):"
+
+EXTRACTOR_INSTRUCTIONS = (
+    "You maintain a list of durable facts about a user: their name, "
+    "preferences, location, job, people and things they mention often. "
+    "Given the known facts and the latest exchange, reply with one line per "
+    "fact that is new or changed, as 'key: value' with a short snake_case "
+    "key. Reply 'key: -' for a fact the user retracted. Ignore small talk, "
+    "questions and anything about the assistant. Reply 'none' if nothing "
+    "changed."
+)
+
+_FACT_LINE = re.compile(r"^\s*(?:[-*]\s*)?([A-Za-z][\w ]{0,39}?)\s*:\s*(.+?)\s*$")
+
+# Labels of the extractor's own prompt; a reply that echoes it isn't a fact.
+_NOT_KEYS = frozenset(
+    {"user", "assistant", "system", "developer", "known_facts", "latest_exchange", "none"}
+)
+
+InputFilter = Callable[[CallModelData[Any]], Awaitable[ModelInputData] | ModelInputData]
+
+
+def default_extractor() -> Agent[Any]:
+    return Agent(
+        name="FactExtractor",
+        instructions=EXTRACTOR_INSTRUCTIONS,
+        model=lazy_model(),
+        model_settings=ModelSettings(temperature=0.0),
+    )
+
+
+def parse_facts(text: str) -> dict[str, str | None]:
+    """``key: value`` lines of an extractor reply; ``None`` marks a deletion."""
+    changes: dict[str, str | None] = {}
+    for line in text.splitlines():
+        match = _FACT_LINE.match(line)
+        if match is None:
+            continue
+        key = re.sub(r"\W+", "_", match.group(1).strip().lower())
+        if key in _NOT_KEYS:
+            continue
+        value = match.group(2).strip().strip("\"'")
+        changes[key] = None if value in ("-", "") else value
+    return changes
+
+
+def render_facts(facts: dict[str, str]) -> str:
+    return "\n".join([FACTS_HEADER, *(f"- {key}: {value}" for key, value in facts.items())])
+
+
+class FactStore:
+    """Per-user key-value facts in a :class:`SessionStore` database.
+
+    Writes go through the store's group commit; reads of a user's facts are
+    served from an LRU cache of ``cache_users`` users after the first one.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore | None = None,
+        *,
+        table: str = "user_facts",
+        cache_users: int = 4096,
+    ) -> None:
+        self.store = store if store is not None else SessionStore()
+        self.table = table
+        self.cache_users = cache_users
+        self._cache: OrderedDict[str, dict[str, str]] = OrderedDict()
+        self._ready = False
+
+    async def _ensure_table(self) -> None:
+        if self._ready:
+            return
+
+        def create(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "user_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+                "PRIMARY KEY (user_id, key)) WITHOUT ROWID"
+            )
+
+        await self.store.run(create, write=True)
+        self._ready = True
+
+    def _remember(self, user_id: str, facts: dict[str, str]) -> None:
+        self._cache[user_id] = facts
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_users:
+            self._cache.popitem(last=False)
+
+    async def get(self, user_id: str) -> dict[str, str]:
+        """Every fact known about ``user_id``, oldest first."""
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            self._cache.move_to_end(user_id)
+            return dict(cached)
+        await self._ensure_table()
+
+        def fetch(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+            return conn.execute(
+                f"SELECT key, value FROM {self.table} WHERE user_id = ? ORDER BY updated_at, key",
+                (user_id,),
+            ).fetchall()
+
+        facts = dict(await self.store.run(fetch))
+        self._remember(user_id, facts)
+        return dict(facts)
+
+    async def update(self, user_id: str, changes: dict[str, str | None]) -> int:
+        """Set (or, for ``None`` values, delete) facts; returns rows changed."""
+        if not changes:
+            return 0
+        await self._ensure_table()
+        facts = await self.get(user_id)
+
+        def apply(conn: sqlite3.Connection) -> int:
+            changed = 0
+            for key, value in changes.items():
+                if value is None:
+                    changed += conn.execute(
+                        f"DELETE FROM {self.table} WHERE user_id = ? AND key = ?", (user_id, key)
+                    ).rowcount
+                elif facts.get(key) != value:
+                    conn.execute(
+                        f"INSERT INTO {self.table} (user_id, key, value) VALUES (?, ?, ?) "
+                        "ON CONFLICT (user_id, key) DO UPDATE SET "
+                        "value = excluded.value, updated_at = CURRENT_TIMESTAMP",
+                        (user_id, key, value),
+                    )
+                    changed += 1
+            return changed
+
+        changed = await self.store.run(apply, write=True)
+        for key, value in changes.items():
+            if value is None:
+                facts.pop(key, None)
+            elif facts.get(key) != value:
+                facts.pop(key, None)  # changed facts move to the end, as in the table
+                facts[key] = value
+        self._remember(user_id, facts)
+        return changed
+
+    async def forget(self, user_id: str) -> None:
+        """Delete every fact about ``user_id``."""
+        await self._ensure_table()
+        await self.store.run(
+            lambda conn: conn.execute(f"DELETE FROM {self.table} WHERE user_id = ?", (user_id,)),
+            write=True,
+        )
+        self._cache.pop(user_id, None)
+
+
+@dataclass
+class FactStats:
+    extractions: int = 0
+    extraction_failures: int = 0
+    facts_changed: int = 0
+    injected_calls: int = 0
+
+
+class FactMemory:
+    """Extracts facts after each run and injects them before each model call.
+
+    At most ``max_facts`` facts are kept per user; new keys beyond that are
+    dropped until some are retracted. Extraction failures are logged and
+    counted, never raised into the run that triggered them.
+    """
+
+    def __init__(
+        self,
+        store: FactStore | None = None,
+        *,
+        extractor: Agent[Any] | None = None,
+        max_facts: int = 50,
+    ) -> None:
+        self.store = store if store is not None else FactStore()
+        self._extractor = extractor
+        self.max_facts = max_facts
+        self._pending: dict[str, asyncio.Task[None]] = {}
+        self.stats = FactStats()
+
+    @property
+    def extractor(self) -> Agent[Any]:
+        if self._extractor is None:
+            self._extractor = default_extractor()
+        return self._extractor
+
+    # -- injection --------------------------------------------------------
+
+    def input_filter(self, user_id: str, then: InputFilter | None = None) -> InputFilter:
+        """A ``call_model_input_filter`` adding ``user_id``'s facts to the
+        instructions; ``then`` (e.g. a compactor's filter) runs first."""
+
+        async def apply(data: CallModelData[Any]) -> ModelInputData:
+            if then is not None:
+                result = then(data)
+                model_data = await result if asyncio.iscoroutine(result) else result
+                data = CallModelData(model_data=model_data, agent=data.agent, context=data.context)
+            facts = await self.store.get(user_id)
+            instructions = data.model_data.instructions
+            if facts:
+                block = render_facts(facts)
+                instructions = f"{instructions}\n\n{block}" if instructions else block
+                self.stats.injected_calls += 1
+            return ModelInputData(input=data.model_data.input, instructions=instructions)
+
+        return apply
+
+    # -- extraction -------------------------------------------------------
+
+    async def extract(self, user_id: str, items: list[TResponseInputItem]) -> int:
+        """Update ``user_id``'s facts from ``items``; returns facts changed."""
+        transcript = render_transcript(items)
+        if not transcript.strip():
+            return 0
+        facts = await self.store.get(user_id)
+        known = "\n".join(f"{key}: {value}" for key, value in facts.items()) or "(none)"
+        prompt = f"Known facts:\n{known}\n\nLatest exchange:\n{transcript}"
+        result = await Runner.run(self.extractor, prompt)
+        changes = parse_facts(str(result.final_output))
+        room = self.max_facts - len(facts)
+        for key in [k for k, v in changes.items() if v is not None and k not in facts]:
+            if room > 0:
+                room -= 1
+            else:
+                del changes[key]
+        changed = await self.store.update(user_id, changes)
+        self.stats.extractions += 1
+        self.stats.facts_changed += changed
+        return changed
+
+    async def _extract_after(
+        self, previous: asyncio.Task[None] | None, user_id: str, items: list[TResponseInputItem]
+    ) -> None:
+        if previous is not None:
+            # One extraction per user at a time, in run order.
+            await asyncio.wait([previous])
+        try:
+            await self.extract(user_id, items)
+        except Exception:
+            self.stats.extraction_failures += 1
+            logger.warning("fact extraction failed for %s", user_id, exc_info=True)
+
+    def observe(self, user_id: str, result: RunResult) -> asyncio.Task[None]:
+        """Schedule extraction from a finished run's turn on the running loop."""
+        items = turn_items(result)
+        previous = self._pending.get(user_id)
+        task = asyncio.get_running_loop().create_task(
+            self._extract_after(previous, user_id, items)
+        )
+        self._pending[user_id] = task
+        task.add_done_callback(
+            lambda done: self._pending.pop(user_id, None)
+            if self._pending.get(user_id) is done
+            else None
+        )
+        return task
+
+    async def drain(self) -> None:
+        """Wait for every scheduled extraction."""
+        while self._pending:
+            await asyncio.wait(list(self._pending.values()))
+
+
+def turn_items(result: RunResult) -> list[TResponseInputItem]:
+    """The user input and generated items of one run."""
+    original = result.input
+    if isinstance(original, str):
+        items: list[TResponseInputItem] = [{"role": "user", "content": original}]
+    else:
+        # With a session the input also holds the replayed history; the
+        # new user message is its last user item.
+        starts = [
+            i for i, item in enumerate(original)
+            if isinstance(item, dict) and item.get("role") == "user"
+        ]
+        items = list(original[starts[-1] :]) if starts else []
+    return items + [item.to_input_item() for item in result.new_items]
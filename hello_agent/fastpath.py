@@ -0,0 +1,354 @@
+"""Answer plain arithmetic without asking the model.
+
+"What is 19 + 23 * 2?" sent to a math agent costs a model call that asks
+for ``multiply``, another that asks for ``sum`` and a third that phrases the
+answer: three round trips for something Python evaluates in microseconds.
+An :class:`ArithmeticFastPath` wraps the agent's model and looks at the
+first model call of each turn. If the user message is a pure arithmetic
+expression, it is evaluated locally and the answer is returned as the
+model's response, so the run finishes without touching the network::
+
+    model = ArithmeticFastPath(lazy_model())
+    agent = Agent(name="Assistant", model=model, tools=[multiply, sum])
+    result = await Runner.run(agent, "what is 19 + 23 * 2?")   # "19 + 23 * 2 = 65"
+    print(model.stats.served_locally)
+
+With ``answer_locally=False`` the model is still called, once, with the
+computed result added to the input as a calculator result, so it can phrase
+the answer in the agent's own voice without calling any tools.
+
+Expressions are parsed with :mod:`ast`; only numbers, ``+ - * / // %``,
+bounded powers, unary signs and parentheses are evaluated, exactly (with
+fractions) and with Python's precedence. Anything else goes to the model
+unchanged, as does every later call of a turn and every call that expects
+structured output.
+"""
+
+import ast
+import re
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Any
+
+from agents import ModelResponse, TResponseInputItem, Usage
+from agents.models.fake_id import FAKE_RESPONSES_ID
+from agents.models.interface import Model
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+
+MAX_EXPRESSION_CHARS = 200
+MAX_EXPONENT = 64
+MAX_RESULT_BITS = 4096
+"""Evaluation gives up once a numerator or denominator grows past this."""
+
+CALCULATOR_NOTE = (
+    "A calculator already evaluated the user's expression: {answer}. Use this "
+    "result instead of calling tools."
+)
+
+_QUESTION = re.compile(
+    r"^\s*(?:please\s+)?((?:what(?:'s|\s+is)|how\s+much\s+is|calculate|compute|"
+    r"evaluate|solve)\s+)?(.+?)[\s?.!=]*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Dates and phone numbers look like subtraction; never evaluate these.
+_DATE_OR_PHONE = re.compile(
+    r"^(?:\d{4}([-/.])\d{1,2}\1\d{1,2}"  # 2024-10-18
+    r"|\d{1,2}([-/.])\d{1,2}\2\d{2,4}"  # 10/18/2024
+    r"|(?:\d{1,4}-)?(?:\d{2,4}-)?\d{3}-\d{4})$"  # 555-1234, 1-800-555-0199
+)
+
+# Spelled-out operators; "multiplied by" must be replaced before "by" could
+# be mistaken for anything else.
+_WORD_OPERATORS = (
+    (re.compile(r"\bmultiplied\s+by\b", re.IGNORECASE), " * "),
+    (re.compile(r"\bdivided\s+by\b", re.IGNORECASE), " / "),
+    (re.compile(r"\bto\s+the\s+power\s+of\b", re.IGNORECASE), " ** "),
+    (re.compile(r"\bplus\b", re.IGNORECASE), " + "),
+    (re.compile(r"\bminus\b", re.IGNORECASE), " - "),
+    (re.compile(r"\btimes\b", re.IGNORECASE), " * "),
+    (re.compile(r"\bmod(?:ulo)?\b", re.IGNORECASE), " % "),
+    # "3 x 4" multiplies; an x anywhere else is a variable.
+    (re.compile(r"(?<=[\d)])\s*[xX×]\s*(?=[\d(])"), " * "),
+)
+_SYMBOLS = str.maketrans({"÷": "/", "−": "-", "^": "**"})
+
+# "1,000,000" is one number; any other comma ("1,5", a list) is left in and
+# fails the expression check, so the message goes to the model.
+_THOUSANDS = re.compile(r"(?<![\d.,])\d{1,3}(?:,\d{3})+(?![\d,])")
+
+_EXPRESSION = re.compile(r"^[\d\s.+\-*/%()]+$")
+_HAS_OPERATOR = re.compile(r"[\d)]\s*[-+*/%]")
+_NOT_MINUS = re.compile(r"[+*/%]")
+
+_BINARY = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b,
+    ast.FloorDiv: lambda a, b: Fraction(a // b),
+    ast.Mod: lambda a, b: a % b,
+}
+
+
+def _parse(text: str) -> tuple[str, str] | None:
+    """``(as written, as Python)`` for the expression ``text`` asks about."""
+    if len(text) > MAX_EXPRESSION_CHARS:
+        return None
+    match = _QUESTION.match(text)
+    if match is None:
+        return None
+    asked, written = match.group(1), match.group(2).strip()
+    if _DATE_OR_PHONE.match(written):
+        return None
+    expression = written
+    for pattern, operator in _WORD_OPERATORS:
+        expression = pattern.sub(operator, expression)
+    expression = _THOUSANDS.sub(lambda m: m.group().replace(",", ""), expression)
+    expression = " ".join(expression.translate(_SYMBOLS).split())
+    if not _EXPRESSION.match(expression) or not _HAS_OPERATOR.search(expression):
+        return None
+    if not asked and not _NOT_MINUS.search(expression):
+        # "555-1234" or "10-18" alone is more likely an identifier than a sum.
+        return None
+    return written, expression
+
+
+def extract_expression(text: str) -> str | None:
+    """The arithmetic expression ``text`` asks about, or ``None``.
+
+    Accepts a bare expression ("19 + 23 * 2") or one behind a short question
+    ("what is ...?", "calculate ..."), with operators written as symbols or
+    words ("19 plus 23 times 2"). A lone number is not a question, and
+    neither is anything shaped like a date or phone number. Commas are only
+    read as thousands separators ("1,200 * 3"); "1,5 + 1" goes to the model.
+    Bare subtraction needs the question ("what is 10 - 3?").
+    """
+    parsed = _parse(text)
+    return parsed[1] if parsed is not None else None
+
+
+def _evaluate(node: ast.AST) -> Fraction:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        # Through str so 0.1 is one tenth, not the nearest binary float.
+        return Fraction(str(node.value))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        value = _evaluate(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp):
+        left = _evaluate(node.left)
+        right = _evaluate(node.right)
+        if isinstance(node.op, ast.Pow):
+            if right.denominator != 1 or abs(right) > MAX_EXPONENT:
+                raise ValueError(f"unsupported exponent {right}")
+            result = left ** int(right)
+        elif type(node.op) in _BINARY:
+            result = _BINARY[type(node.op)](left, right)
+        else:
+            raise ValueError(f"unsupported operator {type(node.op).__name__}")
+        if max(result.numerator.bit_length(), result.denominator.bit_length()) > MAX_RESULT_BITS:
+            raise ValueError("result too large")
+        return result
+    raise ValueError(f"unsupported expression {type(node).__name__}")
+
+
+def evaluate(expression: str) -> Fraction:
+    """Exact value of an arithmetic ``expression``.
+
+    Raises ``ValueError`` for anything but arithmetic on numbers (or results
+    that grow too large) and ``ZeroDivisionError`` when dividing by zero.
+    """
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"not an expression: {expression!r}") from exc
+    return _evaluate(tree.body)
+
+
+def format_number(value: Fraction) -> str:
+    """Integers in full, other values to 12 significant digits."""
+    if value.denominator == 1:
+        return str(value.numerator)
+    try:
+        return f"{float(value):.12g}"
+    except OverflowError:
+        return str(value)
+
+
+@dataclass
+class ArithmeticStats:
+    calls: int = 0
+    """Model calls seen."""
+    served_locally: int = 0
+    """Answered without calling the model."""
+    hinted: int = 0
+    """Sent to the model with a precomputed result."""
+    passed_through: int = 0
+
+
+def _user_text(input: str | list[TResponseInputItem]) -> str | None:
+    """The user message ``input`` ends with, if it is plain text."""
+    if isinstance(input, str):
+        return input
+    if not input:
+        return None
+    last = input[-1]
+    if not isinstance(last, dict) or last.get("role") != "user":
+        return None  # a tool output or model reply: not a turn's first call
+    content = last.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list) and all(
+        isinstance(part, dict) and part.get("type") == "input_text" for part in content
+    ):
+        return "".join(part.get("text", "") for part in content)
+    return None
+
+
+def _message(text: str) -> ResponseOutputMessage:
+    return ResponseOutputMessage(
+        id=FAKE_RESPONSES_ID,
+        type="message",
+        role="assistant",
+        status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+
+
+class ArithmeticFastPath(Model):
+    """Wraps ``model`` and answers pure arithmetic questions locally.
+
+    Only the first model call of a turn (the input ends with the user's
+    message) with a plain-text output type is considered. Expressions that
+    fail to evaluate, e.g. a division by zero, are passed through so the
+    model can explain.
+    """
+
+    def __init__(self, model: Model, *, answer_locally: bool = True) -> None:
+        self.model = model
+        self.answer_locally = answer_locally
+        self.stats = ArithmeticStats()
+
+    def answer(self, input: str | list[TResponseInputItem], output_schema: Any = None) -> str | None:
+        """``"<expression> = <value>"`` if ``input`` asks for plain arithmetic.
+
+        The expression is echoed as the user wrote it.
+        """
+        if output_schema is not None and not output_schema.is_plain_text():
+            return None
+        text = _user_text(input)
+        parsed = _parse(text) if text else None
+        if parsed is None:
+            return None
+        written, expression = parsed
+        try:
+            value = evaluate(expression)
+        except (ValueError, ZeroDivisionError):
+            return None
+        return f"{written} = {format_number(value)}"
+
+    def _hinted(
+        self, input: str | list[TResponseInputItem], answer: str
+    ) -> list[TResponseInputItem]:
+        items: list[TResponseInputItem] = (
+            [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+        )
+        items.append({"role": "system", "content": CALCULATOR_NOTE.format(answer=answer)})
+        return items
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        self.stats.calls += 1
+        answer = self.answer(input, output_schema)
+        if answer is None:
+            self.stats.passed_through += 1
+        elif self.answer_locally:
+            self.stats.served_locally += 1
+            return ModelResponse(output=[_message(answer)], usage=Usage(), response_id=None)
+        else:
+            self.stats.hinted += 1
+            input = self._hinted(input, answer)
+        return await self.model.get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> AsyncIterator:
+        self.stats.calls += 1
+        answer = self.answer(input, output_schema)
+        if answer is not None and self.answer_locally:
+            self.stats.served_locally += 1
+            yield ResponseTextDeltaEvent(
+                content_index=0,
+                delta=answer,
+                item_id=FAKE_RESPONSES_ID,
+                output_index=0,
+                type="response.output_text.delta",
+                sequence_number=0,
+                logprobs=[],
+            )
+            response = Response(
+                id=FAKE_RESPONSES_ID,
+                created_at=time.time(),
+                model="local-arithmetic",
+                object="response",
+                output=[_message(answer)],
+                tool_choice="auto",
+                top_p=None,
+                temperature=None,
+                tools=[],
+                parallel_tool_calls=False,
+            )
+            yield ResponseCompletedEvent(
+                response=response, type="response.completed", sequence_number=1
+            )
+            return
+        if answer is None:
+            self.stats.passed_through += 1
+        else:
+            self.stats.hinted += 1
+            input = self._hinted(input, answer)
+        async for event in self.model.stream_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        ):
+            yield event
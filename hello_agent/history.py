@@ -0,0 +1,145 @@
+"""Append-only conversation history that sends deltas instead of transcripts.
+
+The chat loop used to rebuild ``result.to_input_list()`` and resend the whole
+transcript on every turn, so tokens sent (and latency) grew quadratically
+over a conversation. :class:`ConversationHistory` keeps the transcript as an
+append-only list and, per turn, sends only what the provider needs:
+
+* **server-side continuation** when the model returns response ids (the
+  Responses API): only the new user message is sent, with
+  ``previous_response_id`` pointing at the stored conversation;
+* otherwise a **sliding window** of the most recent whole exchanges that fits
+  in ``max_tokens``, so long conversations stop growing the request.
+
+::
+
+    history = ConversationHistory(max_tokens=4000)
+    while True:
+        result = runner.run(agent, **history.next_turn(input("> ")))
+        history.record(result)
+        print(history.stats[-1])
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import RunResult, TResponseInputItem
+
+from .tokens import count_item
+
+
+@dataclass
+class TurnStats:
+    """What one turn sent and what it cost."""
+
+    turn: int
+    mode: str
+    """``"continuation"``, ``"window"`` or ``"full"``."""
+    items_sent: int
+    estimated_tokens_sent: int
+    history_items: int
+    history_tokens: int
+    """Estimated size of the whole transcript when sent, i.e. a full resend."""
+    input_tokens: int = 0
+    """Provider-reported input tokens for the turn (all model calls)."""
+    output_tokens: int = 0
+
+
+@dataclass
+class ConversationHistory:
+    """An append-only transcript that materialises only per-turn deltas.
+
+    ``max_tokens`` bounds the estimated size of the window sent when server
+    side continuation isn't available; ``None`` sends the whole transcript.
+    The newest user message is always sent, even if it alone exceeds the
+    budget. Set ``server_side=False`` to never use ``previous_response_id``.
+    """
+
+    max_tokens: int | None = None
+    server_side: bool = True
+    items: list[TResponseInputItem] = field(default_factory=list)
+    stats: list[TurnStats] = field(default_factory=list)
+    _tokens: list[int] = field(default_factory=list, repr=False)
+    _total_tokens: int = field(default=0, repr=False)
+    _turn_starts: list[int] = field(default_factory=list, repr=False)
+    _response_id: str | None = field(default=None, repr=False)
+    _pending: TurnStats | None = field(default=None, repr=False)
+
+    def _append(self, item: TResponseInputItem) -> None:
+        tokens = count_item(item)
+        self.items.append(item)
+        self._tokens.append(tokens)
+        self._total_tokens += tokens
+
+    def _window_start(self) -> int:
+        """Index of the oldest turn start whose suffix fits in ``max_tokens``.
+
+        Windows only start at a user message, so tool calls are never
+        separated from their outputs.
+        """
+        if self.max_tokens is None:
+            return 0
+        start = self._turn_starts[-1]
+        used = sum(self._tokens[start:])
+        for candidate in reversed(self._turn_starts[:-1]):
+            cost = sum(self._tokens[candidate:start])
+            if used + cost > self.max_tokens:
+                break
+            used += cost
+            start = candidate
+        return start
+
+    def next_turn(self, content: str | list[TResponseInputItem]) -> dict[str, Any]:
+        """Append the user's message and return ``Runner.run`` keyword arguments.
+
+        The result has ``input`` and, when continuing server side,
+        ``previous_response_id``; pass it on with ``**``.
+        """
+        self._turn_starts.append(len(self.items))
+        new_items = (
+            [{"role": "user", "content": content}] if isinstance(content, str) else content
+        )
+        for item in new_items:
+            self._append(item)
+
+        kwargs: dict[str, Any]
+        if self.server_side and self._response_id is not None:
+            start, mode = self._turn_starts[-1], "continuation"
+            kwargs = {"previous_response_id": self._response_id}
+        else:
+            start = self._window_start()
+            mode = "full" if start == 0 else "window"
+            kwargs = {}
+        kwargs["input"] = self.items[start:]
+        self._pending = TurnStats(
+            turn=len(self._turn_starts),
+            mode=mode,
+            items_sent=len(self.items) - start,
+            estimated_tokens_sent=sum(self._tokens[start:]),
+            history_items=len(self.items),
+            history_tokens=self._total_tokens,
+        )
+        return kwargs
+
+    def record(self, result: RunResult) -> TurnStats:
+        """Append the run's new items (the delta only) and close the turn."""
+        for run_item in result.new_items:
+            self._append(run_item.to_input_item())
+        self._response_id = result.last_response_id
+        if self._pending is None:
+            raise RuntimeError("record() called without a matching next_turn()")
+        stats, self._pending = self._pending, None
+        usage = result.context_wrapper.usage
+        stats.input_tokens = usage.input_tokens
+        stats.output_tokens = usage.output_tokens
+        self.stats.append(stats)
+        return stats
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Estimated size of the full transcript."""
+        return self._total_tokens
+
+    def total_tokens_sent(self) -> int:
+        """Provider-reported input tokens summed over all recorded turns."""
+        return sum(s.input_tokens for s in self.stats)
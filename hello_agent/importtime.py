@@ -0,0 +1,174 @@
+"""Import-time profile of the lesson entry points (à la ``python -X importtime``).
+
+Cold start of a short-lived worker is dominated by imports, so this profiles
+exactly the module-level ``import`` statements of each entry point, without
+running the script body (which would call the model)::
+
+    python -m hello_agent.importtime main.py basic_tools.py --top 15
+    python -m hello_agent.importtime --json importtime.json
+    python -m hello_agent.importtime --baseline importtime.json --threshold 0.2
+
+Each script is profiled ``--repeat`` times in a fresh interpreter started in
+the script's own directory, and the fastest run is kept. With
+``--baseline`` the exit status is 1 if any entry point's total import time
+grew by more than ``--threshold``.
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class ModuleTiming:
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    entry_point: str
+    total_ms: float
+    wall_ms: float
+    modules: int
+    top: list[ModuleTiming] = field(default_factory=list)
+
+
+def import_statements(path: Path) -> str:
+    """Source of the module-level imports of ``path`` (including ``try`` bodies)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    statements: list[ast.stmt] = []
+
+    def collect(body: list[ast.stmt]) -> None:
+        for node in body:
+            if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+                continue
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                statements.append(node)
+            elif isinstance(node, ast.Try):
+                collect(node.body)
+
+    collect(tree.body)
+    return "\n".join(ast.unparse(node) for node in statements)
+
+
+def parse_importtime(stderr: str) -> list[ModuleTiming]:
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level after "| ".
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        timings.append(
+            ModuleTiming(
+                module=name.strip(),
+                self_ms=int(self_us) / 1000,
+                cumulative_ms=int(cumulative_us) / 1000,
+                depth=depth,
+            )
+        )
+    return timings
+
+
+def profile(path: Path, *, repeat: int = 3, top: int = 10) -> ImportProfile:
+    code = import_statements(path)
+    # Lessons in subdirectories import hello_agent from the project root,
+    # whether or not the project is installed.
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")])
+    )
+    best: tuple[float, float, list[ModuleTiming]] | None = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=path.parent,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(f"importing {path} failed:\n{proc.stderr[-2000:]}")
+        timings = parse_importtime(proc.stderr)
+        total_ms = sum(t.cumulative_ms for t in timings if t.depth == 0)
+        if best is None or total_ms < best[0]:
+            best = (total_ms, wall_ms, timings)
+    assert best is not None
+    total_ms, wall_ms, timings = best
+    heaviest = sorted(timings, key=lambda t: t.cumulative_ms, reverse=True)[:top]
+    return ImportProfile(
+        entry_point=str(path.relative_to(PROJECT_ROOT) if path.is_relative_to(PROJECT_ROOT) else path),
+        total_ms=round(total_ms, 2),
+        wall_ms=round(wall_ms, 2),
+        modules=len(timings),
+        top=heaviest,
+    )
+
+
+def default_entry_points() -> list[Path]:
+    package = Path(__file__).resolve().parent
+    return sorted(
+        path
+        for pattern in ("*.py", "*/*.py")
+        for path in PROJECT_ROOT.glob(pattern)
+        if package not in path.parents
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile entry point import time.")
+    parser.add_argument("scripts", nargs="*", type=Path, help="defaults to every lesson script")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="heaviest modules to list per entry point")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="previous --json report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20)
+    args = parser.parse_args()
+
+    scripts = [p.resolve() for p in args.scripts] or default_entry_points()
+    profiles = []
+    for script in scripts:
+        result = profile(script, repeat=args.repeat, top=args.top)
+        profiles.append(result)
+        print(f"\n{result.entry_point}: {result.total_ms:.1f} ms in imports "
+              f"({result.modules} modules, {result.wall_ms:.0f} ms wall)")
+        for t in result.top:
+            print(f"  {t.cumulative_ms:9.1f} ms cum {t.self_ms:8.1f} ms self  {'  ' * t.depth}{t.module}")
+
+    report = {
+        "meta": {"python": sys.version.split()[0], "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")},
+        "entries": {p.entry_point: asdict(p) for p in profiles},
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)["entries"]
+        failed = False
+        for name, entry in report["entries"].items():
+            before = baseline.get(name, {}).get("total_ms")
+            if before and entry["total_ms"] > before * (1 + args.threshold):
+                print(f"REGRESSION {name}: {before:.1f} ms -> {entry['total_ms']:.1f} ms")
+                failed = True
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
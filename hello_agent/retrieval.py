@@ -0,0 +1,273 @@
+"""Send only the relevant part of a long history, found with BM25.
+
+Replaying a whole session every turn is what lets the agent remember a name
+mentioned fifty turns ago, but it also makes every prompt as long as the
+conversation. A :class:`RetrievalMemory` sits in front of each model call via
+``RunConfig.call_model_input_filter``. Once the estimated prompt crosses
+``budget_tokens`` it keeps the recent tail verbatim and, from everything
+older, only the ``top_k`` past turns that best match the current user
+message::
+
+    memory = RetrievalMemory(budget_tokens=3000, top_k=4)
+    config = RunConfig(call_model_input_filter=memory.call_model_input_filter)
+    await Runner.run(agent, "What's my name?", session=session, run_config=config)
+
+Past turns (a user message and everything up to the next one, so tool calls
+stay next to their outputs) are scored with Okapi BM25 over a local inverted
+index. Nothing leaves the process and no model is called. Indexes are
+cached per conversation by a chained hash of the turns they cover, so each
+call only tokenizes the turns added since the previous one.
+
+Unlike :class:`~hello_agent.compaction.Compactor`, nothing is summarized: an
+omitted turn is either sent word for word or not at all. That fits recall
+questions ("what's my name?") well, and fits questions about the
+conversation as a whole ("what have we decided so far?") badly.
+"""
+
+import hashlib
+import json
+import math
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from agents import TResponseInputItem
+from agents.run import CallModelData, ModelInputData
+
+from .compaction import _is_turn_start, render_transcript
+from .tokens import count_item, estimate_model_input
+
+RECALL_NOTE = (
+    "Earlier messages relevant to the user's latest message follow. Other "
+    "parts of the conversation are omitted."
+)
+
+_WORDS = re.compile(r"[^\W_]+")
+
+_STOPWORDS = frozenset(
+    "a about all am an and any are as at be been but by can could did do does "
+    "for from had has have he her him his how i if in into is it its just me "
+    "my no not of on or our s she so t than that the their them then there "
+    "these they this to too up us was we were what when where which who why "
+    "will with would you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased index terms of ``text``, without stopwords.
+
+    A trailing plural ``s`` is dropped so "pizzas" matches "pizza".
+    """
+    terms = []
+    for word in _WORDS.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+class InvertedIndex:
+    """Append-only BM25 index; documents are numbered in insertion order."""
+
+    def __init__(self, *, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.lengths: list[int] = []
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, terms: list[str]) -> int:
+        doc = len(self.lengths)
+        for term, tf in Counter(terms).items():
+            self.postings.setdefault(term, []).append((doc, tf))
+        self.lengths.append(len(terms))
+        self._total_length += len(terms)
+        return doc
+
+    def search(self, terms: list[str], k: int, *, limit: int | None = None) -> list[int]:
+        """Up to ``k`` best-scoring documents for ``terms``, best first.
+
+        Only documents numbered below ``limit`` are considered.
+        """
+        if limit is None:
+            limit = len(self.lengths)
+        if not limit or k <= 0:
+            return []
+        n = len(self.lengths)
+        average = self._total_length / n or 1.0
+        scores: dict[int, float] = {}
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings:
+                if doc >= limit:
+                    break  # postings are in document order
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / average)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores, key=lambda doc: (-scores[doc], -doc))[:k]
+
+
+class _Conversation:
+    """The index of one conversation's completed turns."""
+
+    def __init__(self) -> None:
+        self.index = InvertedIndex()
+        self.items = 0
+        """Number of leading items covered by the indexed turns."""
+
+
+@dataclass
+class RetrievalStats:
+    calls: int = 0
+    retrieval_calls: int = 0
+    turns_indexed: int = 0
+    turns_retrieved: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+
+class RetrievalMemory:
+    """Recent tail plus BM25-retrieved past turns, within a token budget.
+
+    Below ``budget_tokens`` (estimated prompt: input items, instructions and
+    tool schemas) the input is passed through. Above it, the most recent
+    turns are kept up to ``keep_recent_tokens`` (always at least the current
+    turn), and up to ``top_k`` older turns matching the latest user message
+    are added in their original order, as long as they fit in
+    ``max_recalled_tokens``. If the latest message has no searchable words,
+    only the tail is sent.
+    """
+
+    def __init__(
+        self,
+        *,
+        budget_tokens: int = 3000,
+        keep_recent_tokens: int | None = None,
+        max_recalled_tokens: int | None = None,
+        top_k: int = 4,
+        max_conversations: int = 256,
+    ) -> None:
+        if keep_recent_tokens is None:
+            keep_recent_tokens = budget_tokens // 3
+        if max_recalled_tokens is None:
+            max_recalled_tokens = budget_tokens // 3
+        if keep_recent_tokens >= budget_tokens:
+            raise ValueError("keep_recent_tokens must be smaller than budget_tokens")
+        self.budget_tokens = budget_tokens
+        self.keep_recent_tokens = keep_recent_tokens
+        self.max_recalled_tokens = max_recalled_tokens
+        self.top_k = top_k
+        self.max_conversations = max_conversations
+        self._conversations: OrderedDict[str, _Conversation] = OrderedDict()
+        self.stats = RetrievalStats()
+
+    @staticmethod
+    def _chain(items: list[TResponseInputItem], ends: list[int]) -> dict[int, str]:
+        """``hashes[end]`` identifies ``items[:end]`` for each of ``ends``."""
+        hashes = {}
+        digest = hashlib.blake2b(digest_size=16)
+        wanted = set(ends)
+        for i, item in enumerate(items[: max(ends, default=0)]):
+            digest.update(json.dumps(item, sort_keys=True, default=str).encode())
+            if i + 1 in wanted:
+                hashes[i + 1] = digest.copy().hexdigest()
+        return hashes
+
+    def _indexed(self, items: list[TResponseInputItem], starts: list[int]) -> _Conversation:
+        """Index of every turn before the last, reusing the cached prefix."""
+        # Turn t spans items[starts[t]:starts[t + 1]]; the last one is open.
+        ends = starts[1:]
+        hashes = self._chain(items, ends)
+        conversation = None
+        for end in reversed(ends):
+            conversation = self._conversations.pop(hashes[end], None)
+            if conversation is not None:
+                break
+        if conversation is None:
+            conversation = _Conversation()
+        for t in range(len(conversation.index), len(ends)):
+            turn = items[starts[t] : ends[t]]
+            conversation.index.add(tokenize(render_transcript(turn)))
+            conversation.items = ends[t]
+            self.stats.turns_indexed += 1
+        if ends:
+            # Re-keyed at its new end: the next call of this conversation
+            # finds it, and an older prefix of it no longer does.
+            self._conversations[hashes[ends[-1]]] = conversation
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+        return conversation
+
+    def select(
+        self, items: list[TResponseInputItem], *, extra_tokens: int = 0
+    ) -> list[TResponseInputItem]:
+        """Return ``items`` or the recent tail plus the most relevant turns.
+
+        ``extra_tokens`` accounts for prompt parts outside ``items``
+        (instructions, tool schemas).
+        """
+        tokens = [count_item(item) for item in items]
+        total = sum(tokens) + extra_tokens
+        self.stats.calls += 1
+        self.stats.tokens_before += total
+        starts = [i for i, item in enumerate(items) if _is_turn_start(item)]
+        if total <= self.budget_tokens or len(starts) < 2:
+            self.stats.tokens_after += total
+            return items
+
+        # Recent tail: whole turns, newest first, within keep_recent_tokens.
+        tail_turn = len(starts) - 1
+        tail = sum(tokens[starts[tail_turn] :])
+        while tail_turn > 0:
+            size = sum(tokens[starts[tail_turn - 1] : starts[tail_turn]])
+            if tail + size > self.keep_recent_tokens:
+                break
+            tail += size
+            tail_turn -= 1
+        if tail_turn == 0:
+            self.stats.tokens_after += total
+            return items
+
+        conversation = self._indexed(items, starts)
+        query = tokenize(render_transcript([items[starts[-1]]]))
+        hits = conversation.index.search(query, self.top_k, limit=tail_turn)
+
+        recalled: list[int] = []
+        budget = self.max_recalled_tokens - count_item(self._note_item())
+        for t in hits:
+            size = sum(tokens[starts[t] : starts[t + 1]])
+            if size <= budget:
+                recalled.append(t)
+                budget -= size
+
+        # Anything before the first user message (e.g. a system prompt kept
+        # in the history) stays in place.
+        selected = items[: starts[0]]
+        if recalled:
+            selected.append(self._note_item())
+            for t in sorted(recalled):
+                selected.extend(items[starts[t] : starts[t + 1]])
+        selected.extend(items[starts[tail_turn] :])
+
+        self.stats.retrieval_calls += 1
+        self.stats.turns_retrieved += len(recalled)
+        self.stats.tokens_after += sum(count_item(item) for item in selected) + extra_tokens
+        return selected
+
+    @staticmethod
+    def _note_item() -> TResponseInputItem:
+        return {"role": "system", "content": RECALL_NOTE}
+
+    async def call_model_input_filter(self, data: CallModelData[Any]) -> ModelInputData:
+        """``RunConfig.call_model_input_filter`` hook trimming every model call."""
+        estimate = estimate_model_input(data)
+        selected = self.select(data.model_data.input, extra_tokens=estimate.total - estimate.history)
+        return ModelInputData(input=selected, instructions=data.model_data.instructions)
@@ -0,0 +1,33 @@
+"""Session storage for agents serving many concurrent conversations."""
+
+from .cache import CachedSession, CacheStats, SessionCache
+from .codecs import CompactCodec, ItemCodec, ZlibCodec, ZstdCodec, train_dictionary
+from .janitor import Janitor, JanitorStats, RetentionPolicy
+from .log import LogStats, LogStore
+from .sharded import ShardedSessionStore, shard_for
+from .store import ItemPage, SessionStore, StoreSession, StoreStats
+from .transfer import export_sessions, import_sessions
+
+__all__ = [
+    "CacheStats",
+    "CachedSession",
+    "CompactCodec",
+    "ItemCodec",
+    "ItemPage",
+    "Janitor",
+    "JanitorStats",
+    "LogStats",
+    "LogStore",
+    "RetentionPolicy",
+    "SessionCache",
+    "SessionStore",
+    "ShardedSessionStore",
+    "StoreSession",
+    "StoreStats",
+    "ZlibCodec",
+    "ZstdCodec",
+    "export_sessions",
+    "import_sessions",
+    "shard_for",
+    "train_dictionary",
+]
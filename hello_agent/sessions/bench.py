@@ -0,0 +1,183 @@
+"""Throughput benchmark: SessionStore vs. SQLiteSession under many sessions.
+
+Every simulated conversation does what ``Runner.run`` does with a session
+on each turn, loading the history and then appending the turn's items, with
+all conversations running concurrently::
+
+    python -m hello_agent.sessions.bench --sessions 10000 --turns 3
+    python -m hello_agent.sessions.bench --sessions 2000 --baseline --json out.json
+    python -m hello_agent.sessions.bench --shards 8
+    python -m hello_agent.sessions.bench --log
+
+Prints items written per second, per-operation latency percentiles and how
+well writes were grouped into commits.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any
+
+from agents import SQLiteSession
+from agents.memory import Session
+
+from ..bench.report import summarize
+from .codecs import CompactCodec, ZlibCodec
+from .log import LogStore
+from .sharded import ShardedSessionStore
+from .store import SessionStore
+
+
+def _turn_items(session: int, turn: int, per_turn: int) -> list[dict[str, Any]]:
+    items: list[dict[str, Any]] = [
+        {"role": "user", "content": f"session {session} turn {turn}: what's the weather like?"}
+    ]
+    for i in range(per_turn - 1):
+        items.append(
+            {
+                "role": "assistant",
+                "content": f"Reply {i} for turn {turn}: it is sunny and 22 degrees.",
+            }
+        )
+    return items
+
+
+async def drive(
+    sessions: list[Session], *, turns: int, items_per_turn: int, concurrency: int
+) -> dict[str, Any]:
+    reads: list[float] = []
+    writes: list[float] = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def conversation(index: int, session: Session) -> None:
+        for turn in range(turns):
+            async with gate:
+                start = time.perf_counter()
+                await session.get_items()
+                middle = time.perf_counter()
+                await session.add_items(_turn_items(index, turn, items_per_turn))
+                end = time.perf_counter()
+            reads.append((middle - start) * 1000)
+            writes.append((end - middle) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(conversation(i, s) for i, s in enumerate(sessions)))
+    elapsed = time.perf_counter() - started
+    items = len(sessions) * turns * items_per_turn
+    return {
+        "sessions": len(sessions),
+        "items": items,
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(items / elapsed, 1),
+        "turns_per_sec": round(len(sessions) * turns / elapsed, 1),
+        "get_items_ms": summarize(reads),
+        "add_items_ms": summarize(writes),
+    }
+
+
+async def bench_store(path: str, args: argparse.Namespace) -> dict[str, Any]:
+    codec = {"json": None, "compact": CompactCodec(), "zlib": ZlibCodec()}[args.codec]
+    options = {
+        "readers": args.readers,
+        "max_batch": args.max_batch,
+        "linger": args.linger,
+        "codec": codec,
+    }
+    store: SessionStore | ShardedSessionStore | LogStore
+    if args.log:
+        store = LogStore(path, codec=codec)
+    elif args.shards:
+        store = ShardedSessionStore(path, args.shards, **options)
+    else:
+        store = SessionStore(path, **options)
+    try:
+        sessions = [store.session(f"user_{i}") for i in range(args.sessions)]
+        result = await drive(
+            sessions,
+            turns=args.turns,
+            items_per_turn=args.items,
+            concurrency=args.concurrency or args.sessions,
+        )
+    finally:
+        store.close()
+    if isinstance(store, LogStore):
+        result["bytes_written"] = store.stats.bytes_written
+        return result
+    stats = store.stats if isinstance(store.stats, list) else [store.stats]
+    commits = sum(s.commits for s in stats)
+    result["shards"] = len(stats)
+    result["commits"] = commits
+    result["ops_per_commit"] = round(sum(s.write_ops for s in stats) / max(commits, 1), 1)
+    result["largest_group"] = max(s.largest_group for s in stats)
+    return result
+
+
+async def bench_sqlite_session(path: str, args: argparse.Namespace) -> dict[str, Any]:
+    sessions = [SQLiteSession(f"user_{i}", path) for i in range(args.sessions)]
+    try:
+        return await drive(
+            sessions,
+            turns=args.turns,
+            items_per_turn=args.items,
+            concurrency=args.concurrency or args.sessions,
+        )
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def _print(name: str, result: dict[str, Any]) -> None:
+    line = (
+        f"{name:<14} {result['items_per_sec']:>10.0f} items/s "
+        f"{result['turns_per_sec']:>9.0f} turns/s  "
+        f"add p50/p99 {result['add_items_ms']['p50']:.1f}/{result['add_items_ms']['p99']:.1f} ms  "
+        f"get p50/p99 {result['get_items_ms']['p50']:.1f}/{result['get_items_ms']['p99']:.1f} ms"
+    )
+    if "commits" in result:
+        line += f"  {result['ops_per_commit']} writes/commit"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark session storage backends.")
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--items", type=int, default=2, help="items appended per turn")
+    parser.add_argument("--concurrency", type=int, default=0, help="0 = all sessions at once")
+    parser.add_argument("--shards", type=int, default=0, help="use a ShardedSessionStore")
+    parser.add_argument("--log", action="store_true", help="use the mmap LogStore")
+    parser.add_argument("--codec", choices=["json", "compact", "zlib"], default="json")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--linger", type=float, default=0.0)
+    parser.add_argument("--db", help="database directory (default: a temp dir)")
+    parser.add_argument("--baseline", action="store_true", help="also run SQLiteSession")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.db) as tmp:
+        if args.log:
+            name, path = "LogStore", os.path.join(tmp, "log")
+        elif args.shards:
+            name, path = f"{args.shards} shards", os.path.join(tmp, "shards")
+        else:
+            name, path = "SessionStore", os.path.join(tmp, "store.db")
+        results = {"store": asyncio.run(bench_store(path, args))}
+        _print(name, results["store"])
+        if args.baseline:
+            results["sqlite_session"] = asyncio.run(
+                bench_sqlite_session(os.path.join(tmp, "baseline.db"), args)
+            )
+            _print("SQLiteSession", results["sqlite_session"])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+            fh.write("\n")
+
+
+if __name__ == "__main__":
+    main()
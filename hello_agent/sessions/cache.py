@@ -0,0 +1,346 @@
+"""In-memory LRU cache in front of persistent sessions.
+
+``Runner.run`` calls ``session.get_items()`` at the start of every turn, so a
+persistent session re-reads (and re-parses) the whole history from disk per
+turn. A :class:`SessionCache` keeps hot sessions' items in memory, bounded
+by their total serialized size, and serves reads from there::
+
+    cache = SessionCache(max_bytes=64 * 1024 * 1024)
+    session = cache.wrap(SQLiteSession("user_123", "conversations.db"))
+    await Runner.run(agent, "Hi", session=session)
+
+Writes are handled according to ``mode``:
+
+* ``"write-through"`` (default): ``add_items`` / ``pop_item`` /
+  ``clear_session`` return once the underlying session has them. Nothing is
+  lost if the process dies.
+* ``"write-back"``: writes update memory and return immediately; a
+  background task flushes them to the underlying session every
+  ``flush_interval`` seconds, in order. Up to that much history can be lost
+  on a crash. Call :meth:`SessionCache.flush` (or ``aclose``) before the
+  event loop ends; write-back needs a long-lived loop such as the chat
+  server's or :class:`~hello_agent.SyncRunner`'s, not ``Runner.run_sync``.
+
+Dirty sessions are never evicted. A cache belongs to one event loop at a
+time.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from agents import TResponseInputItem
+from agents.memory import Session, SessionABC
+
+logger = logging.getLogger(__name__)
+
+Mode = Literal["write-through", "write-back"]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    flushes: int = 0
+    """Sessions flushed to the underlying store (write-back)."""
+    flushed_ops: int = 0
+    flush_errors: int = 0
+    bytes: int = 0
+    """Serialized size of all cached items."""
+    sessions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _size(item: TResponseInputItem) -> int:
+    return len(json.dumps(item, separators=(",", ":"), default=str))
+
+
+@dataclass
+class _Entry:
+    backend: Session
+    items: list[TResponseInputItem] | None = None
+    """``None`` until loaded from the backend."""
+    sizes: list[int] = field(default_factory=list)
+    bytes: int = 0
+    pending: list[tuple[str, Any]] = field(default_factory=list)
+    """Write-back operations not yet applied to the backend, in order."""
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    flush_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+    """Operations in progress; entries in use are not evicted."""
+
+
+class SessionCache:
+    """Shared LRU of session histories; see the module docs.
+
+    ``max_bytes`` bounds the serialized size of cached items across all
+    sessions. A single session larger than that is still served, it just
+    evicts everything else that's clean.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        *,
+        mode: Mode = "write-through",
+        flush_interval: float = 0.5,
+    ) -> None:
+        if mode not in ("write-through", "write-back"):
+            raise ValueError(f"unknown cache mode {mode!r}")
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._dirty: set[str] = set()
+        self._flusher: asyncio.Task[None] | None = None
+
+    def wrap(self, session: Session) -> "CachedSession":
+        """A ``Session`` that reads through this cache and writes to ``session``."""
+        entry = self._entries.get(session.session_id)
+        if entry is not None:
+            entry.backend = session
+        return CachedSession(session, self)
+
+    # -- bookkeeping ------------------------------------------------------
+
+    def _entry(self, session: Session) -> _Entry:
+        entry = self._entries.get(session.session_id)
+        if entry is None:
+            entry = self._entries[session.session_id] = _Entry(session)
+        else:
+            self._entries.move_to_end(session.session_id)
+        return entry
+
+    def _set_items(self, entry: _Entry, items: list[TResponseInputItem]) -> None:
+        self.stats.bytes -= entry.bytes
+        entry.items = list(items)
+        entry.sizes = [_size(item) for item in items]
+        entry.bytes = sum(entry.sizes)
+        self.stats.bytes += entry.bytes
+
+    def _append(self, entry: _Entry, items: list[TResponseInputItem]) -> None:
+        assert entry.items is not None
+        sizes = [_size(item) for item in items]
+        entry.items.extend(items)
+        entry.sizes.extend(sizes)
+        entry.bytes += sum(sizes)
+        self.stats.bytes += sum(sizes)
+
+    def _pop(self, entry: _Entry) -> TResponseInputItem | None:
+        if not entry.items:
+            return None
+        size = entry.sizes.pop()
+        entry.bytes -= size
+        self.stats.bytes -= size
+        return entry.items.pop()
+
+    def _evict(self) -> None:
+        self.stats.sessions = len(self._entries)
+        if self.stats.bytes <= self.max_bytes:
+            return
+        for session_id in list(self._entries):
+            entry = self._entries[session_id]
+            if entry.users or session_id in self._dirty:
+                continue
+            del self._entries[session_id]
+            self.stats.bytes -= entry.bytes
+            if entry.items is not None:
+                self.stats.evictions += 1
+            if self.stats.bytes <= self.max_bytes:
+                break
+        self.stats.sessions = len(self._entries)
+
+    async def _loaded(self, entry: _Entry) -> None:
+        """Fill ``entry`` from its backend; call with ``entry.lock`` held."""
+        if entry.items is None:
+            self.stats.misses += 1
+            self._set_items(entry, await entry.backend.get_items())
+        else:
+            self.stats.hits += 1
+
+    # -- session operations -----------------------------------------------
+
+    async def get_items(
+        self, session: Session, limit: int | None = None
+    ) -> list[TResponseInputItem]:
+        entry = self._entry(session)
+        entry.users += 1
+        try:
+            async with entry.lock:
+                await self._loaded(entry)
+                assert entry.items is not None
+                items = entry.items if limit is None else entry.items[-limit:] if limit > 0 else []
+                return list(items)
+        finally:
+            entry.users -= 1
+            self._evict()
+
+    async def add_items(self, session: Session, items: list[TResponseInputItem]) -> None:
+        if not items:
+            return
+        entry = self._entry(session)
+        entry.users += 1
+        try:
+            async with entry.lock:
+                await self._loaded(entry)
+                if self.mode == "write-through":
+                    await session.add_items(items)
+                else:
+                    self._queue(entry, session, ("add", list(items)))
+                self._append(entry, items)
+        finally:
+            entry.users -= 1
+            self._evict()
+
+    async def pop_item(self, session: Session) -> TResponseInputItem | None:
+        entry = self._entry(session)
+        entry.users += 1
+        try:
+            async with entry.lock:
+                await self._loaded(entry)
+                if self.mode == "write-through":
+                    item = await session.pop_item()
+                    if item is not None:
+                        self._pop(entry)
+                    return item
+                item = self._pop(entry)
+                if item is not None:
+                    self._queue(entry, session, ("pop", None))
+                return item
+        finally:
+            entry.users -= 1
+            self._evict()
+
+    async def clear_session(self, session: Session) -> None:
+        entry = self._entry(session)
+        entry.users += 1
+        try:
+            async with entry.lock:
+                if self.mode == "write-through":
+                    await session.clear_session()
+                else:
+                    # Nothing queued before a clear matters any more.
+                    entry.pending.clear()
+                    self._queue(entry, session, ("clear", None))
+                self._set_items(entry, [])
+        finally:
+            entry.users -= 1
+            self._evict()
+
+    # -- write-back -------------------------------------------------------
+
+    def _queue(self, entry: _Entry, session: Session, op: tuple[str, Any]) -> None:
+        entry.backend = session
+        entry.pending.append(op)
+        self._dirty.add(session.session_id)
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            self._flusher = loop.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Failed sessions stay dirty; keep retrying them every interval.
+                logger.warning("write-back flush failed; will retry", exc_info=True)
+
+    async def _flush_entry(self, session_id: str) -> None:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            self._dirty.discard(session_id)
+            return
+        entry.users += 1  # not evictable until the backend has caught up
+        try:
+            async with entry.flush_lock:
+                await self._apply_pending(session_id, entry)
+        finally:
+            entry.users -= 1
+
+    async def _apply_pending(self, session_id: str, entry: _Entry) -> None:
+        async with entry.lock:
+            ops, entry.pending = entry.pending, []
+            self._dirty.discard(session_id)
+        if not ops:
+            return
+        backend = entry.backend
+        for done, (kind, arg) in enumerate(ops):
+            try:
+                if kind == "add":
+                    await backend.add_items(arg)
+                elif kind == "pop":
+                    await backend.pop_item()
+                else:
+                    await backend.clear_session()
+            except Exception:
+                # Put the rest back in front of anything queued since.
+                self.stats.flush_errors += 1
+                entry.pending[:0] = ops[done:]
+                self._dirty.add(session_id)
+                raise
+            self.stats.flushed_ops += 1
+        self.stats.flushes += 1
+
+    async def flush(self) -> None:
+        """Write every pending operation to the underlying sessions.
+
+        Failed sessions stay dirty and are retried on the next flush; the
+        first error is re-raised after all sessions have been tried.
+        """
+        results = await asyncio.gather(
+            *(self._flush_entry(sid) for sid in list(self._dirty)), return_exceptions=True
+        )
+        self._evict()
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def aclose(self) -> None:
+        """Flush everything and stop the background flusher."""
+        await self.flush()
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        self._flusher = None
+
+    def invalidate(self, session_id: str | None = None) -> None:
+        """Drop clean cached items for one session (or all), e.g. after
+        something else wrote to the underlying store."""
+        ids = [session_id] if session_id is not None else list(self._entries)
+        for sid in ids:
+            entry = self._entries.get(sid)
+            if entry is None or entry.users or sid in self._dirty:
+                continue
+            del self._entries[sid]
+            self.stats.bytes -= entry.bytes
+        self.stats.sessions = len(self._entries)
+
+
+class CachedSession(SessionABC):
+    """A session whose reads are served by a :class:`SessionCache`."""
+
+    def __init__(self, session: Session, cache: SessionCache) -> None:
+        self.session_id = session.session_id
+        self.session = session
+        self.cache = cache
+
+    async def get_items(self, limit: int | None = None) -> list[TResponseInputItem]:
+        return await self.cache.get_items(self.session, limit)
+
+    async def add_items(self, items: list[TResponseInputItem]) -> None:
+        await self.cache.add_items(self.session, items)
+
+    async def pop_item(self) -> TResponseInputItem | None:
+        return await self.cache.pop_item(self.session)
+
+    async def clear_session(self) -> None:
+        await self.cache.clear_session(self.session)
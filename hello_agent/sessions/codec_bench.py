@@ -0,0 +1,162 @@
+"""Bytes-per-item and throughput of the session item codecs.
+
+::
+
+    python -m hello_agent.sessions.codec_bench
+    python -m hello_agent.sessions.codec_bench --db conversations.db --json out.json
+
+Samples come from an existing session database (``--db``, any format the
+store can read) or from a synthetic mix of chat, tool-call and reasoning
+items. Dictionaries are trained on one half of the samples and measured on
+the other, as they would be on live traffic.
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import time
+from typing import Any, Callable
+
+from agents import TResponseInputItem
+
+from . import codecs
+from .codecs import CompactCodec, Decoders, ItemCodec, ZlibCodec, ZstdCodec, train_dictionary
+
+_WORDS = (
+    "the weather in Paris is sunny today and the forecast says it will stay warm "
+    "until the weekend when rain is expected please remind me to book the train "
+    "tickets and check my calendar for meetings with the design team about pizza"
+).split()
+
+
+def _sentence(rng: random.Random, lo: int, hi: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(lo, hi))).capitalize() + "."
+
+
+def synthetic_items(n: int, seed: int = 0) -> list[TResponseInputItem]:
+    """A mix shaped like what ``Runner`` stores for tool-using chat agents."""
+    rng = random.Random(seed)
+    items: list[Any] = []
+    while len(items) < n:
+        items.append({"role": "user", "content": _sentence(rng, 4, 20)})
+        if rng.random() < 0.4:
+            call_id = f"call_{rng.getrandbits(64):016x}"
+            items.append(
+                {
+                    "type": "function_call",
+                    "call_id": call_id,
+                    "name": rng.choice(["get_weather", "search_web", "add_numbers"]),
+                    "arguments": json.dumps({"city": rng.choice(["Paris", "Lahore", "Tokyo"])}),
+                    "id": f"fc_{rng.getrandbits(48):012x}",
+                }
+            )
+            items.append(
+                {"type": "function_call_output", "call_id": call_id, "output": _sentence(rng, 3, 12)}
+            )
+        items.append(
+            {
+                "id": f"msg_{rng.getrandbits(64):016x}",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [
+                    {
+                        "type": "output_text",
+                        "text": " ".join(_sentence(rng, 5, 18) for _ in range(rng.randint(1, 4))),
+                        "annotations": [],
+                        "logprobs": [],
+                    }
+                ],
+            }
+        )
+    return items[:n]
+
+
+def items_from_db(path: str, table: str, n: int) -> list[TResponseInputItem]:
+    decoders = Decoders()
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            f"SELECT message_data FROM {table} ORDER BY id DESC LIMIT ?", (n,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [decoders.decode(row[0]) for row in rows]
+
+
+def _rate(fn: Callable[[], Any], count: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return count / best if best else 0.0
+
+
+def measure(
+    name: str,
+    encode: Callable[[Any], str | bytes],
+    decode: Callable[[Any], Any],
+    items: list[TResponseInputItem],
+    repeat: int,
+) -> dict[str, Any]:
+    encoded = [encode(item) for item in items]
+    assert [decode(e) for e in encoded] == items, f"{name} does not round-trip"
+    sizes = [len(e.encode() if isinstance(e, str) else e) for e in encoded]
+    return {
+        "codec": name,
+        "bytes_per_item": round(sum(sizes) / len(sizes), 1),
+        "encode_per_sec": round(_rate(lambda: [encode(i) for i in items], len(items), repeat)),
+        "decode_per_sec": round(_rate(lambda: [decode(e) for e in encoded], len(items), repeat)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark session item codecs.")
+    parser.add_argument("--items", type=int, default=4000)
+    parser.add_argument("--db", help="sample items from this session database")
+    parser.add_argument("--table", default="agent_messages")
+    parser.add_argument("--dict-size", type=int, default=16384)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    items = (
+        items_from_db(args.db, args.table, args.items) if args.db else synthetic_items(args.items)
+    )
+    train, test = items[::2], items[1::2]
+    dictionary = train_dictionary(train, args.dict_size)
+
+    candidates: list[tuple[str, ItemCodec]] = [
+        ("compact", CompactCodec()),
+        ("zlib", ZlibCodec()),
+        ("zlib+dict", ZlibCodec(dictionary)),
+    ]
+    if codecs.zstandard is not None:
+        candidates += [("zstd", ZstdCodec()), ("zstd+dict", ZstdCodec(dictionary))]
+
+    results = [measure("json", json.dumps, json.loads, test, args.repeat)]
+    for name, codec in candidates:
+        results.append(measure(name, codec.encode, codec.decode, test, args.repeat))
+
+    baseline = results[0]["bytes_per_item"]
+    print(f"{len(test)} items, dictionary {len(dictionary)} bytes")
+    print(f"{'codec':<10} {'bytes/item':>10} {'vs json':>8} {'encode/s':>10} {'decode/s':>10}")
+    for r in results:
+        r["ratio"] = round(r["bytes_per_item"] / baseline, 3)
+        print(
+            f"{r['codec']:<10} {r['bytes_per_item']:>10.1f} {r['ratio']:>8.2f} "
+            f"{r['encode_per_sec']:>10,} {r['decode_per_sec']:>10,}"
+        )
+    if codecs.zstandard is None:
+        print("(zstandard not installed; zstd codecs skipped)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"dictionary_bytes": len(dictionary), "results": results}, fh, indent=2)
+            fh.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Pluggable encodings for stored session items.
+
+``SQLiteSession`` stores every item as ``json.dumps`` text, repeating keys
+like ``"role"``, ``"content"`` and ``"type"`` in every row. A
+:class:`SessionStore` can be given an :class:`ItemCodec` instead:
+
+* :class:`CompactCodec`: a small tagged binary format where common keys and
+  values (``"role"``, ``"assistant"``, ``"output_text"``, ...) are one byte;
+* :class:`ZlibCodec`: compact encoding + zlib, optionally primed with a
+  shared dictionary (see :func:`train_dictionary`) so even short items
+  compress;
+* :class:`ZstdCodec`: the same with zstandard, if ``zstandard`` is
+  installed.
+
+Encoded values are stored as BLOBs starting with a one-byte codec tag;
+legacy JSON rows are TEXT. Reads accept both, so switching codecs needs no
+migration up front: old rows stay readable and
+:meth:`SessionStore.migrate` rewrites them in the background. To rotate a
+dictionary, pass the old codec in ``decoders`` so its rows stay readable.
+"""
+
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Iterable
+
+from agents import TResponseInputItem
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+# Tags identify the codec (and format version) of a stored BLOB.
+TAG_COMPACT = 0x01
+TAG_ZLIB = 0x02
+TAG_ZSTD = 0x03
+
+# Strings interned as a single byte by the compact format. Append only:
+# the position of each entry is part of the on-disk format.
+_INTERNED = (
+    "role", "content", "type", "text", "user", "assistant", "system", "developer",
+    "message", "input_text", "output_text", "annotations", "id", "status",
+    "completed", "in_progress", "incomplete", "function_call", "function_call_output",
+    "call_id", "name", "arguments", "output", "reasoning", "summary", "summary_text",
+    "logprobs", "refusal", "input_image", "image_url", "detail", "auto", "file_id",
+    "encrypted_content", "tool_calls", "tool_call_id", "function",
+)  # fmt: skip
+_INTERN_INDEX = {s: i for i, s in enumerate(_INTERNED)}
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _DICT, _ATOM = range(9)
+_FLOAT_STRUCT = struct.Struct("<d")
+
+
+class ItemCodec(ABC):
+    """Turns an item into bytes and back.
+
+    Subclasses set ``tag`` and implement :meth:`encode` and :meth:`decode`.
+    """
+
+    tag: int = 0
+    dictionary_id: int = 0
+    """Identifies the shared dictionary a compressing codec was built with."""
+
+    @abstractmethod
+    def encode(self, item: TResponseInputItem) -> bytes: ...
+
+    @abstractmethod
+    def decode(self, data: bytes) -> TResponseInputItem: ...
+
+    @property
+    def key(self) -> tuple[int, int]:
+        return self.tag, self.dictionary_id
+
+    @property
+    def header(self) -> bytes:
+        """Prefix of every value this codec encodes."""
+        return bytes((self.tag,))
+
+
+def _varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _pack(out: bytearray, value: Any) -> None:
+    if isinstance(value, str):
+        index = _INTERN_INDEX.get(value)
+        if index is not None:
+            out.append(_ATOM)
+            out.append(index)
+        else:
+            raw = value.encode()
+            out.append(_STR)
+            _varint(out, len(raw))
+            out += raw
+    elif value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        _varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _FLOAT_STRUCT.pack(value)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _varint(out, len(value))
+        for key, item in value.items():
+            _pack(out, str(key))
+            _pack(out, item)
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _varint(out, len(value))
+        for item in value:
+            _pack(out, item)
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__} in a session item")
+
+
+def _unpack(data: bytes, pos: int) -> tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _ATOM:
+        return _INTERNED[data[pos]], pos + 1
+    if tag == _STR:
+        n, pos = _read_varint(data, pos)
+        return data[pos : pos + n].decode(), pos + n
+    if tag == _DICT:
+        n, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(n):
+            key, pos = _unpack(data, pos)
+            result[key], pos = _unpack(data, pos)
+        return result, pos
+    if tag == _LIST:
+        n, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(n):
+            item, pos = _unpack(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == _INT:
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == _FLOAT:
+        return _FLOAT_STRUCT.unpack_from(data, pos)[0], pos + 8
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    raise ValueError(f"corrupt compact item (tag {tag})")
+
+
+def pack_item(item: TResponseInputItem) -> bytes:
+    """The compact encoding of ``item``, without a codec tag."""
+    out = bytearray()
+    _pack(out, item)
+    return bytes(out)
+
+
+def unpack_item(data: bytes) -> TResponseInputItem:
+    value, _ = _unpack(data, 0)
+    return value
+
+
+class CompactCodec(ItemCodec):
+    """Tagged binary encoding with interned common keys and values."""
+
+    tag = TAG_COMPACT
+
+    def encode(self, item: TResponseInputItem) -> bytes:
+        out = bytearray((TAG_COMPACT,))
+        _pack(out, item)
+        return bytes(out)
+
+    def decode(self, data: bytes) -> TResponseInputItem:
+        value, _ = _unpack(data, 1)
+        return value
+
+
+def _dictionary_id(dictionary: bytes) -> int:
+    return zlib.crc32(dictionary) if dictionary else 0
+
+
+class ZlibCodec(ItemCodec):
+    """Compact encoding compressed with zlib, primed with ``dictionary``.
+
+    zlib only looks back 32 KiB, so only the last 32 KiB of the dictionary
+    is used. Blobs carry the dictionary's CRC so a mismatched codec fails
+    loudly instead of returning garbage.
+    """
+
+    tag = TAG_ZLIB
+
+    def __init__(self, dictionary: bytes = b"", *, level: int = 6) -> None:
+        self.dictionary = dictionary[-32768:]
+        self.dictionary_id = _dictionary_id(self.dictionary)
+        self.level = level
+        self._header = struct.pack("<BI", TAG_ZLIB, self.dictionary_id)
+        # Loading a dictionary costs more than compressing a short item, so
+        # prime one (de)compressor and copy it per item. Raw deflate: the
+        # zlib header and checksum would cost 6 bytes a row.
+        if self.dictionary:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=self.dictionary)
+            self._decompressor = zlib.decompressobj(-15, zdict=self.dictionary)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+            self._decompressor = zlib.decompressobj(-15)
+
+    @property
+    def header(self) -> bytes:
+        return self._header
+
+    def encode(self, item: TResponseInputItem) -> bytes:
+        compressor = self._compressor.copy()
+        return self._header + compressor.compress(pack_item(item)) + compressor.flush()
+
+    def decode(self, data: bytes) -> TResponseInputItem:
+        decompressor = self._decompressor.copy()
+        return unpack_item(decompressor.decompress(data[5:]) + decompressor.flush())
+
+
+class ZstdCodec(ItemCodec):
+    """Compact encoding compressed with zstandard (``pip install zstandard``)."""
+
+    tag = TAG_ZSTD
+
+    def __init__(self, dictionary: bytes = b"", *, level: int = 3) -> None:
+        if zstandard is None:
+            raise RuntimeError("ZstdCodec needs the zstandard package")
+        self.dictionary = dictionary
+        self.dictionary_id = _dictionary_id(dictionary)
+        self.level = level
+        self._header = struct.pack("<BI", TAG_ZSTD, self.dictionary_id)
+        zdict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self._compressor = zstandard.ZstdCompressor(
+            level=level, dict_data=zdict, write_content_size=True, write_checksum=False
+        )
+        self._decompressor = zstandard.ZstdDecompressor(dict_data=zdict)
+
+    @property
+    def header(self) -> bytes:
+        return self._header
+
+    def encode(self, item: TResponseInputItem) -> bytes:
+        return self._header + self._compressor.compress(pack_item(item))
+
+    def decode(self, data: bytes) -> TResponseInputItem:
+        return unpack_item(self._decompressor.decompress(data[5:]))
+
+
+def train_dictionary(items: Iterable[TResponseInputItem], size: int = 16384) -> bytes:
+    """Build a shared compression dictionary from sample items.
+
+    Uses zstandard's trainer when it is installed. Otherwise the dictionary
+    is the most frequent encoded fragments of the samples (whole items and
+    their string values), most common last, which is where zlib finds
+    matches most cheaply.
+    """
+    packed = [pack_item(item) for item in items]
+    if not packed:
+        return b""
+    if zstandard is not None and len(packed) >= 8:
+        try:
+            return zstandard.train_dictionary(size, packed).as_bytes()
+        except zstandard.ZstdError:
+            pass  # too few samples; fall through
+
+    fragments: Counter[bytes] = Counter()
+    for blob in packed:
+        fragments[blob] += 1
+        item = unpack_item(blob)
+        for value in _strings(item):
+            if len(value) >= 4:
+                fragments[value.encode()] += 1
+    # Frequency times length approximates the bytes each fragment saves.
+    ranked = sorted(fragments, key=lambda f: fragments[f] * len(f))
+    chosen: list[bytes] = []
+    used = 0
+    for fragment in reversed(ranked):
+        if used + len(fragment) > size:
+            continue
+        chosen.append(fragment)
+        used += len(fragment)
+    return b"".join(reversed(chosen))
+
+
+def _strings(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+class Decoders:
+    """Decodes any stored value: legacy JSON text or a tagged BLOB."""
+
+    def __init__(self, codecs: Iterable[ItemCodec] = ()) -> None:
+        self._codecs: dict[tuple[int, int], ItemCodec] = {}
+        self.register(CompactCodec())
+        self.register(ZlibCodec())
+        if zstandard is not None:
+            self.register(ZstdCodec())
+        for codec in codecs:
+            self.register(codec)
+
+    def register(self, codec: ItemCodec) -> None:
+        self._codecs[codec.key] = codec
+
+    def decode(self, value: str | bytes) -> TResponseInputItem:
+        if isinstance(value, str):
+            return json.loads(value)
+        tag = value[0]
+        dictionary_id = struct.unpack_from("<I", value, 1)[0] if tag != TAG_COMPACT else 0
+        codec = self._codecs.get((tag, dictionary_id))
+        if codec is None:
+            raise ValueError(
+                f"no codec registered for tag {tag:#x} / dictionary {dictionary_id:#010x}"
+            )
+        return codec.decode(value)
@@ -0,0 +1,263 @@
+"""Expire old sessions, trim long ones and give the space back.
+
+Nothing ever deletes from a session database, so it only grows, and the
+bigger the file the slower the cold reads. A :class:`Janitor` applies a
+:class:`RetentionPolicy` to a :class:`SessionStore` (or every shard of a
+:class:`ShardedSessionStore`) in the background::
+
+    janitor = Janitor(store, RetentionPolicy(ttl=7 * 86400, max_items=500))
+    janitor.start()          # sweeps every ``interval`` seconds
+    ...
+    await janitor.stop()
+    print(janitor.stats)
+
+All work is done in small batches, each one a single operation in the
+store's group commit, so foreground reads and writes keep flowing between
+batches. Freed pages are returned to the filesystem with SQLite's
+incremental vacuum, which needs ``auto_vacuum=INCREMENTAL``: stores create
+new databases that way, older files can be converted once with
+:meth:`Janitor.enable_incremental_vacuum`.
+
+A :class:`SessionCache` in front of the store doesn't notice expiry; call
+its ``invalidate()`` after a sweep if both are used.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+
+from .sharded import ShardedSessionStore
+from .store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    ttl: float | None = None
+    """Seconds since a session's last write after which it is deleted."""
+    max_items: int | None = None
+    """Keep only the newest N items of each session."""
+    batch_size: int = 100
+    """Sessions expired (or trimmed) per write operation."""
+    vacuum_pages: int = 256
+    """Pages released to the filesystem per write operation; 0 disables."""
+    pause: float = 0.0
+    """Seconds to sleep between batches, to leave more room for traffic."""
+
+    def __post_init__(self) -> None:
+        if self.max_items is not None and self.max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+
+@dataclass
+class JanitorStats:
+    runs: int = 0
+    errors: int = 0
+    sessions_expired: int = 0
+    items_expired: int = 0
+    items_trimmed: int = 0
+    pages_reclaimed: int = 0
+    bytes_reclaimed: int = 0
+    last_run_seconds: float = 0.0
+    db_bytes: int = 0
+    """Size of the database file(s) after the last run."""
+    wal_bytes: int = 0
+    """Size of the write-ahead log(s) after the last run."""
+
+
+class Janitor:
+    """Applies ``policy`` to ``store`` every ``interval`` seconds once started."""
+
+    def __init__(
+        self,
+        store: SessionStore | ShardedSessionStore,
+        policy: RetentionPolicy,
+        *,
+        interval: float = 300.0,
+    ) -> None:
+        self.store = store
+        self.policy = policy
+        self.interval = interval
+        self.stats = JanitorStats()
+        self._task: asyncio.Task[None] | None = None
+
+    def _stores(self) -> list[SessionStore]:
+        if isinstance(self.store, ShardedSessionStore):
+            return self.store.stores
+        return [self.store]
+
+    # -- sweeps -----------------------------------------------------------
+
+    async def _pause(self) -> None:
+        await asyncio.sleep(self.policy.pause)
+
+    async def _expire(self, store: SessionStore) -> None:
+        ttl = self.policy.ttl
+        if ttl is None:
+            return
+        batch = self.policy.batch_size
+
+        def apply(conn: sqlite3.Connection) -> tuple[int, int]:
+            ids = [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT session_id FROM {store.sessions_table} "
+                    "WHERE updated_at < datetime('now', ?) LIMIT ?",
+                    (f"-{ttl} seconds", batch),
+                )
+            ]
+            if not ids:
+                return 0, 0
+            marks = ",".join("?" * len(ids))
+            items = conn.execute(
+                f"DELETE FROM {store.messages_table} WHERE session_id IN ({marks})", ids
+            ).rowcount
+            conn.execute(f"DELETE FROM {store.sessions_table} WHERE session_id IN ({marks})", ids)
+            return len(ids), items
+
+        while True:
+            sessions, items = await store.run(apply, write=True)
+            self.stats.sessions_expired += sessions
+            self.stats.items_expired += items
+            if sessions < batch:
+                return
+            await self._pause()
+
+    async def _trim(self, store: SessionStore) -> None:
+        keep = self.policy.max_items
+        if keep is None:
+            return
+
+        def find(conn: sqlite3.Connection) -> list[str]:
+            cursor = conn.execute(
+                f"SELECT session_id FROM {store.messages_table} "
+                "GROUP BY session_id HAVING count(*) > ?",
+                (keep,),
+            )
+            return [row[0] for row in cursor]
+
+        candidates = await store.run(find)
+        batch = self.policy.batch_size
+        for start in range(0, len(candidates), batch):
+            chunk = candidates[start : start + batch]
+
+            def apply(conn: sqlite3.Connection, chunk: list[str] = chunk) -> int:
+                trimmed = 0
+                for session_id in chunk:
+                    trimmed += conn.execute(
+                        f"DELETE FROM {store.messages_table} WHERE session_id = ? AND id < ("
+                        f"SELECT id FROM {store.messages_table} WHERE session_id = ? "
+                        "ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (session_id, session_id, keep - 1),
+                    ).rowcount
+                return trimmed
+
+            self.stats.items_trimmed += await store.run(apply, write=True)
+            await self._pause()
+
+    async def _vacuum(self, store: SessionStore) -> None:
+        pages = self.policy.vacuum_pages
+        if pages <= 0:
+            return
+
+        def apply(conn: sqlite3.Connection) -> tuple[int, int, int]:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return 0, 0, 0
+            before = conn.execute("PRAGMA page_count").fetchone()[0]
+            conn.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+            after = conn.execute("PRAGMA page_count").fetchone()[0]
+            remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            return before - after, (before - after) * page_size, remaining
+
+        while True:
+            freed, freed_bytes, remaining = await store.run(apply, write=True)
+            self.stats.pages_reclaimed += freed
+            self.stats.bytes_reclaimed += freed_bytes
+            if not freed or not remaining:
+                break
+            await self._pause()
+        # The vacuum's page moves went to the WAL: copy them into the
+        # database and truncate the log, or the space just moves between
+        # files. Runs on a read connection (a checkpoint can't run inside
+        # the writer's transaction) and gives up quietly, leaving the log
+        # for the next sweep, if readers hold it past the busy timeout.
+        await store.run(lambda conn: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall())
+
+    async def _sweep(self, store: SessionStore) -> None:
+        await self._expire(store)
+        await self._trim(store)
+        await self._vacuum(store)
+
+    async def run_once(self) -> JanitorStats:
+        """One full sweep of every store (shards in parallel)."""
+        started = time.perf_counter()
+        await asyncio.gather(*(self._sweep(store) for store in self._stores()))
+        self.stats.runs += 1
+        self.stats.last_run_seconds = time.perf_counter() - started
+        sizes = [_file_sizes(store) for store in self._stores()]
+        self.stats.db_bytes = sum(db for db, _ in sizes)
+        self.stats.wal_bytes = sum(wal for _, wal in sizes)
+        return self.stats
+
+    # -- background -------------------------------------------------------
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.stats.errors += 1
+                logger.warning("session janitor sweep failed", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start sweeping on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def enable_incremental_vacuum(self) -> None:
+        """Switch existing databases to ``auto_vacuum=INCREMENTAL``.
+
+        This is a full ``VACUUM``: it rewrites the file and blocks writers
+        while it runs, so do it once, off-peak.
+        """
+        await asyncio.gather(
+            *(asyncio.to_thread(_convert, store) for store in self._stores() if not _in_memory(store))
+        )
+
+
+def _in_memory(store: SessionStore) -> bool:
+    return str(store.db_path) == ":memory:"
+
+
+def _file_sizes(store: SessionStore) -> tuple[int, int]:
+    """``(database bytes, WAL bytes)`` of ``store`` on disk."""
+    if _in_memory(store):
+        return 0, 0
+    path = str(store.db_path)
+    return tuple(os.path.getsize(p) if os.path.exists(p) else 0 for p in (path, path + "-wal"))
+
+
+def _convert(store: SessionStore) -> None:
+    conn = sqlite3.connect(str(store.db_path), timeout=store.busy_timeout, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
@@ -0,0 +1,545 @@
+"""Append-only, memory-mapped log backend for sessions.
+
+Even with group commit, every SQLite insert walks a B-tree and maintains
+indexes. A :class:`LogStore` instead appends each operation as a record to
+the end of a memory-mapped segment file and keeps an in-memory index of
+where each session's items live:
+
+* **writes** are a memory copy into the mapped segment (the kernel writes
+  pages back); a process crash loses nothing, ``durable=True`` also
+  ``msync``\\ s each write against power loss;
+* **reads** slice the mapping: :meth:`LogStore.get_item_bytes` returns
+  zero-copy ``memoryview``\\ s, ``get_items`` decodes them;
+* **recovery** replays every segment on open, stopping at the first torn or
+  corrupt record (checked by CRC) and discarding the tail from there;
+* **compaction** rewrites the live items of sealed segments into a fresh
+  one once more than ``compact_ratio`` of their bytes are dead (popped or
+  cleared), then deletes the old files.
+
+Every record carries a log sequence number and replay applies records in
+that order, so compacted copies can live in any file; a crash mid-compaction
+leaves duplicates that replay skips. Before deleting anything, compaction
+records the files it replaces in a marker, and recovery finishes those
+deletions first: a pop whose item was added in a surviving file is never
+lost on its own. ::
+
+    store = LogStore("session-log/")
+    session = store.session("user_123")          # same interface as SQLiteSession
+    await Runner.run(agent, "Hi", session=session)
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from agents import TResponseInputItem
+
+from .codecs import Decoders, ItemCodec
+from .store import ItemPage, StoreSession
+
+logger = logging.getLogger(__name__)
+
+# crc32, payload length, lsn, kind, session id length
+_HEADER = struct.Struct("<IIQBH")
+_POP_TARGET = struct.Struct("<Q")
+_ADD, _POP, _CLEAR = 1, 2, 3
+_SUFFIX = ".seg"
+_COMPACTION_MARKER = "compaction.pending"
+
+
+@dataclass
+class LogStats:
+    records_written: int = 0
+    bytes_written: int = 0
+    segments: int = 0
+    live_bytes: int = 0
+    dead_bytes: int = 0
+    compactions: int = 0
+    bytes_compacted: int = 0
+    """Dead bytes removed by compaction."""
+    recovered_records: int = 0
+    torn_tails: int = 0
+    """Segments whose torn or corrupt tail was discarded during recovery."""
+
+
+class _Entry:
+    __slots__ = ("segment", "offset", "length", "lsn", "live")
+
+    def __init__(self, segment: "_Segment", offset: int, length: int, lsn: int) -> None:
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+        self.lsn = lsn
+        self.live = True
+
+
+class _Segment:
+    def __init__(self, path: Path, size: int) -> None:
+        self.path = path
+        self.id = int(path.stem)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)  # sparse: costs disk only as it fills
+        self.size = os.fstat(self.fd).st_size
+        self.map = mmap.mmap(self.fd, self.size)
+        self.end = 0
+        """Offset just past the last valid record."""
+        self.live = 0
+        self.total = 0
+
+    def view(self, offset: int, length: int) -> memoryview:
+        return memoryview(self.map)[offset : offset + length]
+
+    def sync(self, start: int, end: int) -> None:
+        aligned = start - start % mmap.PAGESIZE
+        self.map.flush(aligned, end - aligned)
+
+    def close(self, *, delete: bool = False) -> None:
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # a reader still holds a view; the mapping goes with it
+        os.close(self.fd)
+        if delete:
+            self.path.unlink(missing_ok=True)
+
+
+def _record(kind: int, lsn: int, session: bytes, payload: bytes = b"") -> bytes:
+    body = _HEADER.pack(0, len(payload), lsn, kind, len(session))[4:] + session + payload
+    return struct.pack("<I", zlib.crc32(body)) + body
+
+
+class LogStore:
+    """Sessions stored in segmented, memory-mapped append-only logs.
+
+    ``segment_bytes`` is the size each new segment file is created with;
+    ``codec`` encodes items (default JSON, see :mod:`.codecs`).
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        segment_bytes: int = 64 * 1024 * 1024,
+        codec: ItemCodec | None = None,
+        decoders: tuple[ItemCodec, ...] = (),
+        durable: bool = False,
+        compact_ratio: float = 0.5,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.codec = codec
+        self.decoders = Decoders(decoders)
+        if codec is not None:
+            self.decoders.register(codec)
+        self.durable = durable
+        self.compact_ratio = compact_ratio
+        self.stats = LogStats()
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._index: dict[str, list[_Entry]] = {}
+        self._segments: dict[int, _Segment] = {}
+        self._lsn = 0
+        self._compacting: threading.Thread | None = None
+        self._recover()
+        self._closed = False
+
+    # -- recovery ---------------------------------------------------------
+
+    def _scan(self, segment: _Segment) -> list[tuple[int, int, str, int, int]]:
+        """Valid records of ``segment`` as ``(lsn, kind, session, offset, length)``."""
+        records = []
+        data = segment.map
+        pos = 0
+        while pos + _HEADER.size <= segment.size:
+            crc, length, lsn, kind, sid_len = _HEADER.unpack_from(data, pos)
+            end = pos + _HEADER.size + sid_len + length
+            if kind not in (_ADD, _POP, _CLEAR) or end > segment.size:
+                break
+            if zlib.crc32(data[pos + 4 : end]) != crc:
+                break
+            sid_start = pos + _HEADER.size
+            session = data[sid_start : sid_start + sid_len].decode()
+            records.append((lsn, kind, session, sid_start + sid_len, length))
+            pos = end
+        segment.end = pos
+        return records
+
+    def _fsync_directory(self) -> None:
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _mark_compaction(self, old: list[_Segment]) -> None:
+        """Durably record that ``old`` are replaced and must all go."""
+        marker = self.directory / _COMPACTION_MARKER
+        tmp = marker.with_suffix(".tmp")
+        with open(tmp, "w", encoding="ascii") as fh:
+            fh.write("\n".join(segment.path.name for segment in old))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, marker)
+        self._fsync_directory()
+
+    def _finish_compaction(self) -> None:
+        """Delete the segments an interrupted compaction had replaced."""
+        marker = self.directory / _COMPACTION_MARKER
+        if not marker.exists():
+            return
+        for name in marker.read_text(encoding="ascii").split():
+            (self.directory / name).unlink(missing_ok=True)
+        self._fsync_directory()
+        marker.unlink()
+
+    def _recover(self) -> None:
+        self._finish_compaction()
+        paths = sorted(self.directory.glob(f"*{_SUFFIX}"), key=lambda p: int(p.stem))
+        streams = []
+        last_lsn: dict[int, int] = {}
+        for path in paths:
+            if path.stat().st_size == 0:
+                path.unlink()  # created but never sized: nothing was written
+                continue
+            segment = _Segment(path, 0)
+            self._segments[segment.id] = segment
+            records = self._scan(segment)
+            if segment.map[segment.end : segment.end + _HEADER.size].strip(b"\0"):
+                # A torn or corrupt record after the last good one. Appends
+                # resume at ``end`` and overwrite it; zero it so a later scan
+                # can't mistake leftovers for records.
+                segment.map[segment.end :] = bytes(segment.size - segment.end)
+                self.stats.torn_tails += 1
+                logger.warning("session log %s: discarded a torn tail at %d", path, segment.end)
+            last_lsn[segment.id] = records[-1][0] if records else 0
+            streams.append(
+                [(lsn, kind, sid, segment.id, off, ln) for lsn, kind, sid, off, ln in records]
+            )
+
+        seen: set[int] = set()
+        for lsn, kind, session_id, seg_id, offset, length in heapq.merge(*streams):
+            if lsn in seen:
+                continue  # a copy left by an interrupted compaction
+            seen.add(lsn)
+            segment = self._segments[seg_id]
+            if kind == _ADD:
+                self._add(session_id, _Entry(segment, offset, length, lsn))
+            elif kind == _POP:
+                self._remove(session_id, _POP_TARGET.unpack_from(segment.map, offset)[0])
+            else:
+                self._clear(session_id)
+            self.stats.recovered_records += 1
+            self._lsn = max(self._lsn, lsn)
+
+        for segment in self._segments.values():
+            segment.total = segment.end
+        self.stats.segments = len(self._segments)
+        if self._segments:
+            # Appends resume in the segment written last. Compaction output
+            # takes a newer file id but only holds older records, so the
+            # highest id is not necessarily the tail.
+            tail = max(self._segments, key=lambda i: (last_lsn[i], i))
+            self._active = self._segments[tail]
+        else:
+            self._active = self._new_segment(0)
+        self._account()
+
+    def _account(self) -> None:
+        live = sum(s.live for s in self._segments.values())
+        self.stats.live_bytes = live
+        self.stats.dead_bytes = sum(s.total for s in self._segments.values()) - live
+
+    # -- index ------------------------------------------------------------
+
+    def _add(self, session_id: str, entry: _Entry) -> None:
+        self._index.setdefault(session_id, []).append(entry)
+        entry.segment.live += self._record_size(session_id, entry)
+
+    def _remove(self, session_id: str, lsn: int) -> _Entry | None:
+        """Drop the item added at ``lsn``; normally the session's last one.
+
+        Pop records name their item rather than meaning "the last one", as
+        compaction drops dead items and would otherwise change what "last"
+        refers to on replay.
+        """
+        entries = self._index.get(session_id)
+        if not entries:
+            return None
+        for i in range(len(entries) - 1, -1, -1):
+            if entries[i].lsn == lsn:
+                entry = entries.pop(i)
+                self._kill(session_id, entry)
+                if not entries:
+                    del self._index[session_id]
+                return entry
+        return None
+
+    def _clear(self, session_id: str) -> None:
+        for dead in self._index.pop(session_id, []):
+            self._kill(session_id, dead)
+
+    @staticmethod
+    def _record_size(session_id: str, entry: _Entry) -> int:
+        return _HEADER.size + len(session_id.encode()) + entry.length
+
+    def _kill(self, session_id: str, entry: _Entry) -> None:
+        entry.live = False
+        entry.segment.live -= self._record_size(session_id, entry)
+
+    # -- appending --------------------------------------------------------
+
+    def _new_segment(self, min_size: int) -> _Segment:
+        next_id = max(self._segments, default=-1) + 1
+        path = self.directory / f"{next_id:08d}{_SUFFIX}"
+        segment = _Segment(path, max(self.segment_bytes, min_size))
+        self._segments[segment.id] = segment
+        self.stats.segments = len(self._segments)
+        return segment
+
+    def _append(self, records: list[bytes]) -> tuple[_Segment, int]:
+        """Write ``records`` contiguously; returns the segment and start offset."""
+        blob = b"".join(records)
+        segment = self._active
+        if segment.end + len(blob) > segment.size:
+            sealed = segment
+            segment = self._active = self._new_segment(len(blob))
+            self._maybe_compact(sealed)
+        start = segment.end
+        segment.map[start : start + len(blob)] = blob
+        segment.end += len(blob)
+        segment.total += len(blob)
+        self.stats.records_written += len(records)
+        self.stats.bytes_written += len(blob)
+        if self.durable:
+            segment.sync(start, segment.end)
+        return segment, start
+
+    def _encode(self, item: TResponseInputItem) -> bytes:
+        if self.codec is None:
+            return json.dumps(item, separators=(",", ":")).encode()
+        return self.codec.encode(item)
+
+    def decode(self, data: memoryview | bytes) -> TResponseInputItem:
+        """Decode one value returned by :meth:`get_item_bytes`."""
+        if data[:1] == b"{":
+            return json.loads(bytes(data))
+        return self.decoders.decode(bytes(data))
+
+    # -- session API ------------------------------------------------------
+
+    def _check(self) -> None:
+        if self._closed:
+            raise RuntimeError("log store is closed")
+
+    async def add_items(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        if not items:
+            return
+        self._check()
+        payloads = [self._encode(item) for item in items]
+        sid = session_id.encode()
+        with self._lock:
+            lsns = range(self._lsn + 1, self._lsn + 1 + len(payloads))
+            self._lsn += len(payloads)
+            records = [_record(_ADD, lsn, sid, p) for lsn, p in zip(lsns, payloads)]
+            segment, offset = self._append(records)
+            for lsn, record, payload in zip(lsns, records, payloads):
+                start = offset + _HEADER.size + len(sid)
+                self._add(session_id, _Entry(segment, start, len(payload), lsn))
+                offset += len(record)
+            self._account()
+
+    def get_item_bytes(self, session_id: str, limit: int | None = None) -> list[memoryview]:
+        """Encoded items, oldest first, as zero-copy views into the log.
+
+        The views stay valid after compaction (the old mapping lives as long
+        as they do) but must not be written to.
+        """
+        with self._lock:
+            entries = self._index.get(session_id, [])
+            if limit is not None:
+                entries = entries[-limit:] if limit > 0 else []
+            return [e.segment.view(e.offset, e.length) for e in entries]
+
+    async def get_items(
+        self, session_id: str, limit: int | None = None
+    ) -> list[TResponseInputItem]:
+        return [self.decode(view) for view in self.get_item_bytes(session_id, limit)]
+
+    async def last_n(self, session_id: str, n: int) -> list[TResponseInputItem]:
+        return await self.get_items(session_id, n)
+
+    async def page(
+        self, session_id: str, limit: int = 50, *, before_id: int | None = None
+    ) -> ItemPage:
+        """Like :meth:`SessionStore.page`; ids are log sequence numbers."""
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        with self._lock:
+            entries = self._index.get(session_id, [])
+            if before_id is not None:
+                # Entries are in lsn order: binary search the cursor.
+                lo, hi = 0, len(entries)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if entries[mid].lsn < before_id:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                entries = entries[:lo]
+            chosen = entries[-limit:]
+            more = len(entries) > limit
+            views = [(e.lsn, e.segment.view(e.offset, e.length)) for e in chosen]
+        return ItemPage(
+            items=[self.decode(view) for _, view in views],
+            ids=[lsn for lsn, _ in views],
+            before_id=views[0][0] if more and views else None,
+        )
+
+    async def count(self, session_id: str) -> int:
+        return len(self._index.get(session_id, ()))
+
+    async def pop_item(self, session_id: str) -> TResponseInputItem | None:
+        self._check()
+        with self._lock:
+            entries = self._index.get(session_id)
+            if not entries:
+                return None
+            last = entries[-1]
+            data = bytes(last.segment.view(last.offset, last.length))
+            self._lsn += 1
+            self._append(
+                [_record(_POP, self._lsn, session_id.encode(), _POP_TARGET.pack(last.lsn))]
+            )
+            self._remove(session_id, last.lsn)
+            self._account()
+        return self.decode(data)
+
+    async def clear_session(self, session_id: str) -> None:
+        self._check()
+        with self._lock:
+            if session_id not in self._index:
+                return
+            self._lsn += 1
+            self._append([_record(_CLEAR, self._lsn, session_id.encode())])
+            self._clear(session_id)
+            self._account()
+
+    async def session_ids(self) -> list[str]:
+        return list(self._index)
+
+    def session(self, session_id: str, *, history_limit: int | None = None) -> StoreSession:
+        return StoreSession(session_id, self, history_limit=history_limit)
+
+    # -- compaction -------------------------------------------------------
+
+    def _dead_ratio(self, segments: list[_Segment]) -> float:
+        total = sum(s.total for s in segments)
+        return (total - sum(s.live for s in segments)) / total if total else 0.0
+
+    def _maybe_compact(self, sealed: _Segment) -> None:
+        sealed_segments = [s for s in self._segments.values() if s is not self._active]
+        if self._dead_ratio(sealed_segments) < self.compact_ratio:
+            return
+        if self._compacting is None or not self._compacting.is_alive():
+            self._compacting = threading.Thread(
+                target=self._compact, name="session-log-compact", daemon=True
+            )
+            self._compacting.start()
+
+    async def compact(self) -> None:
+        """Rewrite the live items of sealed segments and drop the old files."""
+        await asyncio.to_thread(self._compact)
+
+    def _compact(self) -> None:
+        with self._compact_lock:
+            with self._lock:
+                if self._closed:
+                    return
+                self._active.sync(0, self._active.end)
+                sealed = {s.id for s in self._segments.values() if s is not self._active}
+                if not sealed:
+                    return
+                live = [
+                    (entry.lsn, session_id, entry)
+                    for session_id, entries in self._index.items()
+                    for entry in entries
+                    if entry.segment.id in sealed
+                ]
+                live.sort(key=lambda row: row[0])
+                # Reserve the output file now so new appends can't claim its id.
+                size = sum(self._record_size(sid, e) for _, sid, e in live)
+                target = self._new_segment(size) if live else None
+                old = [self._segments[i] for i in sealed]
+
+            # Sealed segments are immutable: copy outside the lock.
+            moves = []
+            pos = 0
+            for lsn, session_id, entry in live:
+                assert target is not None
+                sid = session_id.encode()
+                record = _record(_ADD, lsn, sid, bytes(entry.segment.view(entry.offset, entry.length)))
+                target.map[pos : pos + len(record)] = record
+                moves.append((session_id, entry, pos + _HEADER.size + len(sid)))
+                pos += len(record)
+            if target is not None:
+                target.end = target.total = pos
+                target.sync(0, pos)
+                os.fsync(target.fd)
+            # From here on the old files go as a set: replay never sees a
+            # pop or clear without the segments holding what it removed.
+            self._mark_compaction(old)
+
+            with self._lock:
+                for session_id, entry, offset in moves:
+                    # Items popped or cleared while copying stay behind.
+                    if entry.live:
+                        assert target is not None
+                        entry.segment.live -= self._record_size(session_id, entry)
+                        entry.segment = target
+                        entry.offset = offset
+                        target.live += self._record_size(session_id, entry)
+                reclaimed = sum(s.total for s in old) - (pos if target is not None else 0)
+                for segment in old:
+                    del self._segments[segment.id]
+                self.stats.segments = len(self._segments)
+                self.stats.compactions += 1
+                self.stats.bytes_compacted += max(reclaimed, 0)
+                self._account()
+            for segment in old:
+                segment.close(delete=True)
+            self._finish_compaction()
+
+    # -- lifecycle --------------------------------------------------------
+
+    async def flush(self) -> None:
+        """``msync`` the active segment (everything else is already synced)."""
+        segment = self._active
+        await asyncio.to_thread(segment.sync, 0, segment.end)
+
+    def close(self) -> None:
+        if self._compacting is not None:
+            self._compacting.join()
+        with self._compact_lock, self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for segment in self._segments.values():
+                segment.map.flush()
+                segment.close()
+
+    def __enter__(self) -> "LogStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
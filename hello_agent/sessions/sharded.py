@@ -0,0 +1,262 @@
+"""Spread sessions over several SQLite files.
+
+Every SQLite database has a single write lock, so one file caps write
+throughput no matter how well writes are batched. A
+:class:`ShardedSessionStore` hashes each session id to one of ``shards``
+database files in a directory, each served by its own :class:`SessionStore`
+(own writer thread, own read pool), so writes to different shards proceed in
+parallel::
+
+    store = ShardedSessionStore("sessions/", shards=8)
+    session = store.session("user_123")
+    await Runner.run(agent, "Hi", session=session)
+
+    # maintenance: run a query on every shard at once
+    counts = await store.map_shards(
+        lambda conn: conn.execute("SELECT count(*) FROM agent_messages").fetchone()[0]
+    )
+
+Session ids are placed with jump consistent hashing, so growing from N to M
+shards moves only about ``(M - N) / M`` of the sessions; :meth:`rebalance`
+does the moving. The shard count is recorded in ``shards.json`` so a
+directory is always reopened with the layout it was written with.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from agents import TResponseInputItem
+
+from .store import ItemPage, SessionStore, StoreSession, StoreStats
+
+T = TypeVar("T")
+
+MANIFEST = "shards.json"
+
+_MASK64 = (1 << 64) - 1
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Lamping & Veach jump consistent hash of a 64-bit ``key``."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & _MASK64
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+@lru_cache(maxsize=65536)
+def _session_key(session_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(session_id.encode(), digest_size=8).digest(), "big")
+
+
+def shard_for(session_id: str, shards: int) -> int:
+    """Index of the shard holding ``session_id`` when there are ``shards``."""
+    return jump_hash(_session_key(session_id), shards)
+
+
+class ShardedSessionStore:
+    """Sessions hashed across ``shards`` SQLite files under ``directory``.
+
+    ``shards`` defaults to what ``shards.json`` records, or 8 for a new
+    directory; opening an existing directory with a different count raises
+    ``ValueError`` (use :meth:`rebalance` to change it). Other keyword
+    arguments are passed to each shard's :class:`SessionStore`.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        shards: int | None = None,
+        *,
+        name: str = "shard-{:03d}.db",
+        **store_options: Any,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self._store_options = store_options
+
+        recorded = self._read_manifest()
+        if shards is None:
+            shards = recorded or 8
+        elif recorded is not None and recorded != shards:
+            raise ValueError(
+                f"{self.directory} holds {recorded} shards, not {shards}; "
+                "open it with shards=None and call rebalance()"
+            )
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self._stores = [self._open(i) for i in range(shards)]
+        self._write_manifest(shards)
+        self._closed = False
+
+    def _read_manifest(self) -> int | None:
+        path = self.directory / MANIFEST
+        if not path.exists():
+            return None
+        return int(json.loads(path.read_text(encoding="utf-8"))["shards"])
+
+    def _write_manifest(self, shards: int) -> None:
+        path = self.directory / MANIFEST
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"shards": shards, "name": self.name}) + "\n", encoding="utf-8")
+        tmp.replace(path)
+
+    def _open(self, index: int) -> SessionStore:
+        return SessionStore(self.directory / self.name.format(index), **self._store_options)
+
+    # -- routing ----------------------------------------------------------
+
+    @property
+    def shards(self) -> int:
+        return len(self._stores)
+
+    @property
+    def stores(self) -> list[SessionStore]:
+        """The per-shard stores, in shard order."""
+        return list(self._stores)
+
+    def store_for(self, session_id: str) -> SessionStore:
+        return self._stores[shard_for(session_id, len(self._stores))]
+
+    # -- session API ------------------------------------------------------
+
+    async def add_items(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        await self.store_for(session_id).add_items(session_id, items)
+
+    async def get_items(
+        self,
+        session_id: str,
+        limit: int | None = None,
+        *,
+        offset: int = 0,
+        before_id: int | None = None,
+    ) -> list[TResponseInputItem]:
+        return await self.store_for(session_id).get_items(
+            session_id, limit, offset=offset, before_id=before_id
+        )
+
+    async def last_n(self, session_id: str, n: int) -> list[TResponseInputItem]:
+        return await self.store_for(session_id).last_n(session_id, n)
+
+    async def page(
+        self, session_id: str, limit: int = 50, *, before_id: int | None = None
+    ) -> ItemPage:
+        return await self.store_for(session_id).page(session_id, limit, before_id=before_id)
+
+    async def count(self, session_id: str) -> int:
+        return await self.store_for(session_id).count(session_id)
+
+    async def pop_item(self, session_id: str) -> TResponseInputItem | None:
+        return await self.store_for(session_id).pop_item(session_id)
+
+    async def clear_session(self, session_id: str) -> None:
+        await self.store_for(session_id).clear_session(session_id)
+
+    def session(self, session_id: str, *, history_limit: int | None = None) -> StoreSession:
+        """A ``Session`` for ``session_id``; routing follows :meth:`rebalance`."""
+        return StoreSession(session_id, self, history_limit=history_limit)
+
+    # -- maintenance ------------------------------------------------------
+
+    async def map_shards(
+        self, fn: Callable[[sqlite3.Connection], T], *, write: bool = False
+    ) -> list[T]:
+        """Run ``fn(connection)`` on every shard concurrently, results in shard order."""
+        return list(await asyncio.gather(*(s.run(fn, write=write) for s in self._stores)))
+
+    async def session_ids(self) -> list[str]:
+        """Every stored session id, gathered from all shards in parallel."""
+        per_shard = await asyncio.gather(*(s.session_ids() for s in self._stores))
+        return [sid for ids in per_shard for sid in ids]
+
+    @property
+    def stats(self) -> list[StoreStats]:
+        return [s.stats for s in self._stores]
+
+    async def rebalance(self, shards: int) -> int:
+        """Change the shard count, moving sessions that hash elsewhere.
+
+        Returns how many sessions moved. Run it in a maintenance window:
+        writes to a session while it is being moved can be lost. A session
+        is copied to its new shard before it is deleted from the old one,
+        and copying replaces whatever the target already holds, so an
+        interrupted rebalance can simply be run again.
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        old = len(self._stores)
+        if shards == old:
+            return 0
+        stores = self._stores + [self._open(i) for i in range(old, shards)]
+
+        async def drain(index: int) -> int:
+            source = stores[index]
+            moved = 0
+            for session_id in await source.session_ids():
+                target = shard_for(session_id, shards)
+                if target != index:
+                    await _move(source, stores[target], session_id)
+                    moved += 1
+            return moved
+
+        moved = sum(await asyncio.gather(*(drain(i) for i in range(old))))
+        for store in stores[shards:]:
+            store.close()
+        self._stores = stores[:shards]
+        self._write_manifest(shards)
+        return moved
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for store in self._stores:
+            store.close()
+
+    def __enter__(self) -> "ShardedSessionStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+async def _move(source: SessionStore, target: SessionStore, session_id: str) -> None:
+    def export(conn: sqlite3.Connection) -> tuple[Any, list[Any]]:
+        session = conn.execute(
+            f"SELECT created_at, updated_at FROM {source.sessions_table} WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        rows = conn.execute(
+            f"SELECT message_data, created_at FROM {source.messages_table} "
+            "WHERE session_id = ? ORDER BY id",
+            (session_id,),
+        ).fetchall()
+        return session, rows
+
+    session, rows = await source.run(export)
+    if session is None:
+        return
+
+    def load(conn: sqlite3.Connection) -> None:
+        conn.execute(f"DELETE FROM {target.messages_table} WHERE session_id = ?", (session_id,))
+        conn.execute(
+            f"INSERT OR REPLACE INTO {target.sessions_table} "
+            "(session_id, created_at, updated_at) VALUES (?, ?, ?)",
+            (session_id, *session),
+        )
+        conn.executemany(
+            f"INSERT INTO {target.messages_table} (session_id, message_data, created_at) "
+            "VALUES (?, ?, ?)",
+            [(session_id, data, created) for data, created in rows],
+        )
+
+    await target.run(load, write=True)
+    await source.clear_session(session_id)
@@ -0,0 +1,629 @@
+"""SQLite session store tuned for many concurrent conversations.
+
+``SQLiteSession`` commits every ``add_items`` / ``pop_item`` on its own, on a
+fresh ``asyncio.to_thread`` hop, with one connection per thread per session
+object. That's fine for a lesson, but with thousands of live conversations
+the database spends its time fsyncing single-row transactions. A
+:class:`SessionStore` is shared by all conversations instead:
+
+* the database runs in WAL mode (readers never block the writer) with
+  ``synchronous=NORMAL``;
+* reads run on a small thread pool, each thread holding one pooled
+  connection;
+* writes from every session go through one writer thread that **group
+  commits**: whatever is queued when it wakes up (up to ``max_batch``
+  operations) is applied in a single transaction, each operation in its own
+  savepoint so one failure doesn't fail its neighbours;
+* the event loop only ever awaits futures, all SQLite I/O is off-loop.
+
+::
+
+    store = SessionStore("conversations.db")
+    session = store.session("user_123")       # a SessionABC for Runner.run
+    await Runner.run(agent, "Hi", session=session)
+
+The schema is the one ``SQLiteSession`` uses, so existing databases work.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Protocol, TypeVar
+
+from agents import TResponseInputItem
+from agents.memory import SessionABC
+
+from .codecs import Decoders, ItemCodec
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_memory_ids = itertools.count()
+
+_STOP = object()
+
+
+@dataclass
+class StoreStats:
+    commits: int = 0
+    """Transactions committed by the writer (one per group)."""
+    write_ops: int = 0
+    items_written: int = 0
+    largest_group: int = 0
+    failed_ops: int = 0
+    reads: int = 0
+
+    @property
+    def ops_per_commit(self) -> float:
+        return self.write_ops / self.commits if self.commits else 0.0
+
+
+@dataclass
+class _WriteOp:
+    apply: Callable[[sqlite3.Connection], Any]
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future[Any]
+    items: int = 0
+    read: bool = False
+
+
+@dataclass
+class ItemPage:
+    """A page of session items, oldest first; see :meth:`SessionStore.page`."""
+
+    items: list[TResponseInputItem]
+    ids: list[int]
+    before_id: int | None
+    """Cursor for the next older page, ``None`` when this is the oldest."""
+
+
+def _resolve(future: asyncio.Future[Any], result: Any, error: BaseException | None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class SessionStore:
+    """One SQLite database shared by many sessions; see the module docs.
+
+    ``readers`` is the size of the read connection pool. ``max_batch`` caps
+    how many queued write operations share one commit, and ``linger`` is how
+    long (seconds) the writer waits for more operations after the first one
+    arrives. The default of 0 batches only what's already queued, so an idle
+    store adds no latency.
+
+    ``codec`` encodes newly written items (see :mod:`.codecs`); the default
+    ``None`` writes JSON text like ``SQLiteSession``. Rows in any format
+    stay readable; register codecs with other dictionaries in ``decoders``.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path = ":memory:",
+        *,
+        readers: int = 4,
+        max_batch: int = 512,
+        linger: float = 0.0,
+        sessions_table: str = "agent_sessions",
+        messages_table: str = "agent_messages",
+        busy_timeout: float = 30.0,
+        codec: ItemCodec | None = None,
+        decoders: Iterable[ItemCodec] = (),
+    ) -> None:
+        self._memory = str(db_path) == ":memory:"
+        if self._memory:
+            # Private in-memory databases are per connection; share one. Its
+            # table locks don't wait like WAL does, so reads in memory mode
+            # run on the writer thread instead of the pool.
+            self._target = f"file:hello_agent_mem_{next(_memory_ids)}?mode=memory&cache=shared"
+            self._uri = True
+        else:
+            self._target = str(db_path)
+            self._uri = False
+        self.db_path = db_path
+        self.sessions_table = sessions_table
+        self.messages_table = messages_table
+        self.max_batch = max_batch
+        self.linger = linger
+        self.busy_timeout = busy_timeout
+        self.codec = codec
+        self.decoders = Decoders(decoders)
+        if codec is not None:
+            self.decoders.register(codec)
+        self.stats = StoreStats()
+
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._local = threading.local()
+        # Keeps a shared-cache in-memory database alive while the store is.
+        self._anchor = self._connect()
+        self._init_schema(self._anchor)
+
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="session-reader")
+        self._queue: queue.SimpleQueue[_WriteOp | object] = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="session-writer", daemon=True
+        )
+        self._writer.start()
+        self._closed = False
+
+    # -- connections ------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._target,
+            uri=self._uri,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            isolation_level=None,  # explicit BEGIN/COMMIT
+        )
+        # Lets the janitor shrink the file incrementally. Only takes effect
+        # on a new database, and only before the switch to WAL; an existing
+        # file needs one full VACUUM (see Janitor).
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-16000")  # 16 MiB per connection
+        conn.execute("PRAGMA foreign_keys=ON")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """The calling thread's pooled connection."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._local.connection = self._connect()
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.sessions_table} (
+                session_id TEXT PRIMARY KEY,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE IF NOT EXISTS {self.messages_table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                message_data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (session_id) REFERENCES {self.sessions_table} (session_id)
+                    ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS idx_{self.messages_table}_session_id
+                ON {self.messages_table} (session_id, created_at);
+            CREATE INDEX IF NOT EXISTS idx_{self.messages_table}_session_order
+                ON {self.messages_table} (session_id, id);
+            CREATE INDEX IF NOT EXISTS idx_{self.sessions_table}_updated_at
+                ON {self.sessions_table} (updated_at);
+            """
+        )
+
+    # -- writer -----------------------------------------------------------
+
+    def _write_loop(self) -> None:
+        conn: sqlite3.Connection | None = None
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            group = [first]
+            deadline = time.monotonic() + self.linger
+            while len(group) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        op = self._queue.get(timeout=remaining)
+                    else:
+                        op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is _STOP:
+                    self._queue.put(_STOP)
+                    break
+                group.append(op)
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception as exc:
+                    logger.exception("session writer could not connect; will retry")
+                    self._finish([(op, None, exc) for op in group])  # type: ignore[misc]
+                    continue
+            if not self._commit_group(conn, group):  # type: ignore[arg-type]
+                # A failed ROLLBACK leaves the connection in an unknown
+                # state: replace it before the next group.
+                self._discard(conn)
+                conn = None
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _commit_group(self, conn: sqlite3.Connection, group: list[_WriteOp]) -> bool:
+        """Apply ``group`` in one transaction; ``False`` if ``conn`` is broken.
+
+        Every operation's future is resolved, whatever fails.
+        """
+        outcomes: list[tuple[_WriteOp, Any, BaseException | None]] = []
+        healthy = True
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op in group:
+                conn.execute("SAVEPOINT op")
+                try:
+                    result = op.apply(conn)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO op")
+                    outcomes.append((op, None, exc))
+                else:
+                    outcomes.append((op, result, None))
+                conn.execute("RELEASE op")
+            conn.execute("COMMIT")
+        except Exception as exc:
+            outcomes = [(op, None, exc) for op in group]
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except Exception:
+                logger.exception("session writer could not roll back; reconnecting")
+                healthy = False
+
+        stats = self.stats
+        writes = sum(1 for op in group if not op.read)
+        stats.commits += 1
+        stats.write_ops += writes
+        stats.largest_group = max(stats.largest_group, writes)
+        self._finish(outcomes)
+        return healthy
+
+    def _finish(self, outcomes: list[tuple[_WriteOp, Any, BaseException | None]]) -> None:
+        """Resolve each operation's future with its result or error."""
+        stats = self.stats
+        for op, result, error in outcomes:
+            if error is None:
+                stats.items_written += op.items
+            else:
+                stats.failed_ops += 1
+            try:
+                op.loop.call_soon_threadsafe(_resolve, op.future, result, error)
+            except RuntimeError:
+                pass  # the caller's loop is gone
+
+    async def _write(
+        self, apply: Callable[[sqlite3.Connection], Any], items: int = 0, *, read: bool = False
+    ) -> Any:
+        if self._closed:
+            raise RuntimeError("session store is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_WriteOp(apply, loop, future, items, read))
+        return await future
+
+    async def _read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        if self._closed:
+            raise RuntimeError("session store is closed")
+        self.stats.reads += 1
+        if self._memory:
+            return await self._write(fn, read=True)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, lambda: fn(self._connection()))
+
+    # -- encoding ---------------------------------------------------------
+
+    def _encode(self, item: TResponseInputItem) -> str | bytes:
+        if self.codec is None:
+            return json.dumps(item)
+        return self.codec.encode(item)
+
+    def _decode(self, rows: list[tuple[int, str | bytes]]) -> list[tuple[int, TResponseInputItem]]:
+        decoded = []
+        for row_id, data in rows:
+            try:
+                decoded.append((row_id, self.decoders.decode(data)))
+            except json.JSONDecodeError:
+                continue  # as SQLiteSession does with corrupt rows
+        return decoded
+
+    def _is_current(self, data: str | bytes) -> bool:
+        if self.codec is None:
+            return isinstance(data, str)
+        return isinstance(data, bytes) and data.startswith(self.codec.header)
+
+    # -- operations -------------------------------------------------------
+
+    async def add_items(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        if not items:
+            return
+        rows = [(session_id, self._encode(item)) for item in items]
+
+        def apply(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                f"INSERT INTO {self.sessions_table} (session_id) VALUES (?) "
+                "ON CONFLICT(session_id) DO UPDATE SET updated_at = CURRENT_TIMESTAMP",
+                (session_id,),
+            )
+            conn.executemany(
+                f"INSERT INTO {self.messages_table} (session_id, message_data) VALUES (?, ?)",
+                rows,
+            )
+
+        await self._write(apply, len(rows))
+
+    def _rows(
+        self,
+        conn: sqlite3.Connection,
+        session_id: str,
+        limit: int | None,
+        offset: int,
+        before_id: int | None,
+    ) -> list[tuple[int, str]]:
+        """``(id, message_data)`` rows, oldest first, walking back from the tail.
+
+        Every query is a range scan of the ``(session_id, id)`` index, so the
+        cost depends on the rows returned (plus ``offset``), not on how long
+        the session is.
+        """
+        where = "session_id = ?"
+        params: list[Any] = [session_id]
+        if before_id is not None:
+            where += " AND id < ?"
+            params.append(before_id)
+        if limit is None and not offset:
+            cursor = conn.execute(
+                f"SELECT id, message_data FROM {self.messages_table} WHERE {where} ORDER BY id",
+                params,
+            )
+            return cursor.fetchall()
+        params += [-1 if limit is None else limit, offset]
+        cursor = conn.execute(
+            f"SELECT id, message_data FROM {self.messages_table} WHERE {where} "
+            "ORDER BY id DESC LIMIT ? OFFSET ?",
+            params,
+        )
+        return cursor.fetchall()[::-1]
+
+    async def get_items(
+        self,
+        session_id: str,
+        limit: int | None = None,
+        *,
+        offset: int = 0,
+        before_id: int | None = None,
+    ) -> list[TResponseInputItem]:
+        """Items in chronological order.
+
+        ``limit`` keeps the newest N (as ``Session.get_items`` does);
+        ``offset`` skips that many of the newest first, and ``before_id``
+        only considers items older than that id (see :meth:`page`).
+        """
+        if limit is not None and limit <= 0:
+            return []
+        rows = await self._read(
+            lambda conn: self._rows(conn, session_id, limit, offset, before_id)
+        )
+        return [item for _, item in self._decode(rows)]
+
+    async def last_n(self, session_id: str, n: int) -> list[TResponseInputItem]:
+        """The newest ``n`` items, without reading the rest of the session."""
+        return await self.get_items(session_id, n)
+
+    async def page(
+        self, session_id: str, limit: int = 50, *, before_id: int | None = None
+    ) -> "ItemPage":
+        """One page of items walking backwards from the newest.
+
+        Pass the returned page's ``before_id`` to get the next (older) page;
+        it is ``None`` on the oldest page. Unlike ``offset``, the cursor is
+        stable while new items are being appended.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        rows = await self._read(
+            lambda conn: self._rows(conn, session_id, limit + 1, 0, before_id)
+        )
+        more = len(rows) > limit
+        rows = rows[-limit:]
+        decoded = self._decode(rows)
+        return ItemPage(
+            items=[item for _, item in decoded],
+            ids=[row_id for row_id, _ in decoded],
+            before_id=rows[0][0] if more and rows else None,
+        )
+
+    async def count(self, session_id: str) -> int:
+        """Number of items in the session; an index-only scan, nothing decoded."""
+
+        def fetch(conn: sqlite3.Connection) -> int:
+            return conn.execute(
+                f"SELECT count(*) FROM {self.messages_table} WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()[0]
+
+        return await self._read(fetch)
+
+    async def pop_item(self, session_id: str) -> TResponseInputItem | None:
+        def apply(conn: sqlite3.Connection) -> str | bytes | None:
+            row = conn.execute(
+                f"DELETE FROM {self.messages_table} WHERE id = ("
+                f"SELECT id FROM {self.messages_table} WHERE session_id = ? "
+                "ORDER BY id DESC LIMIT 1) RETURNING message_data",
+                (session_id,),
+            ).fetchone()
+            return row[0] if row else None
+
+        data = await self._write(apply)
+        if data is None:
+            return None
+        try:
+            return self.decoders.decode(data)
+        except json.JSONDecodeError:
+            return None
+
+    async def clear_session(self, session_id: str) -> None:
+        def apply(conn: sqlite3.Connection) -> None:
+            conn.execute(f"DELETE FROM {self.messages_table} WHERE session_id = ?", (session_id,))
+            conn.execute(f"DELETE FROM {self.sessions_table} WHERE session_id = ?", (session_id,))
+
+        await self._write(apply)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T], *, write: bool = False) -> T:
+        """Run ``fn(connection)`` off the event loop, for maintenance queries.
+
+        With ``write=True`` it runs on the writer inside the next group
+        commit (in its own savepoint), otherwise on a read connection.
+        """
+        if write:
+            return await self._write(fn)
+        return await self._read(fn)
+
+    async def migrate(self, batch_size: int = 500) -> int:
+        """Re-encode rows not yet in this store's codec; returns rows rewritten.
+
+        Works through the table in id order, one write operation per batch,
+        so it interleaves with live traffic and can be stopped and resumed.
+        Rows that fail to decode are left as they are.
+        """
+        after = 0
+        rewritten = 0
+        while True:
+
+            def apply(conn: sqlite3.Connection, after: int = after) -> tuple[int | None, int]:
+                rows = conn.execute(
+                    f"SELECT id, message_data FROM {self.messages_table} "
+                    "WHERE id > ? ORDER BY id LIMIT ?",
+                    (after, batch_size),
+                ).fetchall()
+                if not rows:
+                    return None, 0
+                updates = [
+                    (self._encode(item), row_id)
+                    for row_id, item in self._decode(
+                        [row for row in rows if not self._is_current(row[1])]
+                    )
+                ]
+                conn.executemany(
+                    f"UPDATE {self.messages_table} SET message_data = ? WHERE id = ?", updates
+                )
+                return rows[-1][0], len(updates)
+
+            last, count = await self._write(apply)
+            if last is None:
+                return rewritten
+            rewritten += count
+            after = last
+
+    async def session_ids(self) -> list[str]:
+        """Ids of every session stored in this database."""
+
+        def fetch(conn: sqlite3.Connection) -> list[str]:
+            cursor = conn.execute(f"SELECT session_id FROM {self.sessions_table}")
+            return [row[0] for row in cursor]
+
+        return await self._read(fetch)
+
+    def session(self, session_id: str, *, history_limit: int | None = None) -> "StoreSession":
+        """A ``Session`` for ``session_id`` backed by this store."""
+        return StoreSession(session_id, self, history_limit=history_limit)
+
+    def close(self) -> None:
+        """Flush queued writes, stop the writer and close every connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def __enter__(self) -> "SessionStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class SessionBackend(Protocol):
+    """What :class:`StoreSession` needs from a store."""
+
+    async def get_items(
+        self, session_id: str, limit: int | None = None
+    ) -> list[TResponseInputItem]: ...
+
+    async def add_items(self, session_id: str, items: list[TResponseInputItem]) -> None: ...
+
+    async def pop_item(self, session_id: str) -> TResponseInputItem | None: ...
+
+    async def clear_session(self, session_id: str) -> None: ...
+
+    async def page(
+        self, session_id: str, limit: int = 50, *, before_id: int | None = None
+    ) -> ItemPage: ...
+
+    async def count(self, session_id: str) -> int: ...
+
+
+class StoreSession(SessionABC):
+    """A conversation in a :class:`SessionStore`; cheap to create per request.
+
+    With ``history_limit``, reads without an explicit limit (which is what
+    ``Runner.run`` does every turn) return only the newest ``history_limit``
+    items, trimmed to start at a user message so tool calls keep their
+    outputs; older items stay stored but are never read.
+    """
+
+    def __init__(
+        self, session_id: str, store: SessionBackend, *, history_limit: int | None = None
+    ) -> None:
+        self.session_id = session_id
+        self.store = store
+        self.history_limit = history_limit
+
+    async def get_items(self, limit: int | None = None) -> list[TResponseInputItem]:
+        if limit is None and self.history_limit is not None:
+            items = await self.store.get_items(self.session_id, self.history_limit)
+            for start, item in enumerate(items):
+                if isinstance(item, dict) and item.get("role") == "user":
+                    return items[start:]
+            return items
+        return await self.store.get_items(self.session_id, limit)
+
+    async def last_n(self, n: int) -> list[TResponseInputItem]:
+        return await self.store.get_items(self.session_id, n)
+
+    async def page(self, limit: int = 50, *, before_id: int | None = None) -> ItemPage:
+        return await self.store.page(self.session_id, limit, before_id=before_id)
+
+    async def count(self) -> int:
+        return await self.store.count(self.session_id)
+
+    async def add_items(self, items: list[TResponseInputItem]) -> None:
+        await self.store.add_items(self.session_id, items)
+
+    async def pop_item(self) -> TResponseInputItem | None:
+        return await self.store.pop_item(self.session_id)
+
+    async def clear_session(self) -> None:
+        await self.store.clear_session(self.session_id)
@@ -0,0 +1,336 @@
+"""Stream every session out of one store and into another.
+
+::
+
+    python -m hello_agent.sessions.transfer export conversations.db sessions.jsonl.gz
+    python -m hello_agent.sessions.transfer import sessions.jsonl.gz staging/ --shards 8
+
+A store is a SQLite file (``SessionStore`` or plain ``SQLiteSession``
+databases), a sharded directory (has ``shards.json``) or a log directory
+(has ``*.seg`` files; pass ``--log`` to create one). Dumps are either JSONL,
+one ``{"session_id": ..., "item": ...}`` object per line, or a compact
+binary format (``.bin``); a ``.gz`` suffix adds gzip on top of either.
+
+Export walks the items in (session, id) order with keyset pagination and
+import writes in fixed-size batches, so memory stays flat however large
+the database is. Progress goes to stderr.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import logging
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, ContextManager, Iterator
+
+from agents import TResponseInputItem
+
+from .codecs import pack_item, unpack_item
+from .log import LogStore
+from .sharded import MANIFEST, ShardedSessionStore
+from .store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+Store = SessionStore | ShardedSessionStore | LogStore
+
+BINARY_MAGIC = b"HASESS1\n"
+
+
+# -- reading stores ---------------------------------------------------------
+
+
+async def _scan_store(
+    store: SessionStore, batch_size: int
+) -> AsyncIterator[tuple[str, TResponseInputItem]]:
+    after: tuple[str, int] = ("", -1)
+    while True:
+
+        def fetch(conn: sqlite3.Connection, after: tuple[str, int] = after) -> list[Any]:
+            return conn.execute(
+                f"SELECT session_id, id, message_data FROM {store.messages_table} "
+                "WHERE (session_id, id) > (?, ?) ORDER BY session_id, id LIMIT ?",
+                (*after, batch_size),
+            ).fetchall()
+
+        rows = await store.run(fetch)
+        if not rows:
+            return
+        sessions = {row_id: session_id for session_id, row_id, _ in rows}
+        # Skips rows that don't decode, as reads through the store do.
+        decoded = store._decode([(row_id, data) for _, row_id, data in rows])
+        if len(decoded) < len(rows):
+            logger.warning("export: skipped %d undecodable rows", len(rows) - len(decoded))
+        for row_id, item in decoded:
+            yield sessions[row_id], item
+        after = rows[-1][0], rows[-1][1]
+
+
+async def iter_items(
+    store: Store, batch_size: int = 1000
+) -> AsyncIterator[tuple[str, TResponseInputItem]]:
+    """Every ``(session_id, item)`` in ``store``, each session's items in order."""
+    if isinstance(store, LogStore):
+        for session_id in sorted(await store.session_ids()):
+            total = await store.count(session_id)
+            for view in store.get_item_bytes(session_id, total):
+                yield session_id, store.decode(view)
+        return
+    stores = store.stores if isinstance(store, ShardedSessionStore) else [store]
+    for shard in stores:
+        async for row in _scan_store(shard, batch_size):
+            yield row
+
+
+# -- dump formats -----------------------------------------------------------
+
+
+def _open_dump(path: str, mode: str) -> ContextManager[IO[bytes]]:
+    if path == "-":
+        # Leave the standard streams open when the dump is done with them.
+        return contextlib.nullcontext(sys.stdout.buffer if mode == "wb" else sys.stdin.buffer)
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)  # type: ignore[return-value]
+    return open(path, mode)
+
+
+def _is_binary(path: str) -> bool:
+    return path.removesuffix(".gz").endswith(".bin")
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _read_varint(fh: IO[bytes]) -> int | None:
+    n = shift = 0
+    while True:
+        byte = fh.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("truncated session dump")
+            return None
+        n |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return n
+        shift += 7
+
+
+class DumpWriter:
+    def __init__(self, fh: IO[bytes], *, binary: bool) -> None:
+        self.fh = fh
+        self.binary = binary
+        self.bytes = 0
+        if binary:
+            self._write(BINARY_MAGIC)
+
+    def _write(self, data: bytes) -> None:
+        self.fh.write(data)
+        self.bytes += len(data)
+
+    def write(self, session_id: str, item: TResponseInputItem) -> None:
+        if self.binary:
+            sid = session_id.encode()
+            payload = pack_item(item)
+            self._write(_varint(len(sid)) + sid + _varint(len(payload)) + payload)
+        else:
+            line = json.dumps({"session_id": session_id, "item": item}, separators=(",", ":"))
+            self._write(line.encode() + b"\n")
+
+
+def read_dump(fh: IO[bytes], *, binary: bool) -> Iterator[tuple[str, TResponseInputItem]]:
+    if not binary:
+        for line in io.TextIOWrapper(fh, encoding="utf-8"):
+            if line.strip():
+                record = json.loads(line)
+                yield record["session_id"], record["item"]
+        return
+    if fh.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("not a binary session dump")
+    while (sid_len := _read_varint(fh)) is not None:
+        session_id = fh.read(sid_len).decode()
+        size = _read_varint(fh)
+        if size is None:
+            raise ValueError("truncated session dump")
+        yield session_id, unpack_item(fh.read(size))
+
+
+# -- progress ---------------------------------------------------------------
+
+
+class Progress:
+    """Counts items and sessions; prints a line to stderr every ``every`` seconds."""
+
+    def __init__(self, label: str, every: float = 2.0, *, quiet: bool = False) -> None:
+        self.label = label
+        self.every = every
+        self.quiet = quiet
+        self.items = 0
+        self.sessions = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self._last = self.started
+        self._session: str | None = None
+
+    def add(self, session_id: str) -> None:
+        self.items += 1
+        if session_id != self._session:
+            self._session = session_id
+            self.sessions += 1
+        now = time.perf_counter()
+        if now - self._last >= self.every:
+            self._last = now
+            self.report()
+
+    def report(self, final: bool = False) -> None:
+        if self.quiet:
+            return
+        elapsed = time.perf_counter() - self.started
+        rate = self.items / elapsed if elapsed else 0.0
+        size = f"{self.bytes / 1e6:.1f} MB, " if self.bytes else ""
+        print(
+            f"{self.label}: {self.items:,} items, {self.sessions:,} sessions, "
+            f"{size}{rate:,.0f} items/s" + (f" in {elapsed:.1f}s" if final else ""),
+            file=sys.stderr,
+        )
+
+    def summary(self) -> dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "items": self.items,
+            "sessions": self.sessions,
+            "bytes": self.bytes,
+            "seconds": round(elapsed, 3),
+            "items_per_sec": round(self.items / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+# -- export / import --------------------------------------------------------
+
+
+async def export_sessions(
+    store: Store,
+    fh: IO[bytes],
+    *,
+    binary: bool = False,
+    batch_size: int = 1000,
+    quiet: bool = False,
+) -> dict[str, Any]:
+    """Write every session in ``store`` to ``fh``; returns the counts."""
+    writer = DumpWriter(fh, binary=binary)
+    progress = Progress("export", quiet=quiet)
+    async for session_id, item in iter_items(store, batch_size):
+        writer.write(session_id, item)
+        progress.bytes = writer.bytes
+        progress.add(session_id)
+    progress.report(final=True)
+    return progress.summary()
+
+
+async def import_sessions(
+    store: Store,
+    records: Iterator[tuple[str, TResponseInputItem]],
+    *,
+    batch_size: int = 1000,
+    clear: bool = False,
+    quiet: bool = False,
+) -> dict[str, Any]:
+    """Append ``records`` to ``store`` in batches of ``batch_size`` items.
+
+    Each batch is written with one ``add_items`` per session, all at once,
+    so a :class:`SessionStore` commits a batch in a single transaction.
+    With ``clear``, each session is emptied before its first item lands.
+    """
+    progress = Progress("import", quiet=quiet)
+    pending: dict[str, list[TResponseInputItem]] = {}
+    count = 0
+    cleared: str | None = None
+
+    async def flush() -> None:
+        nonlocal count
+        await asyncio.gather(*(store.add_items(sid, items) for sid, items in pending.items()))
+        pending.clear()
+        count = 0
+
+    for session_id, item in records:
+        if clear and session_id != cleared:
+            # Dumps are grouped by session, so this runs once per session.
+            if session_id in pending:
+                await flush()
+            await store.clear_session(session_id)
+            cleared = session_id
+        pending.setdefault(session_id, []).append(item)
+        count += 1
+        progress.add(session_id)
+        if count >= batch_size:
+            await flush()
+    if pending:
+        await flush()
+    progress.report(final=True)
+    return progress.summary()
+
+
+def open_store(path: str, *, log: bool = False, shards: int | None = None) -> Store:
+    """Open whichever kind of store lives at ``path``."""
+    target = Path(path)
+    if log or (target.is_dir() and any(target.glob("*.seg"))):
+        return LogStore(target)
+    if shards is not None or (target / MANIFEST).exists():
+        return ShardedSessionStore(target, shards)
+    return SessionStore(target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or import all sessions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="store -> dump")
+    export.add_argument("store")
+    export.add_argument("dump", help="output file (.jsonl, .bin, optionally .gz; - for stdout)")
+    load = commands.add_parser("import", help="dump -> store")
+    load.add_argument("dump", help="input file (- for stdin)")
+    load.add_argument("store")
+    load.add_argument("--clear", action="store_true", help="replace sessions that exist")
+    load.add_argument("--shards", type=int, help="create a sharded store")
+    load.add_argument("--log", action="store_true", help="create a log store")
+    for sub in (export, load):
+        sub.add_argument("--batch-size", type=int, default=1000)
+        sub.add_argument("--binary", action="store_true", help="binary dump (default by suffix)")
+        sub.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    binary = args.binary or _is_binary(args.dump)
+
+    async def run() -> dict[str, Any]:
+        if args.command == "export":
+            store = open_store(args.store)
+            with store, _open_dump(args.dump, "wb") as fh:
+                return await export_sessions(
+                    store, fh, binary=binary, batch_size=args.batch_size, quiet=args.quiet
+                )
+        store = open_store(args.store, log=args.log, shards=args.shards)
+        with store, _open_dump(args.dump, "rb") as fh:
+            return await import_sessions(
+                store,
+                read_dump(fh, binary=binary),
+                batch_size=args.batch_size,
+                clear=args.clear,
+                quiet=args.quiet,
+            )
+
+    # stderr, like the progress lines: stdout may be carrying the dump.
+    print(json.dumps(asyncio.run(run())), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,675 @@
+"""Offline, OpenAI-compatible stand-in for the Gemini chat-completions endpoint.
+
+Point ``GEMINI_BASE_URL`` at this server to drive any lesson agent without a
+network connection or API key::
+
+    python -m hello_agent.stub_server --port 8787 --latency normal:0.05,0.01 --tps 300
+    GEMINI_BASE_URL=http://127.0.0.1:8787/v1 GEMINI_API_KEY=stub uv run basic_tools.py
+
+It speaks ``POST .../chat/completions`` (plain and ``stream=true`` SSE chunks,
+including ``tool_calls``) and fakes the rest: replies follow scripted rules
+when one matches, call offered tools/handoffs when the prompt looks like it
+wants one, produce schema-valid JSON for ``output_type`` agents, and
+otherwise answer with a default line. Latency, time-to-first-token and token
+rate are drawn from configurable distributions so load tests measure our own
+overhead against a known model cost.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from ._http import (
+    ChunkedResponse,
+    HTTPError,
+    Request,
+    read_request,
+    send_json,
+    sse_event,
+)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+@dataclass(frozen=True)
+class Latency:
+    """A delay distribution in seconds.
+
+    ``kind`` is one of ``fixed`` (``a``), ``uniform`` (``a``..``b``),
+    ``normal`` (mean ``a``, stddev ``b``), ``lognormal`` (median ``a``,
+    sigma ``b``) or ``exponential`` (mean ``a``). Samples never go below 0.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        match self.kind:
+            case "fixed":
+                value = self.a
+            case "uniform":
+                value = rng.uniform(self.a, self.b)
+            case "normal":
+                value = rng.gauss(self.a, self.b)
+            case "lognormal":
+                value = self.a * math.exp(rng.gauss(0.0, self.b)) if self.a else 0.0
+            case "exponential" | "exp":
+                value = rng.expovariate(1.0 / self.a) if self.a else 0.0
+            case _:
+                raise ValueError(f"unknown latency distribution: {self.kind}")
+        return max(0.0, value)
+
+    @classmethod
+    def parse(cls, spec: str | float | None) -> "Latency":
+        """Parse ``"0.2"``, ``"fixed:0.2"``, ``"uniform:0.1,0.3"`` and friends."""
+        if spec is None or spec == "":
+            return cls()
+        if isinstance(spec, (int, float)):
+            return cls("fixed", float(spec))
+        kind, _, params = spec.partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        values = [float(v) for v in params.split(",")]
+        return cls(kind, values[0], values[1] if len(values) > 1 else 0.0)
+
+
+@dataclass
+class ScriptedReply:
+    """A canned answer used when its patterns match the request.
+
+    ``pattern`` is matched against the latest user message and ``system``
+    against the system prompt (so a rule can target one agent by its
+    instructions). ``after_tool`` restricts the rule to requests whose last
+    message is (or is not) a tool result. ``content`` may use ``{user}`` and
+    ``{tool_output}`` placeholders; ``tool_calls`` is a list of
+    ``{"name": ..., "arguments": {...}}`` objects.
+    """
+
+    pattern: str | None = None
+    system: str | None = None
+    after_tool: bool | None = None
+    content: str | None = None
+    tool_calls: list[dict[str, Any]] = field(default_factory=list)
+
+    def matches(self, user: str, system: str, after_tool: bool) -> bool:
+        if self.after_tool is not None and self.after_tool != after_tool:
+            return False
+        if self.pattern and not re.search(self.pattern, user, re.IGNORECASE):
+            return False
+        if self.system and not re.search(self.system, system, re.IGNORECASE):
+            return False
+        return True
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ScriptedReply":
+        return cls(
+            pattern=data.get("pattern"),
+            system=data.get("system"),
+            after_tool=data.get("after_tool"),
+            content=data.get("content"),
+            tool_calls=list(data.get("tool_calls", [])),
+        )
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stand-in model."""
+
+    latency: Latency = field(default_factory=Latency)
+    """Per-request overhead before the model "starts thinking"."""
+
+    ttft: Latency = field(default_factory=Latency)
+    """Time to first token, added after ``latency``."""
+
+    tokens_per_second: float = 0.0
+    """Generation rate for completion tokens; ``0`` means instant."""
+
+    default_reply: str = "OK, here is a short answer to: {user}"
+    auto_tool_calls: bool = True
+    replies: list[ScriptedReply] = field(default_factory=list)
+    error_rate: float = 0.0
+    error_status: int = 500
+    seed: int | None = None
+
+    @classmethod
+    def load_replies(cls, path: str) -> list[ScriptedReply]:
+        with open(path, encoding="utf-8") as fh:
+            return [ScriptedReply.from_dict(item) for item in json.load(fh)]
+
+
+@dataclass
+class StubStats:
+    requests: int = 0
+    streamed: int = 0
+    tool_call_responses: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    completion_tokens: int = 0
+
+
+def _text_of(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return "" if content is None else str(content)
+
+
+def _is_handoff_result(messages: list[dict[str, Any]]) -> bool:
+    """Whether the trailing tool message answers a ``transfer_to_*`` handoff call."""
+    call_id = messages[-1].get("tool_call_id")
+    for message in reversed(messages):
+        for call in message.get("tool_calls") or []:
+            if call.get("id") == call_id:
+                return call["function"]["name"].startswith("transfer_to_")
+    return False
+
+
+def _stems(text: str) -> set[str]:
+    """Lower-cased words with a plural "s" dropped, for loose keyword overlap."""
+    return {w[:-1] if len(w) > 3 and w.endswith("s") else w for w in _WORD_RE.findall(text.lower())}
+
+
+def _tokenize(text: str) -> list[str]:
+    """Split a reply into pseudo-tokens that concatenate back to ``text``."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def example_for_schema(schema: dict[str, Any], defs: dict[str, Any] | None = None) -> Any:
+    """Build a minimal instance that validates against a JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return example_for_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return example_for_schema(options[0], defs)
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    match kind:
+        case "object":
+            props = schema.get("properties", {})
+            return {name: example_for_schema(sub, defs) for name, sub in props.items()}
+        case "array":
+            return []
+        case "string":
+            return "stub"
+        case "integer":
+            return 0
+        case "number":
+            return 0.0
+        case "boolean":
+            return True
+        case _:
+            return None
+
+
+def _arguments_for(schema: dict[str, Any], user: str) -> dict[str, Any]:
+    """Fill tool arguments, taking numbers from the user message in order."""
+    args = example_for_schema(schema) or {}
+    numbers = iter(_NUMBER_RE.findall(user))
+    words = [w for w in re.findall(r"[A-Z][a-z]+", user)]
+    for name, sub in schema.get("properties", {}).items():
+        kind = sub.get("type")
+        if kind in ("integer", "number"):
+            value = next(numbers, None)
+            if value is not None:
+                args[name] = int(float(value)) if kind == "integer" else float(value)
+        elif kind == "string" and words:
+            args[name] = words[-1]
+    return args
+
+
+def _is_function(function: Any) -> bool:
+    return (
+        isinstance(function, dict)
+        and isinstance(function.get("name"), str)
+        and isinstance(function.get("description") or "", str)
+        and isinstance(function.get("parameters") or {}, dict)
+    )
+
+
+def _objects(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(v, dict) for v in value)
+
+
+def _check_request(body: Any) -> dict[str, Any]:
+    """Return ``body`` if it is shaped like a chat-completions request.
+
+    Only the fields :class:`StubModel` reads are checked; anything else
+    raises ``HTTPError(400)``.
+    """
+    if not isinstance(body, dict):
+        raise HTTPError(400, "request body must be a JSON object")
+    messages = body.get("messages", [])
+    if not _objects(messages):
+        raise HTTPError(400, '"messages" must be a list of objects')
+    for message in messages:
+        calls = message.get("tool_calls") or []
+        if not _objects(calls) or not all(_is_function(c.get("function")) for c in calls):
+            raise HTTPError(400, '"tool_calls" must be a list of function calls')
+    tools = body.get("tools") or []
+    if not _objects(tools) or not all(
+        _is_function(t.get("function")) for t in tools if t.get("type") == "function"
+    ):
+        raise HTTPError(400, '"tools" must be a list of tool objects')
+    tool_choice = body.get("tool_choice")
+    if isinstance(tool_choice, dict) and not isinstance(tool_choice.get("function", {}), dict):
+        raise HTTPError(400, '"tool_choice" must name a function')
+    response_format = body.get("response_format") or {}
+    if not isinstance(response_format, dict) or (
+        response_format.get("type") == "json_schema"
+        and not (
+            isinstance(response_format.get("json_schema"), dict)
+            and isinstance(response_format["json_schema"].get("schema", {}), dict)
+        )
+    ):
+        raise HTTPError(400, '"response_format" is malformed')
+    if not isinstance(body.get("stream_options") or {}, dict):
+        raise HTTPError(400, '"stream_options" must be an object')
+    return body
+
+
+class StubModel:
+    """Decides what the fake model answers for a chat-completions request."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self._ids = itertools.count(1)
+
+    def _pick_tool(
+        self, tools: list[dict[str, Any]], user: str, tool_choice: Any
+    ) -> dict[str, Any] | None:
+        functions = [t["function"] for t in tools if t.get("type") == "function"]
+        if not functions or tool_choice == "none":
+            return None
+        if isinstance(tool_choice, dict):
+            wanted = tool_choice.get("function", {}).get("name")
+            return next((f for f in functions if f["name"] == wanted), functions[0])
+        words = _stems(user)
+
+        def score(function: dict[str, Any]) -> int:
+            name_words = _stems(function["name"].replace("_", " "))
+            name_words -= {"transfer", "to", "agent", "get"}
+            desc_words = _stems(function.get("description") or "")
+            return 3 * len(words & name_words) + len(words & desc_words - _STOPWORDS)
+
+        best = max(functions, key=score)
+        if score(best) > 0 or tool_choice == "required":
+            return best
+        return None
+
+    def reply(self, body: dict[str, Any]) -> tuple[str | None, list[dict[str, Any]]]:
+        """Return ``(content, tool_calls)`` for one request body."""
+        messages = body.get("messages", [])
+        system = " ".join(
+            _text_of(m.get("content")) for m in messages if m.get("role") in ("system", "developer")
+        )
+        user = next(
+            (_text_of(m.get("content")) for m in reversed(messages) if m.get("role") == "user"),
+            "",
+        )
+        last = messages[-1] if messages else {}
+        after_tool = last.get("role") == "tool" and not _is_handoff_result(messages)
+        tool_output = _text_of(last.get("content")) if after_tool else ""
+
+        for rule in self.config.replies:
+            if rule.matches(user, system, after_tool):
+                calls = [
+                    {"name": call["name"], "arguments": call.get("arguments", {})}
+                    for call in rule.tool_calls
+                ]
+                content = (
+                    rule.content.format(user=user, tool_output=tool_output)
+                    if rule.content is not None
+                    else None
+                )
+                return content, calls
+
+        response_format = body.get("response_format") or {}
+        if not after_tool and self.config.auto_tool_calls:
+            tool = self._pick_tool(body.get("tools") or [], user, body.get("tool_choice"))
+            if tool is not None:
+                args = _arguments_for(tool.get("parameters") or {}, user)
+                return None, [{"name": tool["name"], "arguments": args}]
+
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"].get("schema", {})
+            return json.dumps(example_for_schema(schema)), []
+        if after_tool:
+            return f"Here is what I found: {tool_output}", []
+        return self.config.default_reply.format(user=user), []
+
+    def next_id(self) -> str:
+        return f"chatcmpl-stub-{next(self._ids)}"
+
+    def next_call_id(self) -> str:
+        return f"call_stub_{next(self._ids)}"
+
+
+_STOPWORDS = frozenset(
+    "a an the and or of for to in on is are be with this that it you your user "
+    "from by as at get simple function".split()
+)
+
+
+class StubServer:
+    """The asyncio server; use :meth:`start` / :meth:`serve_forever`."""
+
+    def __init__(self, config: StubConfig | None = None) -> None:
+        self.config = config or StubConfig()
+        self.model = StubModel(self.config)
+        self.stats = StubStats()
+        self._server: asyncio.Server | None = None
+        self._connections: set[asyncio.Task[None]] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, backlog=4096
+        )
+        return self._server
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None, "server not started"
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8787) -> None:
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def aclose(self) -> None:
+        """Stop listening and close every open connection, idle or not."""
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as exc:
+                    await send_json(
+                        writer, exc.status, {"error": {"message": str(exc)}}, keep_alive=False
+                    )
+                    break
+                if request is None:
+                    break
+                await self._dispatch(request, writer)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        if request.method == "POST" and request.path.endswith("/chat/completions"):
+            await self._chat_completions(request, writer)
+        elif request.method == "GET" and request.path.endswith("/models"):
+            await send_json(
+                writer, 200, {"object": "list", "data": [{"id": "stub", "object": "model"}]}
+            )
+        elif request.method == "GET" and request.path.endswith("/stats"):
+            await send_json(writer, 200, self.stats.__dict__)
+        else:
+            await send_json(writer, 404, {"error": {"message": f"no route {request.path}"}})
+
+    async def _chat_completions(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        config = self.config
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        try:
+            try:
+                body = _check_request(request.json())
+            except HTTPError as exc:
+                await send_json(writer, exc.status, {"error": {"message": str(exc)}})
+                return
+            await asyncio.sleep(config.latency.sample(self.model.rng))
+            if config.error_rate and self.model.rng.random() < config.error_rate:
+                self.stats.errors += 1
+                await send_json(
+                    writer,
+                    config.error_status,
+                    {"error": {"message": "injected failure", "type": "stub_error"}},
+                )
+                return
+
+            try:
+                content, calls = self.model.reply(body)
+            except (KeyError, IndexError, TypeError, AttributeError) as exc:
+                # Malformed deeper than _check_request looks, e.g. a bad schema.
+                message = f"malformed request: {type(exc).__name__}: {exc}"
+                await send_json(writer, 400, {"error": {"message": message}})
+                return
+            tool_calls = [
+                {
+                    "id": self.model.next_call_id(),
+                    "type": "function",
+                    "function": {"name": c["name"], "arguments": json.dumps(c["arguments"])},
+                }
+                for c in calls
+            ]
+            if tool_calls:
+                self.stats.tool_call_responses += 1
+            tokens = _tokenize(content or "")
+            prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens) + 8 * len(tool_calls),
+                "total_tokens": prompt_tokens + len(tokens) + 8 * len(tool_calls),
+            }
+            self.stats.completion_tokens += usage["completion_tokens"]
+            finish_reason = "tool_calls" if tool_calls else "stop"
+            ttft = config.ttft.sample(self.model.rng)
+
+            if body.get("stream"):
+                self.stats.streamed += 1
+                await self._stream(writer, body, tokens, tool_calls, usage, ttft, finish_reason)
+                return
+
+            await asyncio.sleep(ttft + self._generation_time(len(tokens)))
+            message: dict[str, Any] = {"role": "assistant", "content": content}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            await send_json(
+                writer,
+                200,
+                {
+                    "id": self.model.next_id(),
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [
+                        {"index": 0, "message": message, "finish_reason": finish_reason}
+                    ],
+                    "usage": usage,
+                },
+            )
+        finally:
+            self.stats.in_flight -= 1
+
+    def _generation_time(self, n_tokens: int) -> float:
+        rate = self.config.tokens_per_second
+        return n_tokens / rate if rate > 0 else 0.0
+
+    async def _stream(
+        self,
+        writer: asyncio.StreamWriter,
+        body: dict[str, Any],
+        tokens: list[str],
+        tool_calls: list[dict[str, Any]],
+        usage: dict[str, int],
+        ttft: float,
+        finish_reason: str,
+    ) -> None:
+        completion_id = self.model.next_id()
+        created = int(time.time())
+        model = body.get("model", "stub")
+
+        def chunk(delta: dict[str, Any], finish: str | None = None) -> bytes:
+            return sse_event(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                }
+            )
+
+        response = ChunkedResponse(writer)
+        await response.start()
+        await asyncio.sleep(ttft)
+        await response.write(chunk({"role": "assistant", "content": ""}))
+
+        # Sleep in >=1ms steps so very high token rates don't cost a wakeup per token.
+        interval = 1.0 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+        debt = 0.0
+        for token in tokens:
+            await response.write(chunk({"content": token}))
+            debt += interval
+            if debt >= 0.001:
+                await asyncio.sleep(debt)
+                debt = 0.0
+        for index, call in enumerate(tool_calls):
+            await response.write(chunk({"tool_calls": [{"index": index, **call}]}))
+        await response.write(chunk({}, finish_reason))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            await response.write(
+                sse_event(
+                    {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [],
+                        "usage": usage,
+                    }
+                )
+            )
+        await response.write(sse_event("[DONE]"))
+        await response.end()
+
+
+class StubServerThread:
+    """Runs a :class:`StubServer` on its own event loop in a daemon thread.
+
+    Handy for benchmarks and scripts that want the stand-in in-process::
+
+        with StubServerThread(StubConfig(latency=Latency.parse("0.05"))) as stub:
+            os.environ["GEMINI_BASE_URL"] = stub.base_url
+    """
+
+    def __init__(self, config: StubConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.server = StubServer(config)
+        self.host = host
+        self._port = port
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stub-model-server", daemon=True)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self.server.start(self.host, self._port))
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            # Close keep-alive connections before the loop goes, or their
+            # handler tasks are destroyed pending.
+            self._loop.run_until_complete(self.server.aclose())
+            self._loop.close()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.server.port}/v1"
+
+    def start(self) -> "StubServerThread":
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StubServerThread":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency=Latency.parse(args.latency),
+        ttft=Latency.parse(args.ttft),
+        tokens_per_second=args.tps,
+        default_reply=args.reply,
+        auto_tool_calls=not args.no_tools,
+        replies=StubConfig.load_replies(args.script) if args.script else [],
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", default="0", help="e.g. 0.05, uniform:0.02,0.08, lognormal:0.05,0.4")
+    parser.add_argument("--ttft", default="0", help="time-to-first-token distribution")
+    parser.add_argument("--tps", type=float, default=0.0, help="completion tokens per second (0 = instant)")
+    parser.add_argument("--reply", default=StubConfig.default_reply, help="default reply template")
+    parser.add_argument("--script", help="JSON file with a list of scripted replies")
+    parser.add_argument("--no-tools", action="store_true", help="never call tools automatically")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubServer(config_from_args(args))
+    print(f"Stub model server on http://{args.host}:{args.port}/v1")
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""A synchronous façade over ``Runner`` backed by one long-lived event loop.
+
+``Runner.run_sync`` drives the coroutine on the calling thread's loop, so a
+REPL or a threaded web worker either pays for a loop per call (with
+``asyncio.run``) or can't call it at all from worker threads. A
+:class:`SyncRunner` instead submits every run to a single background loop
+thread. Its pooled connections stay warm between calls, and any number of
+threads can call it at once::
+
+    runner = get_sync_runner()
+    result = runner.run(agent, "Hello")           # blocks like run_sync
+    for event in runner.run_streamed(agent, "Hi"):
+        ...
+
+:func:`get_sync_runner` returns a process-wide instance that is started on
+first use and stopped at interpreter exit.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from collections.abc import Coroutine, Iterator
+from typing import Any, TypeVar
+
+from agents import Agent, Runner, RunResult, StreamEvent
+
+from .clients import aclose_loop_connections
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """An event loop running forever in a daemon thread."""
+
+    def __init__(self, name: str = "hello-agent-loop") -> None:
+        self._name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or not self.running:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def main() -> None:
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=main, name=self._name, daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+        """Schedule ``coro`` on the loop and return a thread-safe future."""
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def call(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run ``coro`` on the loop and block until it finishes.
+
+        On timeout or ``KeyboardInterrupt`` the coroutine is cancelled before
+        the exception propagates, so nothing keeps running in the background.
+        """
+        if self._loop is not None and _running_loop() is self._loop:
+            coro.close()
+            raise RuntimeError("SyncRunner cannot be called from its own event loop")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close this loop's pooled connections, then stop and close the loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        if thread.is_alive():
+            try:
+                asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout)
+            except (concurrent.futures.TimeoutError, RuntimeError):
+                pass
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+
+async def _shutdown() -> None:
+    await aclose_loop_connections()
+    await asyncio.get_running_loop().shutdown_asyncgens()
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class SyncRunner:
+    """Blocking ``Runner.run`` / ``Runner.run_streamed`` on a background loop.
+
+    Keyword arguments are passed through to ``Runner`` (``context``,
+    ``max_turns``, ``run_config``, ``session``...). ``timeout`` bounds the
+    whole run; the run is cancelled if it expires.
+    """
+
+    def __init__(self, loop: BackgroundLoop | None = None) -> None:
+        self.loop = loop or BackgroundLoop()
+
+    def run(
+        self,
+        starting_agent: Agent[Any],
+        input: Any,
+        *,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> RunResult:
+        return self.loop.call(Runner.run(starting_agent, input, **kwargs), timeout)
+
+    def run_streamed(
+        self,
+        starting_agent: Agent[Any],
+        input: Any,
+        *,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> Iterator[StreamEvent]:
+        """Yield stream events as they arrive.
+
+        ``timeout`` applies to the wait for each event. Closing the iterator
+        early cancels the run.
+        """
+
+        async def start():
+            # run_streamed schedules its task on the running loop.
+            result = Runner.run_streamed(starting_agent, input, **kwargs)
+            return result, result.stream_events()
+
+        result, events = self.loop.call(start())
+        try:
+            while True:
+                try:
+                    yield self.loop.call(events.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            if not result.is_complete:
+                result.cancel()
+            self.loop.call(events.aclose())
+
+    def close(self) -> None:
+        self.loop.stop()
+
+    def __enter__(self) -> "SyncRunner":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+_default: SyncRunner | None = None
+_default_lock = threading.Lock()
+
+
+def get_sync_runner() -> SyncRunner:
+    """Return the process-wide :class:`SyncRunner`, creating it on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SyncRunner()
+            atexit.register(_default.close)
+        return _default
+
+
+def run_sync(starting_agent: Agent[Any], input: Any, **kwargs: Any) -> RunResult:
+    """Drop-in for ``Runner.run_sync`` that uses the shared background loop."""
+    return get_sync_runner().run(starting_agent, input, **kwargs)
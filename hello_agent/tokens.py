@@ -0,0 +1,278 @@
+"""Fast local token estimates for prompts, tool schemas and histories.
+
+There's no tokenizer for Gemini we can ship, so this approximates a BPE
+tokenizer in pure Python: text is split with a GPT-style pre-tokenizer
+pattern, and each piece is priced by its kind and length (short words are one
+token, long words about one per five letters, digits one per three, and so
+on). It is not exact, but it tracks real counts closely enough for budgets,
+truncation decisions and metrics; compare against provider-reported usage
+if a decision is close.
+
+Everything is cached: text counts by string, tool and output schemas by
+object. Pricing an agent's full request is therefore mostly dictionary
+lookups::
+
+    estimate = await estimate_request(agent, history, context=ctx)
+    print(estimate.total, estimate.tools, estimate.history)
+
+:class:`TokenBudget` applies the same estimate to every model call of a run
+(via ``RunConfig.call_model_input_filter``) to record per-call metrics and
+to refuse calls over a hard limit.
+"""
+
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from agents import Agent, AgentOutputSchema, FunctionTool, Handoff, RunContextWrapper
+from agents import TResponseInputItem, Tool
+from agents.handoffs import handoff
+from agents.run import CallModelData, ModelInputData
+
+MESSAGE_OVERHEAD = 4
+"""Tokens per message for role and separators in the chat template."""
+
+TOOL_OVERHEAD = 8
+"""Tokens per tool definition for the function wrapper."""
+
+REQUEST_OVERHEAD = 3
+
+_PIECES = re.compile(
+    r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d+| ?[^\s\w]+|\s+",
+    re.IGNORECASE,
+)
+
+
+def _piece_tokens(piece: str) -> int:
+    word = piece.lstrip(" ")
+    if not word:
+        return 1
+    first = word[0]
+    if first.isalpha():
+        if not word.isascii():
+            # Non-Latin scripts are closer to one token per character or two.
+            return max(1, math.ceil(len(word) / 1.5))
+        return 1 if len(word) <= 7 else math.ceil(len(word) / 5)
+    if first.isdigit():
+        return math.ceil(len(word) / 3)
+    if first.isspace():
+        return 1 if len(piece) <= 16 else math.ceil(len(piece) / 16)
+    # Punctuation runs such as '":{' mostly merge in pairs.
+    return math.ceil(len(word) / 2)
+
+
+@lru_cache(maxsize=65536)
+def count_text(text: str) -> int:
+    """Estimated tokens in ``text``."""
+    if not text:
+        return 0
+    if len(text) > 20000:
+        # Past this the per-piece loop costs more than the precision is worth.
+        return math.ceil(len(text) / 4)
+    return sum(_piece_tokens(m.group()) for m in _PIECES.finditer(text))
+
+
+def _content_tokens(content: Any) -> int:
+    if content is None:
+        return 0
+    if isinstance(content, str):
+        return count_text(content)
+    if isinstance(content, list):
+        total = 0
+        for part in content:
+            if isinstance(part, dict) and isinstance(part.get("text"), str):
+                total += count_text(part["text"])
+            elif isinstance(part, dict) and part.get("type", "").endswith("image"):
+                total += 85  # low-detail image tile
+            else:
+                total += count_text(json.dumps(part, default=str))
+        return total
+    return count_text(json.dumps(content, default=str))
+
+
+def count_item(item: TResponseInputItem) -> int:
+    """Estimated tokens for one input item, including message overhead."""
+    if not isinstance(item, dict):
+        return MESSAGE_OVERHEAD + count_text(str(item))
+    kind = item.get("type")
+    if kind == "function_call":
+        body = count_text(item.get("name", "")) + count_text(item.get("arguments", ""))
+    elif kind == "function_call_output":
+        body = _content_tokens(item.get("output"))
+    elif "content" in item:
+        body = _content_tokens(item["content"])
+    else:
+        body = count_text(json.dumps(item, default=str))
+    return MESSAGE_OVERHEAD + body
+
+
+def count_items(items: str | list[TResponseInputItem]) -> int:
+    if isinstance(items, str):
+        return MESSAGE_OVERHEAD + count_text(items)
+    return sum(count_item(item) for item in items)
+
+
+# Schemas rarely change after an agent is built, so cache by object identity.
+# The object is kept alongside its count so its id can't be reused.
+_schema_cache: dict[int, tuple[object, int]] = {}
+
+
+def _cached(obj: object, compute) -> int:
+    hit = _schema_cache.get(id(obj))
+    if hit is not None and hit[0] is obj:
+        return hit[1]
+    value = compute()
+    if len(_schema_cache) > 4096:
+        _schema_cache.clear()
+    _schema_cache[id(obj)] = (obj, value)
+    return value
+
+
+def _schema_tokens(name: str, description: str | None, schema: dict[str, Any]) -> int:
+    return (
+        TOOL_OVERHEAD
+        + count_text(name)
+        + count_text(description or "")
+        + count_text(json.dumps(schema, separators=(",", ":")))
+    )
+
+
+def count_tool(tool: Tool | Handoff) -> int:
+    """Estimated tokens of one tool or handoff definition in the request."""
+    if isinstance(tool, FunctionTool):
+        return _cached(
+            tool,
+            lambda: _schema_tokens(tool.name, tool.description, tool.params_json_schema),
+        )
+    if isinstance(tool, Handoff):
+        return _cached(
+            tool,
+            lambda: _schema_tokens(
+                tool.tool_name, tool.tool_description, tool.input_json_schema
+            ),
+        )
+    # Hosted tools (web search, code interpreter...) are small fixed blocks.
+    return _cached(tool, lambda: TOOL_OVERHEAD + count_text(getattr(tool, "name", "")))
+
+
+def count_tools(tools: list[Tool]) -> int:
+    return sum(count_tool(tool) for tool in tools)
+
+
+def count_handoffs(agent: Agent[Any]) -> int:
+    total = 0
+    for item in agent.handoffs:
+        if isinstance(item, Handoff):
+            total += count_tool(item)
+        else:
+            total += _cached(item, lambda: count_tool(handoff(item)))
+    return total
+
+
+def count_output_schema(agent: Agent[Any]) -> int:
+    if agent.output_type is None or agent.output_type is str:
+        return 0
+
+    def compute() -> int:
+        schema = agent.output_type
+        if not hasattr(schema, "json_schema"):
+            schema = AgentOutputSchema(agent.output_type)
+        return count_text(json.dumps(schema.json_schema(), separators=(",", ":")))
+
+    return _cached(agent.output_type, compute)
+
+
+@dataclass
+class RequestEstimate:
+    instructions: int = 0
+    tools: int = 0
+    handoffs: int = 0
+    output_schema: int = 0
+    history: int = 0
+
+    @property
+    def total(self) -> int:
+        return (
+            REQUEST_OVERHEAD
+            + self.instructions
+            + self.tools
+            + self.handoffs
+            + self.output_schema
+            + self.history
+        )
+
+
+async def estimate_request(
+    agent: Agent[Any],
+    input: str | list[TResponseInputItem] = "",
+    *,
+    context: Any = None,
+) -> RequestEstimate:
+    """Price the request ``agent`` would send for ``input``.
+
+    Dynamic instructions and conditionally enabled tools are resolved with
+    ``context`` exactly as a run would, so those callables are invoked.
+    """
+    wrapper = RunContextWrapper(context=context)
+    instructions = await agent.get_system_prompt(wrapper)
+    tools = await agent.get_all_tools(wrapper)
+    return RequestEstimate(
+        instructions=MESSAGE_OVERHEAD + count_text(instructions) if instructions else 0,
+        tools=count_tools(tools),
+        handoffs=count_handoffs(agent),
+        output_schema=count_output_schema(agent),
+        history=count_items(input),
+    )
+
+
+def estimate_model_input(data: CallModelData[Any]) -> RequestEstimate:
+    """Price one model call from a ``call_model_input_filter`` payload.
+
+    Uses the agent's static ``tools`` list (the call's resolved tool list is
+    not part of the payload).
+    """
+    instructions = data.model_data.instructions
+    return RequestEstimate(
+        instructions=MESSAGE_OVERHEAD + count_text(instructions) if instructions else 0,
+        tools=count_tools(data.agent.tools),
+        handoffs=count_handoffs(data.agent),
+        output_schema=count_output_schema(data.agent),
+        history=count_items(data.model_data.input),
+    )
+
+
+class TokenBudgetExceeded(Exception):
+    def __init__(self, estimate: RequestEstimate, limit: int) -> None:
+        super().__init__(
+            f"model call would send ~{estimate.total} tokens, over the limit of {limit}"
+        )
+        self.estimate = estimate
+        self.limit = limit
+
+
+@dataclass
+class TokenBudget:
+    """Per-call token metrics, with an optional hard limit.
+
+    Pass ``budget.call_model_input_filter`` as the run's
+    ``call_model_input_filter``; every model call's estimate is appended to
+    ``calls``. With ``max_tokens`` set, a call over the limit raises
+    :class:`TokenBudgetExceeded` instead of being sent.
+    """
+
+    max_tokens: int | None = None
+    calls: list[RequestEstimate] = field(default_factory=list)
+
+    def call_model_input_filter(self, data: CallModelData[Any]) -> ModelInputData:
+        estimate = estimate_model_input(data)
+        self.calls.append(estimate)
+        if self.max_tokens is not None and estimate.total > self.max_tokens:
+            raise TokenBudgetExceeded(estimate, self.max_tokens)
+        return data.model_data
+
+    @property
+    def total(self) -> int:
+        return sum(call.total for call in self.calls)
@@ -0,0 +1,667 @@
+"""Keep blocking tools off the event loop.
+
+``function_tool`` calls a plain ``def`` tool directly on the event loop, and
+an ``async def`` tool that calls ``time.sleep`` or ``requests.get`` blocks
+it just the same: every other conversation in the process stalls until the
+tool returns. :func:`loop_safe_tool` is a drop-in for ``function_tool``
+that runs such tools on a thread pool instead::
+
+    @loop_safe_tool                      # detected: calls time.sleep
+    async def search(ctx: RunContextWrapper[UserContext], query: str) -> str:
+        time.sleep(30)
+        return "No results found."
+
+    @loop_safe_tool(blocking=True, pool="db")   # declared, shares a pool
+    def lookup(order_id: str) -> str: ...
+
+Plain ``def`` functions are always treated as blocking. ``async def``
+functions are scanned for well-known blocking calls (``time.sleep``,
+``requests``, ``subprocess``, ``urlopen``, ...) that aren't awaited; pass
+``blocking=True`` or ``False`` to override the guess.
+
+Each pool (by default one per tool, named after it) is a bounded
+``ThreadPoolExecutor`` in a shared :class:`ToolExecutor`, so one slow tool
+can exhaust its own workers but not anyone else's. Pool sizes and
+queue-depth metrics are per pool::
+
+    executor = get_tool_executor()
+    executor.set_pool_size("search", 16)
+    print(executor.stats())        # {"search": ToolPoolStats(...), ...}
+
+A :class:`ToolLimiter` caps how many tool calls run at once, per tool and
+overall, and times each call::
+
+    limiter = ToolLimiter(max_concurrent=8, per_tool={"search": 2})
+    result = await Runner.run(limiter.apply(agent), "...")
+    for timing in limiter.timings(result):
+        print(timing.tool, timing.wait_seconds, timing.run_seconds)
+
+Deterministic or slow-changing tools can memoize their results in a
+:class:`ToolCache`::
+
+    weather_cache = ToolCache(max_entries=4096, ttl=600)
+
+    @loop_safe_tool(cache=weather_cache)
+    def get_weather(city: str) -> str: ...
+
+    @loop_safe_tool(cache=weather_cache, cache_ttl=FOREVER)
+    def city_timezone(city: str) -> str: ...
+"""
+
+import ast
+import asyncio
+import atexit
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import inspect
+import json
+import logging
+import math
+import textwrap
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Iterable, TypeVar, get_origin, get_type_hints
+
+from agents import Agent, FunctionTool, RunContextWrapper, ToolCallItem, function_tool
+from agents.result import RunResultBase
+from agents.tool_context import ToolContext
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BLOCKING_CALLS = frozenset(
+    {
+        "time.sleep",
+        "sleep",
+        "input",
+        "os.system",
+        "subprocess.run",
+        "subprocess.call",
+        "subprocess.check_call",
+        "subprocess.check_output",
+        "urllib.request.urlopen",
+        "urlopen",
+        "socket.create_connection",
+        "sqlite3.connect",
+    }
+)
+"""Dotted call names treated as blocking when not awaited."""
+
+BLOCKING_MODULES = ("requests.", "httpx.", "psycopg2.", "pymysql.", "smtplib.")
+"""Call prefixes treated as blocking (``httpx.get``, not ``httpx.AsyncClient``)."""
+
+
+def _dotted(node: ast.expr) -> str | None:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def blocking_calls(func: Callable[..., Any]) -> list[str]:
+    """Names of known blocking calls in ``func``'s body that aren't awaited.
+
+    Returns an empty list when the source isn't available.
+    """
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+    except (OSError, TypeError, SyntaxError):
+        return []
+    awaited = {id(node.value) for node in ast.walk(tree) if isinstance(node, ast.Await)}
+    found = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or id(node) in awaited:
+            continue
+        name = _dotted(node.func)
+        if name is None:
+            continue
+        if name in BLOCKING_CALLS or (
+            name.startswith(BLOCKING_MODULES) and "Async" not in name
+        ):
+            found.append(name)
+    return found
+
+
+def is_blocking(func: Callable[..., Any]) -> bool:
+    """Whether calling ``func`` from the event loop would block it."""
+    return not inspect.iscoroutinefunction(func) or bool(blocking_calls(func))
+
+
+@dataclass
+class ToolPoolStats:
+    workers: int
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    active: int = 0
+    queued: int = 0
+    """Calls submitted but not yet started."""
+    max_queued: int = 0
+    """Most calls ever waiting for a busy pool at once."""
+    wait_seconds: float = 0.0
+    """Total time calls spent queued."""
+    run_seconds: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        done = self.completed + self.failed
+        return self.wait_seconds / done if done else 0.0
+
+
+_thread_loops = threading.local()
+
+
+def _run_coroutine(fn: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    """Run an ``async def`` tool to completion on this worker's own loop."""
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None:
+        loop = _thread_loops.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(fn(*args, **kwargs))
+
+
+class ToolExecutor:
+    """Named, bounded thread pools for blocking tools.
+
+    Pools are created on first use with ``pool_sizes[name]`` workers, or
+    ``default_workers``.
+    """
+
+    def __init__(
+        self, *, default_workers: int = 4, pool_sizes: dict[str, int] | None = None
+    ) -> None:
+        self.default_workers = default_workers
+        self.pool_sizes = dict(pool_sizes or {})
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._stats: dict[str, ToolPoolStats] = {}
+        self._lock = threading.Lock()
+
+    def set_pool_size(self, name: str, workers: int) -> None:
+        """Size of pool ``name``; only affects a pool not started yet."""
+        with self._lock:
+            if name in self._pools:
+                raise RuntimeError(f"tool pool {name!r} is already running")
+            self.pool_sizes[name] = workers
+
+    def _pool(self, name: str) -> tuple[ThreadPoolExecutor, ToolPoolStats]:
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                workers = self.pool_sizes.get(name, self.default_workers)
+                pool = self._pools[name] = ThreadPoolExecutor(
+                    workers, thread_name_prefix=f"tool-{name}"
+                )
+                self._stats[name] = ToolPoolStats(workers=workers)
+            return pool, self._stats[name]
+
+    async def run(self, name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call ``fn(*args, **kwargs)`` on pool ``name`` and await the result.
+
+        Coroutine functions run to completion on a loop owned by the worker
+        thread. Context variables are copied into the call, as with
+        ``asyncio.to_thread``.
+        """
+        pool, stats = self._pool(name)
+        lock = self._lock
+        queued_at = time.perf_counter()
+        started = False
+        with lock:
+            stats.submitted += 1
+            stats.queued += 1
+            # Submitted calls beyond the workers are the ones actually waiting.
+            stats.max_queued = max(stats.max_queued, stats.active + stats.queued - stats.workers)
+
+        def call() -> T:
+            nonlocal started
+            begin = time.perf_counter()
+            with lock:
+                started = True
+                stats.queued -= 1
+                stats.active += 1
+                stats.wait_seconds += begin - queued_at
+            ok = False
+            try:
+                if inspect.iscoroutinefunction(fn):
+                    result = _run_coroutine(fn, args, kwargs)
+                else:
+                    result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with lock:
+                    stats.active -= 1
+                    stats.run_seconds += time.perf_counter() - begin
+                    if ok:
+                        stats.completed += 1
+                    else:
+                        stats.failed += 1
+
+        context = contextvars.copy_context()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, context.run, call)
+        except asyncio.CancelledError:
+            # A call cancelled while still queued never runs; one already
+            # running finishes in its thread regardless.
+            with lock:
+                if not started:
+                    stats.queued -= 1
+            raise
+
+    def stats(self) -> dict[str, ToolPoolStats]:
+        """A snapshot of every pool's counters."""
+        with self._lock:
+            return {name: replace(stats) for name, stats in self._stats.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait)
+
+
+_default: ToolExecutor | None = None
+_default_lock = threading.Lock()
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Return the process-wide :class:`ToolExecutor`, creating it on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ToolExecutor()
+            atexit.register(_default.shutdown, wait=False)
+        return _default
+
+
+def offload(
+    func: Callable[..., Any], *, pool: str | None = None, executor: ToolExecutor | None = None
+) -> Callable[..., Any]:
+    """An ``async def`` with ``func``'s signature that runs it on a pool."""
+    name = pool or func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await (executor or get_tool_executor()).run(name, func, *args, **kwargs)
+
+    return wrapper
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    """Calls that waited for an identical call already in flight."""
+    expired: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        served = self.hits + self.coalesced
+        total = served + self.misses
+        return served / total if total else 0.0
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return repr(value)
+
+
+FOREVER = math.inf
+"""A ``ttl`` for entries that never expire (only LRU eviction drops them)."""
+
+
+class ToolCache:
+    """LRU cache of tool results with a time-to-live.
+
+    Keys are built from the tool's name and validated arguments, so
+    ``{"a": "2"}`` and ``{"a": 2}`` for an ``int`` parameter share an entry.
+    Identical calls that arrive on the same event loop while one is running
+    wait for it instead of running again; if that call is cancelled, one of
+    them runs it instead.
+    Errors are never cached. One cache can serve many tools. A ``ttl`` of
+    ``None`` or :data:`FOREVER` keeps entries until they are evicted.
+    """
+
+    def __init__(self, max_entries: int = 1024, *, ttl: float | None = 300.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = ToolCacheStats()
+        # key -> (expires at, or None for never; result)
+        self._entries: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+        # Calls in flight, per loop: a future can only be awaited on its own
+        # loop, and run_sync makes a new loop per call.
+        self._pending: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Future[Any]]
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(tool: str, arguments: dict[str, Any], context: tuple[Any, ...] = ()) -> str:
+        return json.dumps([tool, arguments, context], sort_keys=True, default=_jsonable)
+
+    def _lookup(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self.stats.expired += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return True, value
+
+    def _store(self, key: str, value: Any, ttl: float | None) -> None:
+        expires = None if ttl is None or ttl == FOREVER else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    async def call(
+        self, key: str, compute: Callable[[], Awaitable[T]], *, ttl: float | None = None
+    ) -> T:
+        """The cached result for ``key``, or ``await compute()`` stored under it.
+
+        ``ttl`` overrides the cache's default for this entry (``None``: the
+        default; :data:`FOREVER`: never expire).
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            in_flight = self._pending.get(loop)
+            if in_flight is None:
+                in_flight = self._pending[loop] = {}
+        while True:
+            hit, value = self._lookup(key)
+            if hit:
+                return value
+            pending = in_flight.get(key)
+            if pending is None:
+                break
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if pending.cancelled() and task is not None and not task.cancelling():
+                    continue  # the caller computing it was cancelled, not us
+                raise
+        future: asyncio.Future[T] = loop.create_future()
+        in_flight[key] = future
+        self.stats.misses += 1
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            # Only this caller gave up: waiters see a cancelled future and
+            # retry rather than being cancelled along with it.
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved; only waiters care
+            raise
+        else:
+            self._store(key, value, self.ttl if ttl is None else ttl)
+            future.set_result(value)
+            return value
+        finally:
+            if in_flight.get(key) is future:
+                del in_flight[key]
+
+    def invalidate(self, tool: str | None = None) -> int:
+        """Drop every entry, or only ``tool``'s; returns how many."""
+        with self._lock:
+            if tool is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            prefix = json.dumps([tool])[:-1] + ","
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+
+def _takes_context(func: Callable[..., Any], first: inspect.Parameter) -> bool:
+    try:
+        hint = get_type_hints(func).get(first.name, first.annotation)
+    except Exception:
+        hint = first.annotation
+    origin = get_origin(hint) or hint
+    return isinstance(origin, type) and issubclass(origin, RunContextWrapper)
+
+
+def _context_value(context: Any, field: str) -> Any:
+    if isinstance(context, dict):
+        return context.get(field)
+    return getattr(context, field, None)
+
+
+def memoize(
+    func: Callable[..., Any],
+    cache: ToolCache,
+    *,
+    ttl: float | None = None,
+    context_fields: Iterable[str] = (),
+    name: str | None = None,
+) -> Callable[..., Any]:
+    """An ``async def`` with ``func``'s signature whose results go through ``cache``.
+
+    A leading ``RunContextWrapper`` parameter is left out of the key, except
+    for the ``context_fields`` read from its ``context`` (attributes, or
+    keys of a dict context), e.g. ``("username",)`` for per-user results.
+    """
+    signature = inspect.signature(func)
+    parameters = list(signature.parameters.values())
+    context_param = (
+        parameters[0].name if parameters and _takes_context(func, parameters[0]) else None
+    )
+    fields = tuple(context_fields)
+    tool = name or func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        context = ()
+        if context_param is not None:
+            wrapper_ctx = arguments.pop(context_param)
+            context = tuple(_context_value(wrapper_ctx.context, f) for f in fields)
+
+        async def compute() -> Any:
+            result = func(*args, **kwargs)
+            return await result if inspect.isawaitable(result) else result
+
+        return await cache.call(cache.key(tool, arguments, context), compute, ttl=ttl)
+
+    return wrapper
+
+
+def loop_safe_tool(
+    func: Callable[..., Any] | None = None,
+    *,
+    blocking: bool | None = None,
+    pool: str | None = None,
+    executor: ToolExecutor | None = None,
+    cache: ToolCache | None = None,
+    cache_ttl: float | None = None,
+    cache_context: Iterable[str] = (),
+    **tool_options: Any,
+) -> Any:
+    """``function_tool`` that runs blocking functions on a thread pool.
+
+    ``blocking=None`` guesses with :func:`is_blocking`. ``pool`` names the
+    :class:`ToolExecutor` pool (default: the function's name). With
+    ``cache``, results are memoized (see :func:`memoize`) for ``cache_ttl``
+    seconds (default: the cache's; :data:`FOREVER` to never expire), keyed by the arguments and the
+    ``cache_context`` fields; hits never reach the pool. Other keyword
+    arguments go to ``function_tool``.
+    """
+
+    def decorate(fn: Callable[..., Any]) -> FunctionTool:
+        name = tool_options.get("name_override") or fn.__name__
+        offloaded = is_blocking(fn) if blocking is None else blocking
+        if offloaded:
+            logger.debug("tool %s runs off the event loop", name)
+            fn = offload(fn, pool=pool or name, executor=executor)
+        if cache is not None:
+            fn = memoize(fn, cache, ttl=cache_ttl, context_fields=cache_context, name=name)
+        return function_tool(fn, **tool_options)
+
+    if func is None:
+        return decorate
+    return decorate(func)
+
+
+@dataclass
+class ToolCallTiming:
+    call_id: str
+    tool: str
+    wait_seconds: float
+    """Time spent waiting for a concurrency slot."""
+    run_seconds: float
+    ok: bool
+    started: float
+    """``time.perf_counter()`` when the call was dispatched."""
+
+
+class ToolLimiter:
+    """Concurrency caps and per-call timing for function tools.
+
+    The SDK already runs the tool calls of one model response concurrently
+    and returns their outputs in call order. This bounds how many run at
+    once across every run that shares the limiter: ``max_concurrent`` in
+    total and ``per_tool[name]`` (or ``default_per_tool``) per tool.
+
+    A plain ``def`` tool made with ``function_tool`` still runs on the event
+    loop, so several of them in one turn run one after another. Use
+    :func:`loop_safe_tool` for them, or name them in ``offload`` to run the
+    whole tool on its :class:`ToolExecutor` pool. Timings are kept for the
+    last ``max_timings`` calls; see :meth:`timings`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int | None = None,
+        per_tool: dict[str, int] | None = None,
+        default_per_tool: int | None = None,
+        offload: Iterable[str] = (),
+        executor: ToolExecutor | None = None,
+        max_timings: int = 10_000,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.per_tool = dict(per_tool or {})
+        self.default_per_tool = default_per_tool
+        self.offload = frozenset(offload)
+        self.executor = executor
+        self.max_timings = max_timings
+        # asyncio semaphores belong to one loop, and run_sync makes a new
+        # loop per call, so each loop gets its own set.
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str | None, asyncio.Semaphore]
+        ] = weakref.WeakKeyDictionary()
+        self._timings: OrderedDict[str, ToolCallTiming] = OrderedDict()
+
+    def _slots(self, tool: str) -> list[asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.get(loop)
+        if semaphores is None:
+            semaphores = self._semaphores[loop] = {}
+        slots = []
+        limit = self.per_tool.get(tool, self.default_per_tool)
+        if limit is not None:
+            if tool not in semaphores:
+                semaphores[tool] = asyncio.Semaphore(limit)
+            slots.append(semaphores[tool])
+        if self.max_concurrent is not None:
+            if None not in semaphores:
+                semaphores[None] = asyncio.Semaphore(self.max_concurrent)
+            slots.append(semaphores[None])
+        return slots
+
+    def _record(self, timing: ToolCallTiming) -> None:
+        self._timings[timing.call_id] = timing
+        while len(self._timings) > self.max_timings:
+            self._timings.popitem(last=False)
+
+    def wrap(self, tool: FunctionTool) -> FunctionTool:
+        """A copy of ``tool`` subject to this limiter."""
+        if getattr(tool.on_invoke_tool, "limiter", None) is self:
+            return tool
+        name = tool.name
+        invoke = tool.on_invoke_tool
+        if name in self.offload:
+            original = invoke
+
+            async def invoke(ctx: ToolContext[Any], input: str) -> Any:
+                return await (self.executor or get_tool_executor()).run(name, original, ctx, input)
+
+        async def on_invoke_tool(ctx: ToolContext[Any], input: str) -> Any:
+            started = time.perf_counter()
+            async with contextlib.AsyncExitStack() as slots:
+                # Per-tool slot first, so a call queued behind its own tool's
+                # cap doesn't hold one of the global slots meanwhile.
+                for slot in self._slots(name):
+                    await slots.enter_async_context(slot)
+                begin = time.perf_counter()
+                ok = False
+                try:
+                    result = await invoke(ctx, input)
+                    ok = True
+                    return result
+                finally:
+                    self._record(
+                        ToolCallTiming(
+                            ctx.tool_call_id,
+                            name,
+                            begin - started,
+                            time.perf_counter() - begin,
+                            ok,
+                            started,
+                        )
+                    )
+
+        on_invoke_tool.limiter = self  # type: ignore[attr-defined]
+        return replace(tool, on_invoke_tool=on_invoke_tool)
+
+    def apply(self, agent: Agent[Any]) -> Agent[Any]:
+        """A clone of ``agent`` whose function tools go through this limiter."""
+        tools = [self.wrap(t) if isinstance(t, FunctionTool) else t for t in agent.tools]
+        return agent.clone(tools=tools)
+
+    def timings(self, result: RunResultBase) -> list[ToolCallTiming]:
+        """Timings of ``result``'s tool calls, in the order the model made them."""
+        found = []
+        for item in result.new_items:
+            if not isinstance(item, ToolCallItem):
+                continue
+            raw = item.raw_item
+            call_id = raw.get("call_id") if isinstance(raw, dict) else getattr(raw, "call_id", None)
+            timing = self._timings.get(call_id) if call_id else None
+            if timing is not None:
+                found.append(timing)
+        return found
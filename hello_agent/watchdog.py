@@ -0,0 +1,255 @@
+"""Notice when something blocks the event loop, and say what it was.
+
+One ``time.sleep`` in a tool, hook or dynamic-instructions function stalls
+every conversation served by the loop, and nothing reports it: the runs
+just get slower. A :class:`LoopWatchdog` is an opt-in monitor for that::
+
+    watchdog = LoopWatchdog(threshold=0.1)
+    watchdog.start()                  # on the loop to watch
+    ...
+    print(watchdog.snapshot())        # lag histograms and recent stalls
+    await watchdog.stop()
+
+A small task on the loop wakes every ``interval`` seconds and records how
+late it woke up (the loop lag) in a histogram. A monitor thread checks on
+it; when the loop is more than ``threshold`` seconds overdue it captures
+the loop thread's stack and attributes the stall to the agent, tool,
+lifecycle hook or instructions function on it, from the SDK frames'
+locals. Once the loop resumes, the stall's full length goes into that
+component's histogram and a :class:`StallReport` is logged and kept.
+
+Run tools that must block with :func:`~hello_agent.tools.loop_safe_tool`.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from types import FrameType
+from typing import Any
+
+from agents import Agent
+from agents.lifecycle import AgentHooksBase, RunHooksBase
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+"""Upper bounds (seconds) of the lag histogram buckets; one more is unbounded."""
+
+_LIBRARY_PATHS = tuple(
+    {sysconfig.get_paths()[key] for key in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+
+@dataclass
+class LagHistogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LAG_BUCKETS) + 1))
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        index = 0
+        while index < len(LAG_BUCKETS) and seconds > LAG_BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the ``pct`` percentile."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return LAG_BUCKETS[index] if index < len(LAG_BUCKETS) else self.max
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        buckets = {f"le_{bound:g}": n for bound, n in zip(LAG_BUCKETS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+@dataclass
+class StallReport:
+    lag: float
+    """Seconds the loop was blocked."""
+    component: str
+    """What was running, e.g. ``"Genius/tool:search"``."""
+    culprit: str
+    """Innermost application frame, ``"function (file:line)"``."""
+    stack: list[str]
+    at: float
+    """Wall-clock time the stall was noticed."""
+
+
+def _is_library(filename: str) -> bool:
+    return filename.startswith(_LIBRARY_PATHS) or filename.startswith("<") or filename == __file__
+
+
+def attribute(frame: FrameType) -> tuple[str, str]:
+    """``(component, culprit)`` for a stack whose innermost frame is ``frame``."""
+    agent = tool = hook = None
+    instructions = False
+    culprit = None
+    current: FrameType | None = frame
+    while current is not None:
+        code = current.f_code
+        name = code.co_name
+        if culprit is None and not _is_library(code.co_filename):
+            culprit = f"{name} ({os.path.basename(code.co_filename)}:{current.f_lineno})"
+        try:
+            local = current.f_locals
+        except Exception:  # the frame finished under us
+            break
+        if tool is None and name in ("_on_invoke_tool_impl", "_on_invoke_tool"):
+            tool = getattr(local.get("schema"), "name", None)
+        elif tool is None and name == "run_single_tool":
+            tool = getattr(local.get("func_tool"), "name", None)
+        if hook is None and name.startswith("on_"):
+            owner = local.get("self")
+            if isinstance(owner, (RunHooksBase, AgentHooksBase)):
+                hook = f"{type(owner).__name__}.{name}"
+        if name == "get_system_prompt":
+            instructions = True
+        if agent is None and isinstance(local.get("agent"), Agent):
+            agent = local["agent"].name
+        current = current.f_back
+
+    if tool is not None:
+        kind = f"tool:{tool}"
+    elif hook is not None:
+        kind = f"hook:{hook}"
+    elif instructions:
+        kind = "instructions"
+    else:
+        kind = "run" if agent else "other"
+    component = f"{agent}/{kind}" if agent else kind
+    return component, culprit or "unknown"
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and explains stalls over ``threshold`` seconds.
+
+    ``interval`` is how often the lag is sampled. At most ``max_reports``
+    recent :class:`StallReport` objects are kept.
+    """
+
+    def __init__(
+        self, *, threshold: float = 0.1, interval: float = 0.02, max_reports: int = 100
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.lag = LagHistogram()
+        """Every lag sample."""
+        self.stalls: dict[str, LagHistogram] = {}
+        """Stalls over the threshold, per component."""
+        self.reports: deque[StallReport] = deque(maxlen=max_reports)
+        self._task: asyncio.Task[None] | None = None
+        self._monitor: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._thread_id = 0
+        self._due: float | None = None
+        # (due, component, culprit, stack) captured by the monitor thread.
+        self._capture: tuple[float, str, str, list[str]] | None = None
+
+    # -- loop side --------------------------------------------------------
+
+    async def _beat(self) -> None:
+        while True:
+            due = time.perf_counter() + self.interval
+            self._due = due
+            await asyncio.sleep(self.interval)
+            self._record(due, max(0.0, time.perf_counter() - due))
+
+    def _record(self, due: float, lag: float) -> None:
+        self.lag.add(lag)
+        if lag < self.threshold:
+            return
+        capture = self._capture
+        if capture is not None and capture[0] == due:
+            _, component, culprit, stack = capture
+        else:
+            # Over the threshold without the monitor noticing in time: many
+            # short callbacks rather than one long one, most likely.
+            component, culprit, stack = "unattributed", "unknown", []
+        self.stalls.setdefault(component, LagHistogram()).add(lag)
+        self.reports.append(StallReport(lag, component, culprit, stack, time.time()))
+        logger.warning(
+            "event loop blocked for %.0f ms by %s in %s", lag * 1000, component, culprit
+        )
+
+    # -- monitor thread ---------------------------------------------------
+
+    def _watch(self) -> None:
+        poll = min(self.interval, self.threshold / 2)
+        captured = None
+        while not self._stopping.wait(poll):
+            due = self._due
+            if due is None or due == captured or time.perf_counter() - due < self.threshold:
+                continue
+            captured = due
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            try:
+                component, culprit = attribute(frame)
+                stack = traceback.format_list(traceback.extract_stack(frame, limit=40))
+                self._capture = (due, component, culprit, stack)
+            except Exception:
+                logger.debug("could not capture the blocked stack", exc_info=True)
+            finally:
+                del frame
+
+    # -- control ----------------------------------------------------------
+
+    def start(self) -> None:
+        """Start watching the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._monitor = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._monitor.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+
+    def snapshot(self, reports: int = 10) -> dict[str, Any]:
+        """Histograms and the most recent stalls, JSON-ready."""
+        recent = list(self.reports)[-reports:] if reports else []
+        return {
+            "threshold": self.threshold,
+            "lag": self.lag.as_dict(),
+            "stalls": {name: hist.as_dict() for name, hist in sorted(self.stalls.items())},
+            "recent": [asdict(report) for report in recent],
+        }
@@ -1,36 +1,19 @@
-import os
 import asyncio
-from dotenv import load_dotenv, find_dotenv
 from dataclasses import dataclass
 from agents import (
     Agent,
     Runner,
-    AsyncOpenAI,
     RunContextWrapper,
-    function_tool,
-    OpenAIChatCompletionsModel,
+    Model,
     set_tracing_disabled,
 )
-
-_: bool = load_dotenv(find_dotenv())
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # 🔑 Get your API key from environment
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
+from hello_agent import lazy_model, loop_safe_tool
 
 # Tracing disabled
 set_tracing_disabled(disabled=True)
 
-# 1. Which LLM Service?
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=GEMINI_API_KEY,
-    base_url=GEMINI_BASE_URL,
-)
-
-# 2. Which LLM Model?
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model=GEMINI_MODEL, openai_client=external_client
-)
+# 1-2. Which LLM Service and Model? (shared, pooled client)
+llm_model: Model = lazy_model()
 
 
 @dataclass
@@ -39,7 +22,8 @@ class UserContext:
     email: str | None = None
 
 
-@function_tool()
+# Blocks on purpose; loop_safe_tool notices and runs it on a thread pool
+@loop_safe_tool
 async def search(local_context: RunContextWrapper[UserContext], query: str) -> str:
     import time
 
@@ -1,38 +1,17 @@
-import os
-from dotenv import load_dotenv
-
 from agents import (
     Agent,
-    Runner,
     function_tool,
     ModelSettings,
-    OpenAIChatCompletionsModel,
-    AsyncOpenAI,
+    Model,
     set_tracing_disabled,
 )
-
-# 🌿 Load environment variables from .env file
-load_dotenv()
+from hello_agent import lazy_model, run_batch_sync
 
 # 🚫 Disable tracing for clean output (optional for beginners)
 set_tracing_disabled(disabled=True)
 
-# 🔐 1) Environment & Client Setup
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # 🔑 Get your API key from environment
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = (
-    os.getenv("GEMINI_BASE_URL") or ""
-)  # 🌐 Gemini-compatible base URL (set this in .env file)
-
-# 🌐 Initialize the AsyncOpenAI-compatible client with Gemini details
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL
-)
-
-# 🧠 2) Model Initialization
-model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model=GEMINI_MODEL, openai_client=external_client
-)
+# 🧠 1-2) Client & Model Initialization (shared, pooled client)
+model: Model = lazy_model()
 
 
 # 🛠️ Simple tool for learning
@@ -65,12 +44,15 @@ def main():
 
     question = "Tell me about AI in 2 sentences"
 
+    # Both agents run concurrently; results come back in order
+    result_cold, result_hot = run_batch_sync(
+        [(agent_cold, question), (agent_hot, question)]
+    )
+
     print("Cold Agent (Temperature = 0.1):")
-    result_cold = Runner.run_sync(agent_cold, question)
     print(result_cold.final_output)
 
     print("\nHot Agent (Temperature = 1.9):")
-    result_hot = Runner.run_sync(agent_hot, question)
     print(result_hot.final_output)
 
     print("\n💡 Notice: Cold = focused, Hot = creative")
@@ -103,16 +85,17 @@ def main():
 
     question = "What's the area of a 5x3 rectangle?"
 
+    result_auto, result_required, result_none = run_batch_sync(
+        [(agent_auto, question), (agent_required, question), (agent_none, question)]
+    )
+
     print("Auto Tool Choice:")
-    result_auto = Runner.run_sync(agent_auto, question)
     print(result_auto.final_output)
 
     print("\nRequired Tool Choice:")
-    result_required = Runner.run_sync(agent_required, question)
     print(result_required.final_output)
 
     print("\nNone Tool Choice:")
-    result_none = Runner.run_sync(agent_none, question)
     print(result_none.final_output)
 
     print("\n💡 Notice: Auto = decides, Required = must use tool")
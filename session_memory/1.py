@@ -1,28 +1,18 @@
-import os
-from openai import AsyncOpenAI
 from agents import (
     Agent,
     Runner,
     set_tracing_disabled,
-    OpenAIChatCompletionsModel,
     function_tool,
     AgentHooks,
     SQLiteSession,
+    RunConfig,
 )
+from hello_agent import Compactor, RetrievalMemory, SessionCache, lazy_model
 from pydantic import BaseModel
 
-from dotenv import load_dotenv
-
-load_dotenv("../.env")
 set_tracing_disabled(True)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+model = lazy_model()
 
 agent = Agent(
     name="Assistant",
@@ -30,25 +20,48 @@ agent = Agent(
     model=model,
 )
 
-# Create session memory
-session = SQLiteSession("my_first_conversation")
+# Create session memory; the cache serves each turn's history read from memory
+cache = SessionCache()
+session = cache.wrap(SQLiteSession("my_first_conversation"))
+
+# Long sessions: fold old turns into a summary once the prompt gets large
+compactor = Compactor(budget_tokens=4000)
+config = RunConfig(call_model_input_filter=compactor.call_model_input_filter)
 
 print("=== First Conversation with Memory ===")
 
 result1 = Runner.run_sync(
-    agent, "Hi! My name is Talha and I love pizza.", session=session
+    agent, "Hi! My name is Talha and I love pizza.", session=session, run_config=config
 )
 print("Agent:", result1.final_output)
 
 # Turn 2 - Agent should remember your name!
-result2 = Runner.run_sync(agent, "What's my name?", session=session)
+result2 = Runner.run_sync(agent, "What's my name?", session=session, run_config=config)
 print("Agent:", result2.final_output)  # Should say "Talha"!
 
 # Turn 3 - Agent should remember you love pizza!
-result3 = Runner.run_sync(agent, "What food do I like?", session=session)
+result3 = Runner.run_sync(agent, "What food do I like?", session=session, run_config=config)
 
 print("Agent:", result3.final_output)  # Should say "Talha"!
 
+print("Cache:", cache.stats)
+
 print("\n\nNO SESSION MEMORY\n\n")
 result4 = Runner.run_sync(agent, "What's my name and what do I like?")
 print("Agent:", result4.final_output)  # Should mention pizza!
+
+
+print("\n\nRETRIEVAL MEMORY\n\n")
+# Instead of summarizing, send the recent turns plus the past turns that
+# match the question, found with a local BM25 index over the session.
+memory = RetrievalMemory(budget_tokens=1500, top_k=3)
+recall_config = RunConfig(call_model_input_filter=memory.call_model_input_filter)
+long_session = SQLiteSession("long_conversation")
+Runner.run_sync(
+    agent, "Hi! My name is Talha and I love pizza.", session=long_session, run_config=recall_config
+)
+for topic in ["the weather", "train tickets", "my calendar", "the design team", "a good book"]:
+    Runner.run_sync(agent, f"Tell me about {topic}.", session=long_session, run_config=recall_config)
+result5 = Runner.run_sync(agent, "What's my name?", session=long_session, run_config=recall_config)
+print("Agent:", result5.final_output)  # Should still say "Talha"
+print("Retrieval:", memory.stats)
@@ -1,28 +1,20 @@
-import os
-from openai import AsyncOpenAI
+import asyncio
+
 from agents import (
     Agent,
+    RunConfig,
     Runner,
     set_tracing_disabled,
-    OpenAIChatCompletionsModel,
     function_tool,
     AgentHooks,
     SQLiteSession,
 )
+from hello_agent import FactMemory, FactStore, Janitor, RetentionPolicy, SessionStore, lazy_model
 from pydantic import BaseModel
 
-from dotenv import load_dotenv
-
-load_dotenv("../.env")
 set_tracing_disabled(True)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+model = lazy_model()
 
 temp_session = SQLiteSession("temp_conversation")
 
@@ -42,3 +34,38 @@ result2 = Runner.run_sync(
 
 print("Both sessions now remember your favorite color!")
 print("But only the persistent session will remember after restarting the program.")
+
+
+# Persistent sessions live forever unless something cleans up. Expire ones
+# idle for 30 days, cap each at 200 items, and give the space back.
+async def tidy_up():
+    with SessionStore("conversations.db") as store:
+        janitor = Janitor(store, RetentionPolicy(ttl=30 * 86400, max_items=200))
+        stats = await janitor.run_once()
+        print(
+            f"Janitor: expired {stats.sessions_expired} sessions, trimmed "
+            f"{stats.items_trimmed} items, reclaimed {stats.bytes_reclaimed} bytes"
+        )
+
+
+asyncio.run(tidy_up())
+
+
+# Facts like a favourite color don't need the whole transcript: keep them
+# per user, extracted after each run, and add them to the instructions.
+async def remember_facts():
+    with SessionStore("conversations.db") as store:
+        memory = FactMemory(FactStore(store))
+        config = RunConfig(call_model_input_filter=memory.input_filter("user_123"))
+
+        result = await Runner.run(agent, "Remember: my favorite color is blue", run_config=config)
+        memory.observe("user_123", result)
+        await memory.drain()
+        print("Facts:", await memory.store.get("user_123"))
+
+        # A brand new conversation, no session, still knows
+        result = await Runner.run(agent, "What's my favorite color?", run_config=config)
+        print("Agent:", result.final_output)
+
+
+asyncio.run(remember_facts())
@@ -3,6 +3,7 @@ from agents import (
     SQLiteSession,
     TResponseInputItem,
 )
+from hello_agent import SessionStore
 
 
 async def memory_operations_demo():
@@ -44,5 +45,36 @@ async def memory_operations_demo():
     print(f"Memory now contains {len(items)} items")
 
 
-# Run the async demo
+async def long_session_demo():
+    # get_items() reads and parses the whole history. For long sessions a
+    # SessionStore reads just the part you ask for.
+    with SessionStore("test.db") as store:
+        await store.clear_session("long_chat")
+        await store.add_items(
+            "long_chat",
+            [{"role": "user", "content": f"Message {i}"} for i in range(1000)],
+        )
+
+        print(f"\nlong_chat has {await store.count('long_chat')} items")
+
+        recent = await store.last_n("long_chat", 3)
+        print("Last 3:", [item["content"] for item in recent])
+
+        # Walk backwards a page at a time; before_id is the cursor
+        page = await store.page("long_chat", limit=400)
+        pages = 1
+        while page.before_id is not None:
+            page = await store.page("long_chat", limit=400, before_id=page.before_id)
+            pages += 1
+        print(f"Read in {pages} pages, oldest page starts at: {page.items[0]['content']}")
+
+        # An agent that only needs recent context never loads the rest
+        session = store.session("long_chat", history_limit=20)
+        print(f"Runner would see {len(await session.get_items())} items")
+
+        await store.clear_session("long_chat")
+
+
+# Run the async demos
 asyncio.run(memory_operations_demo())
+asyncio.run(long_session_demo())
@@ -1,27 +1,15 @@
-import os
 import asyncio
-from openai import AsyncOpenAI
 from agents import (
     Agent,
     Runner,
-    OpenAIChatCompletionsModel,
     RunConfig,
 )
+from hello_agent import lazy_model
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
 
-from dotenv import load_dotenv
-
 from pydantic import BaseModel
 
-load_dotenv()
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL") or ""
-GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or ""
-
-external_client = AsyncOpenAI(api_key=GEMINI_API_KEY, base_url=GEMINI_BASE_URL)
-
-model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=external_client)
+model = lazy_model()
 
 
 class PersonInfo(BaseModel):
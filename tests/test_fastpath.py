@@ -0,0 +1,22 @@
+import pytest
+
+from hello_agent.fastpath import extract_expression
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "2024-10-18",
+        "10/18/2024",
+        "555-1234",
+        "1-800-555-0199",
+        "what is 1,5 + 1",
+        "what is 1,000,00 + 1",
+    ],
+)
+def test_not_arithmetic(text):
+    assert extract_expression(text) is None
+
+
+def test_thousands_separators():
+    assert extract_expression("what is 1,234,567 * 2?") == "1234567 * 2"
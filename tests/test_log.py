@@ -0,0 +1,25 @@
+import asyncio
+
+from hello_agent.sessions.log import LogStore
+
+
+def test_pop_survives_compaction_across_reopens(tmp_path):
+    async def scenario():
+        store = LogStore(tmp_path, segment_bytes=4096)
+        await store.add_items("b", [{"content": "keep-me"}])
+        await store.add_items("a", [{"content": "x" * 3000}])
+        await store.add_items("a", [{"content": "y" * 3000}])  # seals the first segment
+        await store.compact()
+        await store.pop_item("b")
+        store.close()
+
+        # Compaction output has the newest file id but not the newest records.
+        with LogStore(tmp_path, segment_bytes=4096) as store:
+            assert await store.get_items("b") == []
+            await store.compact()
+
+        with LogStore(tmp_path, segment_bytes=4096) as store:
+            assert await store.get_items("b") == []
+            assert len(await store.get_items("a")) == 2
+
+    asyncio.run(scenario())